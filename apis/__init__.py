@@ -1 +1,43 @@
 # API modules for different follower count sources
+
+import importlib
+from functools import partial
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# Provider name -> (module, per-username fetch function), imported on demand
+PROVIDERS = {
+    "instastatistics": ("apis.instastatistics", "fetch_follower_count_for"),
+}
+
+_hedged_fetchers: Dict[Tuple[str, ...], object] = {}
+
+
+def load_provider(name: str) -> Callable[[str], Optional[int]]:
+    """Returns the per-username fetch function for a provider name."""
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown provider '{name}' (available: {', '.join(PROVIDERS)})")
+    module, attr = PROVIDERS[name]
+    return getattr(importlib.import_module(module), attr)
+
+
+def get_hedged_fetcher(names: Sequence[str]):
+    """Returns this process's HedgedFetcher over the named providers (created once)."""
+    from core.providers import HedgedFetcher, ProviderRegistry
+
+    key = tuple(names)
+    if key not in _hedged_fetchers:
+        registry = ProviderRegistry()
+        for name in key:
+            registry.register(name, load_provider(name))
+        _hedged_fetchers[key] = HedgedFetcher(registry)
+    return _hedged_fetchers[key]
+
+
+def fetch_hedged(names: Sequence[str], username: str) -> Optional[int]:
+    """Per-username fetch that hedges across the named providers."""
+    return get_hedged_fetcher(names).fetch(username)
+
+
+def make_hedged_fetcher(names: Sequence[str], username: str) -> Callable[[], Optional[int]]:
+    """Picklable factory for sharded workers: partial(make_hedged_fetcher, names)."""
+    return partial(fetch_hedged, tuple(names), username)
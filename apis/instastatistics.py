@@ -2,20 +2,34 @@
 InstaStatistics API - Fastest option with 2-second cache refresh.
 """
 
-from typing import Optional
+import json
+import re
+from email.utils import parsedate_to_datetime
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
 import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
 
-from core.config import INSTAGRAM_USERNAME
+from core.config import INSTAGRAM_USERNAME, HTTP_POOL_SIZE, FAST_PARSE_CHUNK, FAST_PARSE_DRAIN_LIMIT
 from core.logger import logger
+from core.fetch_cache import FetchCacheClient
+from core.network import connectivity
+from core.http_client import RateLimitedClient
 
-API_URL = f"https://backend.instastatistics.com/api/likee/instagramfull/{INSTAGRAM_USERNAME}"
+API_URL_TEMPLATE = "https://backend.instastatistics.com/api/likee/instagramfull/{username}"
+API_URL = API_URL_TEMPLATE.format(username=INSTAGRAM_USERNAME)
+API_HOST = urlsplit(API_URL_TEMPLATE).netloc
 
-# Session with required headers
+# Session with required headers (shared by every tracked account)
 session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE))
 session.headers.update({
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36",
     "Accept": "*/*",
     "Accept-Language": "en-IN,en-GB;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,  # gzip/deflate (+br when brotli is installed)
     "Origin": "https://instastatistics.com",
     "Referer": "https://instastatistics.com/",
     "Cache-Control": "no-cache, no-store, must-revalidate",
@@ -23,35 +37,273 @@ session.headers.update({
     "Expires": "0",
 })
 
+# Token bucket, Retry-After and backoff state on top of the session
+client = RateLimitedClient(session)
 
-def fetch_follower_count() -> Optional[int]:
-    """Fetches follower count from InstaStatistics API."""
+
+def retry_delay() -> float:
+    """How long to wait after a failed fetch, based on the last error class."""
+    return client.retry_delay(API_HOST)
+
+
+def get_budget() -> dict:
+    """Current request budget for the API host (tokens, blocked time, last error)."""
+    return client.budget(API_HOST)
+
+# Latest upstream cache stamp seen per username (used by the phase-locked scheduler)
+cache_stamps: Dict[str, str] = {}
+
+
+def _cache_stamp(headers) -> Optional[str]:
+    """Identifies the upstream cache snapshot a response was served from."""
+    if headers.get("ETag"):
+        return headers["ETag"]
+    if headers.get("Last-Modified"):
+        return headers["Last-Modified"]
+    if headers.get("Age") and headers.get("Date"):
+        # Same snapshot <=> same Date - Age
+        try:
+            return str(parsedate_to_datetime(headers["Date"]).timestamp() - int(headers["Age"]))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def get_cache_stamp(username: str = INSTAGRAM_USERNAME) -> Optional[str]:
+    """Returns the cache stamp of the last successful response for a username."""
+    return cache_stamps.get(username)
+
+
+# Numeric profile metrics read from every response:
+# metric name -> (field in "user", edge in "graphql.user" holding {"count": N})
+PROFILE_METRICS = {
+    "followers": ("followerCount", "edge_followed_by"),
+    "following": ("followingCount", "edge_follow"),
+    "posts": ("mediaCount", "edge_owner_to_timeline_media"),
+}
+
+_FIELD_METRICS = {field.encode(): metric for metric, (field, _) in PROFILE_METRICS.items()}
+
+# Fast path tokens: a string (group 1) followed by ":" (group 2) when it is a key,
+# an opening/closing bracket, or a lone quote (a string cut off by the chunk end)
+_TOKEN = re.compile(rb'"([^"\\]*(?:\\.[^"\\]*)*)"(\s*:)?|[{}\[\]]|"')
+_INT_VALUE = re.compile(rb'\s*(-?\d+)\s*[,}]')
+_TRUE_VALUE = re.compile(rb'\s*true\s*[,}]')
+_PARTIAL_SCALAR = re.compile(rb'\s*[-\w.]*\s*\Z')  # Value still being received
+_DECODER = json.JSONDecoder()
+
+
+def _value_end(buffer: bytearray, pos: int) -> Optional[int]:
+    """End offset of the JSON value starting at pos, or None if it hasn't fully arrived (or is invalid)."""
+    # The C decoder skips nested values far faster than any byte-level loop here
+    text = buffer[pos:].decode("utf-8", "surrogateescape")
+    try:
+        _, end = _DECODER.raw_decode(text)
+    except ValueError:
+        return None
+    if len(text) == len(buffer) - pos:
+        return pos + end  # One byte per character
+    return pos + len(text[:end].encode("utf-8", "surrogateescape"))
+
+
+def scan_profile_metrics(chunks: Iterable[bytes]) -> Tuple[Optional[Dict[str, int]], bytearray]:
+    """
+    Fast path: scans the body incrementally and stops as soon as every
+    profile metric has appeared, without building the JSON tree.
+
+    Only the keys the full parse reads count: "success" on the top level and
+    the metric fields directly inside the top-level "user" object. Every
+    other nested object or array (posts, related profiles with their own
+    counts...) is skipped whole.
+
+    Returns (metrics, body read so far). Stopping early needs every metric
+    and "success": true, as the full parse requires. Otherwise metrics is
+    None, the whole body was read and the caller should fall back to a full
+    parse.
+    """
+    buffer = bytearray()
+    metrics: Dict[str, int] = {}
+    path = []  # Keys of the open objects that are read: the root (None), then "user"
+    key = None  # Key whose value comes next
+    success = False
+    exact = True  # False once something only the full parse can judge was seen
+    users = 0
+    pos = 0
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            token = _TOKEN.search(buffer, pos)
+            if token is None:
+                pos = len(buffer)
+                break
+            text = token.group(0)
+            if text == b'"' or (token.group(2) is None and token.end() == len(buffer)):
+                break  # String (or the ":" after it) not complete yet; resume here with more data
+            if token.group(1) is None:
+                if text in b"{[" and path and not (len(path) == 1 and key == b"user" and text == b"{"):
+                    # Nested deeper than anything the full parse reads (posts, related profiles...)
+                    end = _value_end(buffer, token.start())
+                    if end is None:
+                        # Still arriving: the counts can't be reached early, so the full parse decides
+                        exact = False
+                        break
+                    pos = end
+                    key = None
+                    continue
+                if text in b"{[":
+                    path.append(key)
+                elif path:
+                    path.pop()
+                key = None
+                pos = token.end()
+                continue
+            if token.group(2) is None:
+                key = None  # A string value
+                pos = token.end()
+                continue
+
+            key = token.group(1)
+            depth = len(path)
+            if depth == 1 and key == b"success":
+                value = _TRUE_VALUE.match(buffer, token.end())
+                if value is None and _PARTIAL_SCALAR.fullmatch(buffer, token.end()):
+                    break
+                exact = exact and value is not None and not success
+                success = True
+            elif depth == 1 and key == b"user":
+                users += 1
+                exact = exact and users == 1
+            elif depth == 2 and path[1] == b"user" and key in _FIELD_METRICS:
+                value = _INT_VALUE.match(buffer, token.end())
+                if value is None and _PARTIAL_SCALAR.fullmatch(buffer, token.end()):
+                    break
+                metric = _FIELD_METRICS[key]
+                exact = exact and value is not None and metric not in metrics
+                if value is not None:
+                    metrics[metric] = int(value.group(1))
+            pos = token.end()
+            if not exact:
+                break
+            if success and len(metrics) == len(PROFILE_METRICS):
+                return metrics, buffer
+
+        if not exact:
+            break  # Duplicate key or an unusual value: let the full parse decide
+
+    for chunk in chunks:
+        buffer += chunk
+    return None, buffer
+
+
+def _release(response: requests.Response) -> None:
+    """
+    Returns the connection to the pool after an early stop when the unread
+    remainder is small; otherwise closing is cheaper than downloading it.
+    """
+    length = response.headers.get("Content-Length")
+    remaining = int(length) - response.raw.tell() if length and length.isdigit() else 0
+    if remaining <= FAST_PARSE_DRAIN_LIMIT:
+        for _ in response.iter_content(FAST_PARSE_CHUNK):
+            pass
+    response.close()
+
+
+def extract_profile_metrics(data: dict) -> Optional[Dict[str, int]]:
+    """Full-parse path: reads the profile metrics from a decoded response."""
+    if not data.get("success"):
+        logger.warning("API returned success=false")
+        return None
+
+    user = data.get("user", {})
+    # Fallback to graphql path for any field missing from "user"
+    graphql = data.get("graphql", {}).get("user", {})
+
+    metrics = {}
+    for metric, (field, edge) in PROFILE_METRICS.items():
+        value = user.get(field)
+        if value is None:
+            value = graphql.get(edge, {}).get("count")
+        if isinstance(value, int):
+            metrics[metric] = value
+
+    if "followers" in metrics:
+        return metrics
+        
+    logger.warning("Could not find follower count in response")
+    return None
+
+
+def fetch_profile_metrics_for(username: str) -> Optional[Dict[str, int]]:
+    """Fetches every numeric profile metric (followers, following, posts) for a username."""
     try:
-        response = session.get(API_URL, timeout=15)
+        response = client.get(API_URL_TEMPLATE.format(username=username), timeout=15, stream=True)
+        # Any HTTP response at all proves we are online
+        connectivity.record_success()
         
         if response.status_code == 200:
-            data = response.json()
-            
-            if data.get("success"):
-                user = data.get("user", {})
-                followers = user.get("followerCount")
-                
-                if followers is None:
-                    # Fallback to graphql path
-                    graphql = data.get("graphql", {}).get("user", {})
-                    edge = graphql.get("edge_followed_by", {})
-                    followers = edge.get("count")
-                
-                if isinstance(followers, int):
-                    return followers
-                    
-                logger.warning("Could not find follower count in response")
-            else:
-                logger.warning("API returned success=false")
+            stamp = _cache_stamp(response.headers)
+            if stamp:
+                cache_stamps[username] = stamp
+
+            metrics, body = scan_profile_metrics(response.iter_content(FAST_PARSE_CHUNK))
+            if metrics is not None:
+                _release(response)
+                return metrics
+            return extract_profile_metrics(json.loads(body))
+        elif response.status_code == 429:
+            logger.warning(f"API rate limited us, budget: {get_budget()}")
+            response.close()
         else:
             logger.error(f"API returned status {response.status_code}")
+            response.close()
             
         return None
     except Exception as e:
+        connectivity.record_failure(e)
         logger.error(f"Error fetching follower count: {e}")
         return None
+
+
+def fetch_follower_count_for(username: str) -> Optional[int]:
+    """Fetches follower count for any username from InstaStatistics API."""
+    metrics = fetch_profile_metrics_for(username)
+    return metrics["followers"] if metrics else None
+
+
+def fetch_profile_metrics() -> Optional[Dict[str, int]]:
+    """Fetches profile metrics for the configured INSTAGRAM_USERNAME."""
+    return fetch_profile_metrics_for(INSTAGRAM_USERNAME)
+
+
+def fetch_follower_count() -> Optional[int]:
+    """Fetches follower count for the configured INSTAGRAM_USERNAME."""
+    return fetch_follower_count_for(INSTAGRAM_USERNAME)
+
+
+def make_fetcher(username: str) -> Callable[[], Optional[int]]:
+    """Returns a picklable fetch_follower_count-style callable bound to one username."""
+    return partial(fetch_follower_count_for, username)
+
+
+def make_metrics_fetcher(username: str) -> Callable[[], Optional[Dict[str, int]]]:
+    """Like make_fetcher, but the callable returns every profile metric."""
+    return partial(fetch_profile_metrics_for, username)
+
+
+# Client for the local fetch cache daemon (run_fetch_cache.py)
+cache_client = FetchCacheClient(fallback=fetch_profile_metrics_for, fallback_stamp=get_cache_stamp)
+
+
+def fetch_follower_count_cached(username: str) -> Optional[Dict[str, int]]:
+    """Fetches profile metrics for a username through the local fetch cache daemon."""
+    return cache_client.fetch(username)
+
+
+def make_cached_fetcher(username: str) -> Callable[[], Optional[Dict[str, int]]]:
+    """Like make_metrics_fetcher, but goes through the local fetch cache daemon."""
+    return partial(fetch_follower_count_cached, username)
+
+
+def get_cached_stamp(username: str = INSTAGRAM_USERNAME) -> Optional[str]:
+    """Like get_cache_stamp, for readings that went through the local fetch cache daemon."""
+    return cache_client.get_cache_stamp(username)
@@ -0,0 +1,205 @@
+"""
+Rolling analytics over recent follower samples.
+
+Samples go into NumPy ring buffers, and every statistic is updated
+incrementally as a sample arrives (amortized O(1)):
+- gains/losses over each window in ANALYTICS_WINDOWS (running sums with a tail pointer)
+- an EWMA trend in followers per hour
+- ETA to the next round-number milestone
+- spike/drop flags when a step is far outside the recent EWMA mean/variance
+
+A ring holds just enough samples for the longest window at the account's
+poll interval, and is allocated with the first sample and doubled as it
+fills, so numpy is only loaded by processes that actually keep analytics.
+"""
+
+import math
+import threading
+from typing import Dict, Optional
+
+from .config import (
+    CHECK_INTERVAL, ANALYTICS_CAPACITY, ANALYTICS_WINDOWS, ANALYTICS_TREND_TAU, MILESTONE_STEP,
+    ANOMALY_TAU, ANOMALY_Z, ANOMALY_MIN_DELTA, ANOMALY_WARMUP
+)
+
+INITIAL_SLOTS = 64  # First allocation of a ring; doubled up to its capacity
+
+
+def ring_capacity(windows: Dict[str, float], interval: float) -> int:
+    """Samples needed to cover the longest window when polling every interval seconds."""
+    return math.ceil(max(windows.values()) / interval) + 1
+
+
+def next_milestone(value: int, step: Optional[int] = MILESTONE_STEP) -> int:
+    """Next round number above value (auto step: 123,456 -> 130,000; 987 -> 990)."""
+    if not step:
+        step = 10 ** max(1, len(str(abs(value))) - 2)
+    return (value // step + 1) * step
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+class RollingAnalytics:
+    """
+    Statistics over the most recent samples of one account's follower count.
+
+    Args:
+        capacity: Max samples kept (None: enough for the longest window at interval).
+        windows: Window name -> span in seconds.
+        interval: Seconds between the account's polls, used to size the ring.
+    """
+
+    def __init__(self, capacity: Optional[int] = ANALYTICS_CAPACITY,
+                 windows: Dict[str, float] = ANALYTICS_WINDOWS, interval: float = CHECK_INTERVAL):
+        self.windows = dict(windows)
+        self.capacity = capacity or ring_capacity(self.windows, interval)
+        self.ts = self.values = self.deltas = None  # Allocated by _grow on the first sample
+        self.slots = 0  # Allocated ring size
+        self.count = 0  # Samples seen; sample i lives in slot i % slots
+        self.trend = 0.0  # EWMA of followers per second
+        self.last_anomaly: Optional[dict] = None
+        self._tails = {name: 0 for name in self.windows}  # Oldest sample index inside each window
+        self._gained = {name: 0 for name in self.windows}
+        self._lost = {name: 0 for name in self.windows}
+        self._step_mean = 0.0
+        self._step_var = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, ts: float, value: int) -> Optional[str]:
+        """Adds a sample; returns "spike" or "drop" when the step is anomalous."""
+        with self._lock:
+            i = self.count
+            if i == self.slots and i < self.capacity:
+                self._grow()
+            cap = self.slots
+            if i:
+                last = (i - 1) % cap
+                delta = value - int(self.values[last])
+                dt = ts - self.ts[last]
+            else:
+                delta, dt = 0, 0.0
+
+            # Evict from each window first: anything too old, and the slot about to be overwritten
+            for name, span in self.windows.items():
+                tail = self._tails[name]
+                while tail < i and (tail <= i - cap or self.ts[tail % cap] < ts - span):
+                    old = int(self.deltas[tail % cap])
+                    if old > 0:
+                        self._gained[name] -= old
+                    else:
+                        self._lost[name] += old
+                    tail += 1
+                self._tails[name] = tail
+                if delta > 0:
+                    self._gained[name] += delta
+                else:
+                    self._lost[name] -= delta
+
+            slot = i % cap
+            self.ts[slot] = ts
+            self.values[slot] = value
+            self.deltas[slot] = delta
+            self.count += 1
+
+            if dt <= 0:
+                return None
+            self.trend += (1 - math.exp(-dt / ANALYTICS_TREND_TAU)) * (delta / dt - self.trend)
+            return self._check_anomaly(ts, delta, dt)
+
+    def _grow(self) -> None:
+        """Doubles the ring; it only grows before it wraps, so slot i still holds sample i."""
+        import numpy as np  # Loaded with the first sample rather than with the module
+
+        size = min(self.capacity, max(INITIAL_SLOTS, 2 * self.slots))
+        for name, dtype in (("ts", np.float64), ("values", np.int64), ("deltas", np.int64)):
+            grown = np.zeros(size, dtype=dtype)
+            if self.slots:
+                grown[:self.slots] = getattr(self, name)
+            setattr(self, name, grown)
+        self.slots = size
+
+    def _check_anomaly(self, ts: float, delta: int, dt: float) -> Optional[str]:
+        """Flags steps far from the EWMA step mean, then folds the step into it."""
+        flag = None
+        deviation = delta - self._step_mean
+        if self.count > ANOMALY_WARMUP and abs(delta) >= ANOMALY_MIN_DELTA:
+            z = deviation / max(1.0, math.sqrt(self._step_var))
+            if abs(z) >= ANOMALY_Z:
+                flag = "spike" if z > 0 else "drop"
+                self.last_anomaly = {"type": flag, "delta": delta, "z": round(z, 1), "ts": ts}
+        alpha = 1 - math.exp(-dt / ANOMALY_TAU)
+        self._step_mean += alpha * deviation
+        self._step_var = (1 - alpha) * (self._step_var + alpha * deviation * deviation)
+        return flag
+
+    def window(self, name: str) -> dict:
+        """Gains, losses and net rate per hour over one window."""
+        with self._lock:
+            tail = self._tails[name]
+            covered = self.ts[(self.count - 1) % self.slots] - self.ts[tail % self.slots] if self.count > tail else 0.0
+            gained, lost = self._gained[name], self._lost[name]
+        span = max(1.0, min(self.windows[name], covered))
+        return {"gained": gained, "lost": lost, "net": gained - lost, "per_hour": (gained - lost) * 3600 / span}
+
+    def series(self, name: str):
+        """(timestamps, values) arrays for one window, oldest first."""
+        import numpy as np
+
+        with self._lock:
+            if not self.count:
+                return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.int64)
+            slots = np.arange(self._tails[name], self.count) % self.slots
+            return self.ts[slots], self.values[slots]
+
+    def snapshot(self) -> dict:
+        if not self.count:
+            return {}
+        with self._lock:
+            value = int(self.values[(self.count - 1) % self.slots])
+            trend = self.trend
+        milestone = next_milestone(value)
+        return {
+            "value": value,
+            "windows": {name: self.window(name) for name in self.windows},
+            "trend_per_hour": trend * 3600,
+            "milestone": milestone,
+            "milestone_eta": (milestone - value) / trend if trend > 0 else None,
+            "last_anomaly": self.last_anomaly,
+        }
+
+    def headline(self) -> str:
+        """Short trend text for notifications, e.g. "+42/h, 130,000 in 3.1h"."""
+        stats = self.snapshot()
+        if not stats:
+            return ""
+        text = f"{stats['trend_per_hour']:+.0f}/h"
+        if stats["milestone_eta"] is not None:
+            text += f", {stats['milestone']:,} in {format_duration(stats['milestone_eta'])}"
+        return text
+
+    def summary(self) -> str:
+        """One log line with every window and the trend."""
+        stats = self.snapshot()
+        if not stats:
+            return "no samples yet"
+        parts = [f"{name} +{w['gained']}/-{w['lost']}" for name, w in stats["windows"].items()]
+        return f"{', '.join(parts)}; trend {self.headline()}"
+
+
+_engines: Dict[str, RollingAnalytics] = {}
+_engines_lock = threading.Lock()
+
+
+def get_analytics(account: str, interval: float = CHECK_INTERVAL) -> RollingAnalytics:
+    """The analytics engine for an account, created on first use (sized for its poll interval)."""
+    with _engines_lock:
+        engine = _engines.get(account)
+        if engine is None:
+            engine = _engines[account] = RollingAnalytics(interval=interval)
+        return engine
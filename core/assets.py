@@ -0,0 +1,442 @@
+"""
+Notification assets: where they live, an in-memory catalog to pick them
+from, and a cache of pre-scaled GIFs.
+
+The catalog scans the asset folders once, keeps per-file metadata and is
+updated by inotify (or by polling the folder mtimes where inotify is not
+available), so picking a GIF never touches the filesystem. Picks come from a
+shuffle bag: every GIF gets a turn before any repeats, and ASSET_WEIGHTS can
+put some in the bag more than once.
+
+Source GIFs are large (hundreds of pixels, many frames), and the overlay only
+ever shows them at GAIN_GIF_SIZE/LOSS_GIF_SIZE. The build step transcodes each
+GIF once to its display height (optionally dropping frames and colours) into
+ASSET_CACHE_DIR, so the renderer loads a small, already sized file instead of
+measuring and rescaling every frame on each show.
+
+Cache files are named by a hash of the source content and the build settings,
+and index.json maps each source (and height) to its file with the aspect
+metadata. An entry is rebuilt when the source file or the settings change.
+Building needs Pillow; without it the renderer keeps scaling the originals.
+"""
+
+import ctypes
+import hashlib
+import json
+import os
+import random
+import struct
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import (
+    PROJECT_DIR, GAIN_GIF_SIZE, LOSS_GIF_SIZE,
+    ASSET_CACHE_DIR, ASSET_MAX_FRAMES, ASSET_PALETTE_COLORS,
+    ASSET_WATCH, ASSET_WATCH_INTERVAL, ASSET_WEIGHTS
+)
+from .logger import logger
+
+# Asset paths
+ASSETS_DIR = os.path.join(PROJECT_DIR, "assets")
+
+# GIF folders (put multiple .gif files here for random selection)
+GIF_GAIN_DIR = os.path.join(ASSETS_DIR, "gain")
+GIF_LOSS_DIR = os.path.join(ASSETS_DIR, "loss")
+
+# Single file fallbacks (if folders are empty)
+GIF_GAIN_FALLBACK = os.path.join(ASSETS_DIR, "gain.gif")
+GIF_LOSS_FALLBACK = os.path.join(ASSETS_DIR, "loss.gif")
+IMG_GAIN_FALLBACK = os.path.join(ASSETS_DIR, "gain.png")
+IMG_LOSS_FALLBACK = os.path.join(ASSETS_DIR, "loss.png")
+
+Asset = namedtuple("Asset", "path kind width height frames bytes mtime weight")
+
+BUILD_VERSION = 1  # Bump when the transcoding changes, so every entry is rebuilt
+
+
+def asset_targets() -> List[Tuple[str, int]]:
+    """Every GIF the overlay can show, with the height it is shown at."""
+    targets = []
+    for folder, fallback, height in (
+        (GIF_GAIN_DIR, GIF_GAIN_FALLBACK, GAIN_GIF_SIZE),
+        (GIF_LOSS_DIR, GIF_LOSS_FALLBACK, LOSS_GIF_SIZE),
+    ):
+        if os.path.isdir(folder):
+            targets += [(os.path.join(folder, name), height) for name in sorted(os.listdir(folder))
+                        if name.lower().endswith(".gif")]
+        if os.path.exists(fallback):
+            targets.append((fallback, height))
+    return targets
+
+
+def _skip_sub_blocks(data: bytes, i: int) -> int:
+    while i < len(data) and data[i]:
+        i += data[i] + 1
+    return i + 1
+
+
+def image_info(path: str) -> Tuple[int, int, int]:
+    """(width, height, frames) of a GIF or PNG, read from the file structure (no decoder needed)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height, 1
+    if data[:3] != b"GIF":
+        raise ValueError("not a GIF or PNG")
+    width, height, flags = struct.unpack("<HHB", data[6:11])
+    i = 13 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+    frames = 0
+    while i < len(data):
+        block = data[i]
+        if block == 0x21:  # Extension: label, then sub-blocks
+            i = _skip_sub_blocks(data, i + 2)
+        elif block == 0x2C:  # Image: descriptor, optional local palette, LZW size, sub-blocks
+            frames += 1
+            local = data[i + 9]
+            i += 10 + (3 << ((local & 7) + 1) if local & 0x80 else 0)
+            i = _skip_sub_blocks(data, i + 1)
+        else:  # Trailer (or junk after the last frame)
+            break
+    return width, height, frames
+
+
+class AssetCatalog:
+    """In-memory index of the gain/loss assets with shuffle-bag selection."""
+
+    def __init__(self, watch: bool = ASSET_WATCH, weights: Optional[Dict[str, float]] = None):
+        self.watch = watch
+        self.weights = ASSET_WEIGHTS if weights is None else weights
+        self.assets: Dict[str, Dict[str, Asset]] = {"gain": {}, "loss": {}}
+        self.rescans = 0
+        self.listeners: List[Callable[[], None]] = []  # Called after the catalog changes
+        self._bags: Dict[str, List[str]] = {"gain": [], "loss": []}
+        self._last: Dict[str, Optional[str]] = {"gain": None, "loss": None}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+
+    # ---- scanning ----
+
+    @staticmethod
+    def _sources(kind: str) -> List[str]:
+        """Files of a kind: the folder's GIFs, else the single-file fallback."""
+        folder = GIF_GAIN_DIR if kind == "gain" else GIF_LOSS_DIR
+        if os.path.isdir(folder):
+            gifs = [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                    if name.lower().endswith(".gif")]
+            if gifs:
+                return gifs
+        fallbacks = (GIF_GAIN_FALLBACK, IMG_GAIN_FALLBACK) if kind == "gain" else (GIF_LOSS_FALLBACK, IMG_LOSS_FALLBACK)
+        return [path for path in fallbacks if os.path.exists(path)][:1]
+
+    def _describe(self, path: str, kind: str, known: Optional[Asset]) -> Optional[Asset]:
+        try:
+            st = os.stat(path)
+            if known is not None and (known.bytes, known.mtime) == (st.st_size, st.st_mtime_ns):
+                return known
+            width, height, frames = image_info(path)
+        except (OSError, ValueError, IndexError, struct.error) as e:
+            logger.warning(f"Skipping asset {os.path.basename(path)}: {e}")
+            return None
+        weight = self.weights.get(os.path.basename(path), 1)
+        return Asset(path, kind, width, height, frames, st.st_size, st.st_mtime_ns, weight)
+
+    def rescan(self) -> None:
+        """Re-reads the asset folders; bags are only reshuffled for kinds whose files changed."""
+        changed = False
+        for kind in ("gain", "loss"):
+            old = self.assets[kind]
+            new = {}
+            for path in self._sources(kind):
+                asset = self._describe(path, kind, old.get(path))
+                if asset is not None and asset.weight > 0:
+                    new[path] = asset
+            if new != old:
+                with self._lock:
+                    self.assets[kind] = new
+                    self._bags[kind] = []
+                changed = True
+        self.rescans += 1
+        if changed and self._started:
+            logger.info(f"Asset catalog updated: {len(self.assets['gain'])} gain, {len(self.assets['loss'])} loss")
+            for listener in self.listeners:
+                listener()
+
+    def start(self) -> "AssetCatalog":
+        """Scans the folders and starts watching them (once)."""
+        with self._start_lock:
+            if self._started:
+                return self
+            self.rescan()
+            self._started = True
+        if self.watch:
+            threading.Thread(target=self._watch, name="asset-watch", daemon=True).start()
+        return self
+
+    def _watch(self) -> None:
+        try:
+            self._watch_inotify()
+        except OSError as e:
+            logger.info(f"inotify unavailable ({e}); polling asset folders every {ASSET_WATCH_INTERVAL}s")
+            self._watch_polling()
+
+    def _watch_inotify(self) -> None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        mask = 0x008 | 0x040 | 0x080 | 0x100 | 0x200
+        watched = set()
+        while True:
+            for folder in (ASSETS_DIR, GIF_GAIN_DIR, GIF_LOSS_DIR):
+                if folder not in watched and os.path.isdir(folder):
+                    if libc.inotify_add_watch(fd, folder.encode(), mask) >= 0:
+                        watched.add(folder)
+            os.read(fd, 64 * 1024)  # Blocks until something changes; which file doesn't matter
+            time.sleep(0.2)  # Let a copy of several files settle into one rescan
+            self.rescan()
+
+    def _watch_polling(self) -> None:
+        def stamp():
+            return tuple(os.stat(folder).st_mtime_ns if os.path.isdir(folder) else None
+                         for folder in (ASSETS_DIR, GIF_GAIN_DIR, GIF_LOSS_DIR))
+        last = stamp()
+        while True:
+            time.sleep(ASSET_WATCH_INTERVAL)
+            current = stamp()
+            if current != last:
+                last = current
+                self.rescan()
+
+    # ---- selection ----
+
+    def _fill_bag(self, kind: str) -> None:
+        """Shuffles every asset (weight times) into the bag, never the same one twice in a row if avoidable."""
+        remaining = {path: max(1, round(asset.weight)) for path, asset in self.assets[kind].items()}
+        total = sum(remaining.values())
+        previous = self._last[kind]
+        bag = []
+        while total:
+            # An asset holding more than half of what's left has to go now, or it will end up repeating
+            crowded = [path for path, n in remaining.items() if n * 2 > total and path != previous]
+            choices = crowded or [path for path in remaining if path != previous] or list(remaining)
+            chosen = random.choices(choices, [remaining[path] for path in choices])[0]
+            bag.append(chosen)
+            remaining[chosen] -= 1
+            if not remaining[chosen]:
+                del remaining[chosen]
+            total -= 1
+            previous = chosen
+        bag.reverse()  # Picks pop from the end
+        self._bags[kind] = bag
+
+    def pick(self, is_gain: bool) -> Optional[str]:
+        """Next asset path from the bag (None when there are no assets)."""
+        if not self._started:
+            self.start()
+        kind = "gain" if is_gain else "loss"
+        with self._lock:
+            if not self._bags[kind]:
+                self._fill_bag(kind)
+                if not self._bags[kind]:
+                    return None
+            chosen = self._bags[kind].pop()
+            self._last[kind] = chosen
+            return chosen
+
+
+asset_catalog = AssetCatalog()
+
+
+def get_random_gif(is_gain: bool) -> str:
+    """Next gain/loss GIF (or image) from the catalog, "" when there is none."""
+    return asset_catalog.pick(is_gain) or ""
+
+
+def pillow_available() -> bool:
+    """Pillow is imported only when building, so processes that just pick GIFs never load it."""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _transcode(source: str, dest: str, height: int) -> dict:
+    """Writes source scaled to height (frames/palette trimmed per config) and returns its metadata."""
+    from PIL import Image, ImageSequence
+
+    with Image.open(source) as im:
+        width = max(1, round(im.width * height / im.height))
+        loop = im.info.get("loop", 0)
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(im):
+            frames.append(frame.convert("RGBA").resize((width, height), Image.LANCZOS))
+            durations.append(frame.info.get("duration", 100))
+
+    if ASSET_MAX_FRAMES and len(frames) > ASSET_MAX_FRAMES:
+        # Keep every step-th frame and give it the dropped frames' time, so the speed is unchanged
+        step = -(-len(frames) // ASSET_MAX_FRAMES)
+        frames = frames[::step]
+        durations = [sum(durations[i:i + step]) for i in range(0, len(durations), step)]
+
+    if ASSET_PALETTE_COLORS and ASSET_PALETTE_COLORS < 256:
+        frames = [_quantize(frame, ASSET_PALETTE_COLORS) for frame in frames]
+
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    frames[0].save(tmp, format="GIF", save_all=True, append_images=frames[1:], duration=durations,
+                   loop=loop, disposal=2, optimize=True)
+    os.replace(tmp, dest)
+    return {"width": width, "height": height, "aspect": width / height, "frames": len(frames),
+            "bytes": os.path.getsize(dest)}
+
+
+def _quantize(frame, colors: int):
+    """Reduces a frame's palette, keeping fully transparent pixels transparent."""
+    alpha = frame.getchannel("A")
+    quantized = frame.convert("RGB").quantize(colors - 1)  # Leave an index free for transparency
+    quantized.paste(colors - 1, mask=alpha.point(lambda a: 255 if a < 128 else 0))
+    quantized.info["transparency"] = colors - 1
+    return quantized
+
+
+class AssetCache:
+    """Index of pre-scaled GIFs in ASSET_CACHE_DIR."""
+
+    def __init__(self, cache_dir: str = ASSET_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._index: Dict[str, dict] = {}
+        self._index_mtime = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(source: str, height: int) -> str:
+        return f"{height}:{os.path.abspath(source)}"
+
+    @staticmethod
+    def _settings() -> str:
+        return f"v{BUILD_VERSION}:{ASSET_MAX_FRAMES}:{ASSET_PALETTE_COLORS}"
+
+    def _load_index(self) -> Dict[str, dict]:
+        """The index, re-read when another process (scripts/build_assets.py) has rewritten it."""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            return self._index
+        if mtime != self._index_mtime:
+            try:
+                with open(self.index_path) as f:
+                    self._index = json.load(f)
+                self._index_mtime = mtime
+            except (OSError, ValueError) as e:
+                logger.warning(f"Asset cache index unreadable, ignoring it: {e}")
+        return self._index
+
+    def _save_index(self) -> None:
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._index, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def lookup(self, source: str, height: int) -> Optional[dict]:
+        """Metadata (with "path") of an up-to-date pre-scaled copy of source, or None."""
+        with self._lock:
+            entry = self._load_index().get(self._key(source, height))
+        if entry is None or entry["settings"] != self._settings():
+            return None
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != (entry["source_size"], entry["source_mtime"]):
+            return None  # Source changed since the build
+        path = os.path.join(self.cache_dir, entry["file"])
+        return dict(entry, path=path) if os.path.exists(path) else None
+
+    def build(self, source: str, height: int, force: bool = False) -> Optional[dict]:
+        """Builds (or reuses) the pre-scaled copy of source; returns its metadata."""
+        if not pillow_available():
+            return None
+        if not force:
+            entry = self.lookup(source, height)
+            if entry is not None:
+                return entry
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        st = os.stat(source)
+        content = _file_hash(source)
+        name = hashlib.sha1(f"{content}:{height}:{self._settings()}".encode()).hexdigest() + ".gif"
+        dest = os.path.join(self.cache_dir, name)
+        meta_path = dest[:-4] + ".json"
+        meta = None
+        if not force and os.path.exists(dest) and os.path.exists(meta_path):
+            # Same content already built (e.g. the file was renamed or touched)
+            with open(meta_path) as f:
+                meta = json.load(f)
+        if meta is None:
+            meta = _transcode(source, dest, height)
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+        entry = dict(meta, file=name, content_hash=content, settings=self._settings(),
+                     source_size=st.st_size, source_mtime=st.st_mtime_ns)
+        with self._lock:
+            self._load_index()
+            self._index[self._key(source, height)] = entry
+            self._save_index()
+        return dict(entry, path=dest)
+
+    def build_all(self, targets: Optional[Iterable[Tuple[str, int]]] = None, force: bool = False) -> dict:
+        """Builds every target and drops cache files nothing refers to any more."""
+        report = {"built": 0, "cached": 0, "failed": 0, "source_bytes": 0, "cache_bytes": 0}
+        if not pillow_available():
+            logger.info("Pillow is not installed; GIFs are scaled at display time")
+            return report
+        wanted = set()
+        for source, height in (asset_targets() if targets is None else targets):
+            fresh = force or self.lookup(source, height) is None
+            try:
+                entry = self.build(source, height, force)
+            except Exception as e:
+                logger.error(f"Could not pre-scale {os.path.basename(source)}: {e}")
+                report["failed"] += 1
+                continue
+            wanted.add(self._key(source, height))
+            report["built" if fresh else "cached"] += 1
+            report["source_bytes"] += entry["source_size"]
+            report["cache_bytes"] += entry["bytes"]
+        if targets is None:
+            self._prune(wanted)
+        return report
+
+    def _prune(self, wanted: set) -> None:
+        with self._lock:
+            self._load_index()
+            for key in [key for key in self._index if key not in wanted]:
+                del self._index[key]
+            if os.path.isdir(self.cache_dir):
+                self._save_index()
+            used = {entry["file"][:-4] for entry in self._index.values()}
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            stem, ext = os.path.splitext(name)
+            if ext in (".gif", ".json") and name != "index.json" and stem not in used:
+                os.remove(os.path.join(self.cache_dir, name))
+
+
+asset_cache = AssetCache()
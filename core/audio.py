@@ -1,6 +1,11 @@
 """
 Audio playback system with overlay support.
 Plays intro jingle, then voice announcement after delay.
+
+With AUDIO_ENGINE (the default) both go through the in-process mixer in
+core/audio_engine.py, which keeps one mpv running, as a single buffer
+pre-mixed by core/premix.py (AUDIO_PREMIX); without it, or when that player
+can't be started, each clip gets its own mpv.
 """
 
 import os
@@ -10,17 +15,31 @@ import threading
 
 from .config import (
     AUDIO_GET, AUDIO_LOST, GENERATED_AUDIO_DIR,
-    AUDIO_OVERLAY_DELAY
+    AUDIO_OVERLAY_DELAY, AUDIO_ENGINE, AUDIO_PREMIX
 )
 from .logger import logger
 
 
+def _engine():
+    """The audio engine, imported on first use (numpy mixer, decoded clips)."""
+    from .audio_engine import audio_engine
+    return audio_engine
+
+
+def warm_up() -> None:
+    """Starts the engine's player and decodes the clips so the first announcement plays at once."""
+    if AUDIO_ENGINE:
+        engine = _engine()
+        if engine.start():
+            engine.preload()
+
+
 def play_audio(audio_path: str) -> None:
-    """Plays an audio file using mpv (non-blocking)."""
-    if audio_path and os.path.exists(audio_path):
-        subprocess.Popen(["mpv", "--no-terminal", audio_path])
-    else:
+    """Plays an audio file (non-blocking)."""
+    if not audio_path or not os.path.exists(audio_path):
         logger.warning(f"Audio file not found: {audio_path}")
+    elif not (AUDIO_ENGINE and _engine().play(audio_path)):
+        subprocess.Popen(["mpv", "--no-terminal", audio_path])
 
 
 def play_audio_with_overlay(intro_path: str, voice_path: str, delay: float = AUDIO_OVERLAY_DELAY) -> None:
@@ -28,6 +47,9 @@ def play_audio_with_overlay(intro_path: str, voice_path: str, delay: float = AUD
     Plays intro audio, then overlays voice after delay.
     The voice starts playing while intro may still be going.
     """
+    if AUDIO_ENGINE and _engine().announce(intro_path, voice_path, delay):
+        return
+
     def delayed_voice():
         time.sleep(delay)
         if voice_path and os.path.exists(voice_path):
@@ -42,47 +64,51 @@ def play_audio_with_overlay(intro_path: str, voice_path: str, delay: float = AUD
         threading.Thread(target=delayed_voice, daemon=True).start()
 
 
-def play_gain_audio(diff: int) -> None:
-    """Plays gain audio with get.mp3 intro overlay."""
-    voice_file = ""
-    
+def play_announcement(kind: str, intro_path: str, voice_path: str, delay: float = AUDIO_OVERLAY_DELAY) -> None:
+    """Plays a gain/loss announcement, pre-mixed when possible, else intro + voice overlay."""
+    if AUDIO_ENGINE and AUDIO_PREMIX and _engine().start():
+        from .premix import premix_cache
+        buffer = premix_cache.get(kind, intro_path, voice_path, delay)
+        if buffer is not None and _engine().play_buffer(buffer):
+            return
+    play_audio_with_overlay(intro_path, voice_path, delay)
+
+
+def gain_voice_file(diff: int) -> str:
+    """Voice clip announcing a gain of diff ("" if there is none)."""
     if diff <= 100:
         # Specific file 1-100
         path = os.path.join(GENERATED_AUDIO_DIR, "gain", f"{diff}.wav")
-        if os.path.exists(path):
-            voice_file = path
     elif diff <= 1000:
         # Milestones 100-1000 (step 100)
         milestone = (diff // 100) * 100
         path = os.path.join(GENERATED_AUDIO_DIR, "gain", f"more_than_{milestone}.wav")
-        if os.path.exists(path):
-            voice_file = path
     else:
         # Milestones 1000-10000 (step 1000)
-        milestone = (diff // 1000) * 1000
-        if milestone > 10000:
-            milestone = 10000
+        milestone = min((diff // 1000) * 1000, 10000)
         path = os.path.join(GENERATED_AUDIO_DIR, "gain", f"more_than_{milestone}.wav")
-        if os.path.exists(path):
-            voice_file = path
-    
-    # Play intro with overlay
-    play_audio_with_overlay(AUDIO_GET, voice_file)
+    return path if os.path.exists(path) else ""
 
 
-def play_loss_audio(diff: int) -> None:
-    """Plays loss audio with lost.mp3 intro overlay."""
-    voice_file = ""
-    
+def loss_voice_file(diff: int) -> str:
+    """Voice clip announcing a loss of diff ("" if there is none)."""
     # Check for specific number file
     specific_file = os.path.join(GENERATED_AUDIO_DIR, "loss", f"{diff}.wav")
     over_file = os.path.join(GENERATED_AUDIO_DIR, "loss", "over_100.wav")
     
     if os.path.exists(specific_file):
-        voice_file = specific_file
-    elif diff > 100 and os.path.exists(over_file):
-        voice_file = over_file
-    
-    # Always play intro, with or without voice
-    play_audio_with_overlay(AUDIO_LOST, voice_file)
+        return specific_file
+    if diff > 100 and os.path.exists(over_file):
+        return over_file
+    return ""
+
 
+def play_gain_audio(diff: int) -> None:
+    """Plays gain audio with get.mp3 intro overlay."""
+    play_announcement("gain", AUDIO_GET, gain_voice_file(diff))
+
+
+def play_loss_audio(diff: int) -> None:
+    """Plays loss audio with lost.mp3 intro overlay."""
+    # Always play intro, with or without voice
+    play_announcement("loss", AUDIO_LOST, loss_voice_file(diff))
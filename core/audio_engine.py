@@ -0,0 +1,329 @@
+"""
+Persistent audio engine: one long-lived mpv playing a PCM stream mixed here.
+
+Starting mpv twice per event (intro, then voice from a sleeping thread) costs
+two process launches, two decoder start-ups and timer jitter on the overlay.
+The engine keeps the intros and the generated voice clips decoded in memory,
+mixes them with numpy and streams the result to a single mpv reading raw PCM
+on stdin, so the voice lands exactly AUDIO_OVERLAY_DELAY after the intro, to
+the sample.
+
+The stream is written in real time, AUDIO_ENGINE_LEAD seconds ahead of the
+clock (silence between announcements), which keeps the added latency
+bounded. After AUDIO_ENGINE_IDLE_TIMEOUT seconds with nothing to play the
+player is closed, releasing the audio device, and the next announcement
+starts it again. An
+announcement that arrives while another is playing waits for it ("queue", at
+most AUDIO_QUEUE_MAX waiting) or plays over it with the older one turned down
+("duck"), per AUDIO_OVERLAP.
+"""
+
+import glob
+import os
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import (
+    AUDIO_GET, AUDIO_LOST, GENERATED_AUDIO_DIR, AUDIO_OVERLAY_DELAY,
+    AUDIO_ENGINE_RATE, AUDIO_ENGINE_LEAD, AUDIO_ENGINE_IDLE_TIMEOUT, AUDIO_OVERLAP, AUDIO_DUCK_GAIN,
+    AUDIO_QUEUE_MAX
+)
+from .logger import logger
+
+CHANNELS = 2
+BLOCK_SECONDS = 0.01  # Writer wake-up interval
+DUCK_RAMP_SECONDS = 0.05  # Fade to the ducked level instead of a click
+RESTART_BACKOFF = 60  # Seconds before trying mpv again after it failed to start
+
+
+class Clip:
+    """Decoded audio kept in its source format (int16); converted to the mix format on use."""
+
+    __slots__ = ("path", "samples", "rate", "stamp")
+
+    def __init__(self, path: str, samples: np.ndarray, rate: int):
+        self.path = path
+        self.samples = samples  # (frames, channels) int16
+        self.rate = rate
+        self.stamp = None  # Source (size, mtime) it was decoded from
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.rate
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes
+
+    def render(self, rate: int) -> np.ndarray:
+        """float32 stereo at rate."""
+        samples = self.samples.astype(np.float32) / 32768
+        if samples.shape[1] == 1:
+            samples = np.repeat(samples, CHANNELS, axis=1)
+        if self.rate != rate and len(samples):
+            frames = int(round(len(samples) * rate / self.rate))
+            positions = np.arange(frames) * (self.rate / rate)
+            source = np.arange(len(samples))
+            samples = np.stack([np.interp(positions, source, samples[:, c]) for c in range(CHANNELS)], axis=1)
+        return samples.astype(np.float32, copy=False)
+
+
+def decode(path: str, rate: int = AUDIO_ENGINE_RATE) -> Clip:
+    """Decodes a WAV with the standard library, anything else to stereo PCM at rate through mpv."""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as w:
+            if w.getsampwidth() == 2:
+                data = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+                return Clip(path, data.reshape(-1, w.getnchannels()), w.getframerate())
+    result = subprocess.run(
+        ["mpv", "--no-config", "--no-terminal", "--vid=no", "--ao=pcm", "--ao-pcm-file=/dev/stdout",
+         "--ao-pcm-waveheader=no", "--audio-format=s16", f"--audio-samplerate={rate}",
+         "--audio-channels=stereo", path],
+        capture_output=True, check=True
+    )
+    data = np.frombuffer(result.stdout, dtype="<i2")
+    return Clip(path, data[:len(data) // CHANNELS * CHANNELS].reshape(-1, CHANNELS), rate)
+
+
+class Voice:
+    """A buffer scheduled on the engine's frame clock."""
+
+    __slots__ = ("start", "samples", "duck_at")
+
+    def __init__(self, start: int, samples: np.ndarray):
+        self.start = start
+        self.samples = samples
+        self.duck_at: Optional[int] = None
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.samples)
+
+
+class AudioEngine:
+    """Mixes scheduled clips and streams them to one mpv process."""
+
+    def __init__(self, rate: int = AUDIO_ENGINE_RATE, overlap: str = AUDIO_OVERLAP,
+                 idle_timeout: float = AUDIO_ENGINE_IDLE_TIMEOUT):
+        if overlap not in ("queue", "duck"):
+            raise ValueError(f"Unknown audio overlap policy: {overlap}")
+        self.rate = rate
+        self.overlap = overlap
+        self.idle_timeout = idle_timeout
+        self.player_cmd = [
+            "mpv", "--no-config", "--no-terminal", "--no-video", "--cache=no", "--audio-buffer=0.05",
+            "--demuxer=rawaudio", "--demuxer-rawaudio-format=s16le",
+            f"--demuxer-rawaudio-rate={rate}", f"--demuxer-rawaudio-channels={CHANNELS}", "-"
+        ]
+        self.clips: Dict[str, Clip] = {}
+        self.process: Optional[subprocess.Popen] = None
+        self.stats = {"announcements": 0, "queued": 0, "ducked": 0, "dropped": 0, "underruns": 0, "restarts": 0,
+                      "idle_stops": 0}
+        self._voices: List[Voice] = []
+        self._pending = deque()  # Start frames of queued announcements
+        self._busy_until = 0  # Frame the last scheduled announcement ends
+        self._frame = 0  # Frames written to the player so far
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._retry_at = 0.0
+
+    # ---- clips ----
+
+    def clip(self, path: str) -> Optional[Clip]:
+        """Decoded clip for path (decoded on first use, and again when the file changes)."""
+        clip = self.clips.get(path)
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is not None and (clip is None or clip.stamp != (st.st_size, st.st_mtime_ns)):
+            try:
+                clip = self.clips[path] = decode(path, self.rate)
+                clip.stamp = (st.st_size, st.st_mtime_ns)
+            except (OSError, subprocess.CalledProcessError, wave.Error, ValueError) as e:
+                logger.error(f"Could not decode {os.path.basename(path)}: {e}")
+        return clip
+
+    def preload(self) -> None:
+        """Decodes the intros and every generated voice clip."""
+        started = time.perf_counter()
+        for path in [AUDIO_GET, AUDIO_LOST] + sorted(glob.glob(os.path.join(GENERATED_AUDIO_DIR, "*", "*.wav"))):
+            self.clip(path)
+        size = sum(clip.nbytes for clip in self.clips.values())
+        logger.info(f"Audio engine: {len(self.clips)} clips decoded ({size / 1e6:.1f} MB) "
+                    f"in {time.perf_counter() - started:.1f}s")
+
+    # ---- player ----
+
+    def start(self) -> bool:
+        """Starts the player and the mixer thread (if not running); False if mpv can't be started."""
+        with self._start_lock:
+            return self._start()
+
+    def _start(self) -> bool:
+        # Called with _start_lock held
+        if self.process is not None and self.process.poll() is None:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            self.process = subprocess.Popen(
+                self.player_cmd, stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            logger.error(f"Audio engine can't start the player: {e}")
+            self._retry_at = time.monotonic() + RESTART_BACKOFF
+            self.process = None
+            return False
+        threading.Thread(target=self._run, args=(self.process,), name="audio-engine", daemon=True).start()
+        return True
+
+    def _run(self, process: subprocess.Popen) -> None:
+        lead = int(AUDIO_ENGINE_LEAD * self.rate)
+        clock_start = time.monotonic()
+        frames_at_start = self._frame
+        active_at = clock_start  # Last time something was left to play
+        while process.poll() is None:
+            due = frames_at_start + int((time.monotonic() - clock_start) * self.rate) + lead
+            count = due - self._frame
+            if count > lead * 4:
+                # Fell behind (player stalled or machine busy): don't dump a backlog, pick up from now
+                self.stats["underruns"] += 1
+                clock_start = time.monotonic()
+                frames_at_start = self._frame
+                count = lead
+            if count > 0:
+                block = self._mix(count)
+                try:
+                    process.stdin.write(block.tobytes())
+                    process.stdin.flush()
+                except (BrokenPipeError, OSError, ValueError):
+                    break
+            now = time.monotonic()
+            if self._voices or self._pending:
+                active_at = now
+            elif self.idle_timeout and now - active_at > self.idle_timeout and self._stop_if_idle(process):
+                return
+            time.sleep(BLOCK_SECONDS)
+        with self._start_lock:
+            if self.process is process:
+                # Not closed by us: the next announcement starts a new player
+                logger.warning("Audio engine player exited")
+                self.process = None
+                self.stats["restarts"] += 1
+
+    def _stop_if_idle(self, process: subprocess.Popen) -> bool:
+        """Closes the player unless something was scheduled meanwhile."""
+        with self._start_lock:  # Announcements start the player and schedule under this lock
+            with self._lock:
+                if self._voices or self._pending:
+                    return False
+            if self.process is not process:
+                return False
+            self.process = None
+            self.stats["idle_stops"] += 1
+        logger.info(f"Audio engine idle for {self.idle_timeout:.0f}s, player closed")
+        _close_player(process)
+        return True
+
+    def _mix(self, count: int) -> np.ndarray:
+        """The next count frames of the stream as interleaved int16."""
+        out = np.zeros((count, CHANNELS), dtype=np.float32)
+        with self._lock:
+            start, end = self._frame, self._frame + count
+            ramp = DUCK_RAMP_SECONDS * self.rate
+            for voice in self._voices:
+                lo, hi = max(start, voice.start), min(end, voice.end)
+                if lo >= hi:
+                    continue
+                segment = voice.samples[lo - voice.start:hi - voice.start]
+                if voice.duck_at is not None and hi > voice.duck_at:
+                    frames = np.arange(lo, hi, dtype=np.float32)
+                    gain = 1 - (1 - AUDIO_DUCK_GAIN) * np.clip((frames - voice.duck_at) / ramp, 0, 1)
+                    segment = segment * gain[:, None]
+                out[lo - start:hi - start] += segment
+            self._voices = [voice for voice in self._voices if voice.end > end]
+            while self._pending and self._pending[0] <= end:
+                self._pending.popleft()
+            self._frame = end
+        np.clip(out, -1, 1, out=out)
+        return (out * 32767).astype("<i2")
+
+    # ---- playback ----
+
+    def _schedule(self, parts: List[tuple]) -> bool:
+        """Schedules (offset seconds, float32 samples) parts as one announcement."""
+        with self._lock:
+            now = self._frame
+            start = now
+            busy = self._busy_until > now
+            if busy and self.overlap == "queue":
+                if len(self._pending) >= AUDIO_QUEUE_MAX:
+                    self.stats["dropped"] += 1
+                    logger.info("Audio engine queue full, announcement dropped")
+                    return False
+                start = self._busy_until
+                self._pending.append(start)
+                self.stats["queued"] += 1
+            elif busy:
+                for voice in self._voices:
+                    if voice.duck_at is None:
+                        voice.duck_at = now
+                self.stats["ducked"] += 1
+            for offset, samples in parts:
+                voice = Voice(start + int(round(offset * self.rate)), samples)
+                self._voices.append(voice)
+                self._busy_until = max(self._busy_until, voice.end)
+            self.stats["announcements"] += 1
+        return True
+
+    def _play(self, parts: List[tuple]) -> bool:
+        """Starts the player if needed and schedules parts; False if the engine can't play."""
+        with self._start_lock:  # So an idle stop can't close the player between the two
+            if not self._start():
+                return False
+            return self._schedule(parts) if parts else True
+
+    def announce(self, intro_path: str, voice_path: str = "", delay: float = AUDIO_OVERLAY_DELAY) -> bool:
+        """Plays intro with the voice mixed in delay seconds later; False if the engine can't play."""
+        parts = []
+        intro = self.clip(intro_path)
+        if intro is not None:
+            parts.append((0.0, intro.render(self.rate)))
+        voice = self.clip(voice_path) if voice_path else None
+        if voice is not None:
+            parts.append((delay if intro is not None else 0.0, voice.render(self.rate)))
+        return self._play(parts)
+
+    def play_buffer(self, samples: np.ndarray) -> bool:
+        """Plays an already mixed int16 stereo buffer at the engine rate; False if the engine can't play."""
+        return self._play([(0.0, samples.astype(np.float32) / 32768)])
+
+    def play(self, path: str) -> bool:
+        """Plays one clip; False if the engine can't play."""
+        return self.announce(path, "")
+
+    def close(self) -> None:
+        """Stops the player."""
+        with self._start_lock:
+            process, self.process = self.process, None
+        if process is not None:
+            _close_player(process)
+
+
+def _close_player(process: subprocess.Popen) -> None:
+    try:
+        process.stdin.close()  # mpv plays what it has buffered and exits
+        process.wait(timeout=1)
+    except (OSError, subprocess.TimeoutExpired):
+        process.terminate()
+
+
+audio_engine = AudioEngine()
@@ -0,0 +1,68 @@
+"""
+Clocks the tracker loop runs on.
+
+The live tracker uses SystemClock. Replays use VirtualClock, where sleeping
+just moves time forward, so hours of history run in seconds.
+"""
+
+import time
+from typing import Callable, List, Optional
+
+
+class SystemClock:
+    """Real time."""
+
+    virtual = False
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Simulated time that only advances when someone sleeps.
+
+    Timers registered with on_advance are called with the current time while
+    time moves forward, and return the next time they need to run (or None),
+    so a sleep stops at each of those moments instead of skipping past them.
+    """
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0):
+        self.start = start
+        self.now = 0.0  # Seconds since start
+        self.timers: List[Callable[[float], Optional[float]]] = []
+
+    def time(self) -> float:
+        return self.start + self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def on_advance(self, timer: Callable[[float], Optional[float]]) -> None:
+        """Registers a timer; it receives and returns times on the time() scale."""
+        self.timers.append(timer)
+
+    def _fire(self) -> Optional[float]:
+        wakes = [wake for wake in (timer(self.time()) for timer in self.timers) if wake is not None]
+        return min(wakes) if wakes else None
+
+    def sleep(self, seconds: float) -> None:
+        target = self.now + max(0.0, seconds)
+        while True:
+            wake = self._fire()
+            if wake is None or wake - self.start >= target or wake - self.start <= self.now:
+                break
+            self.now = wake - self.start
+        self.now = target
+        self._fire()
+
+
+system_clock = SystemClock()
@@ -12,7 +12,9 @@ CORE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(CORE_DIR)
 AUDIO_DIR = os.path.join(PROJECT_DIR, "audio")
 LOG_FILE = os.path.join(PROJECT_DIR, "log.txt")
-FOLLOWERS_FILE = os.path.join(PROJECT_DIR, "followers.txt")
+FOLLOWERS_FILE = os.path.join(PROJECT_DIR, "followers.txt")  # Legacy; migrated into the history once
+HISTORY_DB = os.path.join(PROJECT_DIR, "history.db")  # Samples, changes and rollups (SQLite)
+RAW_LOG_FILE = os.path.join(PROJECT_DIR, "raw.txt")  # Every raw reading change, before confirmation
 
 # Intro audio files
 AUDIO_GET = os.path.join(AUDIO_DIR, "get.mp3")
@@ -25,6 +27,125 @@ INSTAGRAM_USERNAME = "knowledgemaxxing"
 CHECK_INTERVAL = 1        # seconds between each check
 RETRY_INTERVAL = 5        # seconds to wait on error
 AUDIO_OVERLAY_DELAY = 1 # seconds before voice plays after intro
+UPSTREAM_REFRESH_INTERVAL = 2  # seconds between InstaStatistics cache refreshes
+FAST_PARSE_CHUNK = 8192        # bytes read per step while scanning for the follower field
+FAST_PARSE_DRAIN_LIMIT = 65536 # after an early stop, read up to this much more to keep the connection alive
+
+# ---------------------------
+# Multi-Account Settings
+# ---------------------------
+# List more than one username to track several accounts from one process
+INSTAGRAM_USERNAMES = [INSTAGRAM_USERNAME]
+ACCOUNT_CHECK_INTERVALS = {}  # Per-account cadence override, e.g. {"ishowspeed": 2}
+MAX_CONCURRENT_FETCHES = 32   # Max API requests in flight at once
+HTTP_POOL_SIZE = 32           # Keep-alive connections kept open to the API host
+ACCOUNTS_DIR = os.path.join(PROJECT_DIR, "accounts")  # Legacy stored counts per account (migrated)
+
+# Sharded mode (run_instastatistics.py --workers N): accounts split across processes
+SHARD_WORKERS = 4               # Default number of worker processes
+SHARD_MAX_WORKERS = 16          # Upper bound when splitting lagging shards
+SHARD_HEARTBEAT_TIMEOUT = 15    # Seconds without a heartbeat before a worker is restarted
+SHARD_LAG_THRESHOLD = 30        # Seconds without a sample before an account counts as lagging
+SHARD_SUPERVISE_INTERVAL = 5    # Seconds between coordinator health checks
+SHARD_ANNOUNCE_CHANGES = False  # Notifications/audio from workers (usually off for big lists)
+
+# ---------------------------
+# HTTP Client (rate limiting & backoff)
+# ---------------------------
+HTTP_RATE_LIMIT = 20   # Max requests per second per host (token bucket refill rate)
+HTTP_RATE_BURST = 20   # Requests that may go out back-to-back after a quiet period
+BACKOFF_BASE = {       # First retry delay (seconds) per error class; doubles per failure
+    "timeout": 2,
+    "connection": 5,
+    "server": 5,
+    "rate_limited": 15,
+    "client": 30,
+}
+BACKOFF_MAX = 120      # Upper bound for any retry delay (Retry-After can exceed it)
+
+# ---------------------------
+# Providers & Hedging (run_instastatistics.py --providers a,b)
+# ---------------------------
+PROVIDER_STATS_WINDOW = 200   # Recent requests kept per provider for latency/error stats
+HEDGE_MIN_SAMPLES = 20        # Samples needed before a provider's p95 is trusted
+HEDGE_DEFAULT_DELAY = 2.0     # Seconds before hedging while p95 is still unknown
+PROVIDER_REPORT_EVERY = 500   # Fetches between provider statistics log lines
+
+# ---------------------------
+# Local Fetch Cache (run_fetch_cache.py)
+# ---------------------------
+# Trackers on the same host share one cache daemon, so each username is
+# fetched from upstream at most once per refresh no matter how many watch it
+RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", "/tmp")
+FETCH_CACHE_SOCKET = os.path.join(RUNTIME_DIR, "ig-follower-fetch-cache.sock")
+FETCH_CACHE_TTL = UPSTREAM_REFRESH_INTERVAL  # Serve cached counts this long
+FETCH_CACHE_MAX_RPS = 20        # Shared cap on upstream requests per second
+FETCH_CACHE_RECONNECT = 10      # Seconds to use direct fetches after the daemon is unreachable
+
+# ---------------------------
+# Event Stream (JSON lines on a Unix socket, see core/event_stream.py)
+# ---------------------------
+EVENT_STREAM = True             # Serve change events to local subscribers
+EVENT_STREAM_SOCKET = os.path.join(RUNTIME_DIR, "ig-follower-events.sock")
+EVENT_STREAM_SEND_TIMEOUT = 0.5 # Subscribers that block longer than this are dropped
+
+# ---------------------------
+# Notification Renderer (persistent Qt process, see core/notification_daemon.py)
+# ---------------------------
+NOTIF_DAEMON = True             # False: spawn a fresh renderer per notification
+NOTIF_DAEMON_SOCKET = os.path.join(RUNTIME_DIR, "ig-follower-notify.sock")
+NOTIF_DAEMON_START_TIMEOUT = 10 # Seconds to wait for a newly started renderer
+NOTIF_DAEMON_MOVIE_CACHE = 16   # Decoded GIFs kept in the renderer
+NOTIF_DAEMON_IDLE_TIMEOUT = 1800  # Renderer exits after this many idle seconds (0 = never)
+NOTIF_DAEMON_COOLDOWN = 0.25   # Replaces NOTIFICATION_COOLDOWN with the renderer, which merges bursts itself
+NOTIF_STACK_POLICY = "stack"    # "stack" (below each other), "queue" (one at a time) or "replace"
+NOTIF_MAX_VISIBLE = 3           # Most popups on screen at once with "stack"
+
+# ---------------------------
+# OBS Overlay Server (run_overlay_server.py)
+# ---------------------------
+OVERLAY_HOST = "127.0.0.1"      # Use "0.0.0.0" to serve OBS on other machines
+OVERLAY_PORT = 8765
+OVERLAY_HEARTBEAT = 15          # Seconds between SSE keep-alives
+OVERLAY_ASSET_MAX_AGE = 86400   # Cache-Control max-age for GIFs and fonts
+OVERLAY_CLIENT_BUFFER = 256 * 1024  # Bytes a viewer may fall behind before it is dropped
+
+# Connectivity is inferred from real fetch errors; after this many connection
+# failures in a row the tracker pauses and probes with a cheap TCP connect
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_PROBE_INTERVAL = 10   # seconds between probes while offline
+BREAKER_PROBE_HOST = "backend.instastatistics.com"
+
+# Phase-locked polling: learn when the upstream cache refreshes and poll just after it
+PHASE_LOCKED_POLLING = True
+SCHEDULER_GUARD = 0.15             # seconds to wait past the estimated refresh
+SCHEDULER_LOCK_UNCERTAINTY = 0.25  # phase estimate (± seconds) considered locked
+SCHEDULER_DRIFT = 0.002            # seconds of uncertainty added per unconfirmed poll to follow drift
+SCHEDULER_PROBE_EVERY = 30         # locked polls between probes sent just before the refresh
+SCHEDULER_REPORT_EVERY = 300       # polls between phase estimate log lines
+
+# Change confirmation: upstream counts sometimes flap (+1 then -1 within seconds),
+# so a new value must be read this many polls in a row before it counts as a change
+CONFIRM_READINGS = 2   # 1 = every raw change is reported immediately
+CONFIRM_BAND = 2       # Changes larger than this (absolute) skip confirmation; None = always confirm
+CONFIRM_REPORT_EVERY = 300  # Polls between change confirmation log lines
+
+# History store: writes are batched and committed by a background thread
+HISTORY_BATCH_SIZE = 500            # Max rows per transaction
+HISTORY_FLUSH_INTERVAL = 1.0        # Max seconds a row waits before it is committed
+HISTORY_SAMPLE_RETENTION_DAYS = 90  # Raw samples kept this long (None = forever); rollups and changes are kept
+
+# Rolling analytics (gain/loss windows, trend, milestone ETA, anomaly flags)
+ANALYTICS_CAPACITY = None     # Max samples kept per account (None = the longest window at the poll interval)
+MULTI_ANALYTICS = False       # Also keep analytics per account in the multi-account/sharded trackers
+ANALYTICS_WINDOWS = {"1m": 60, "10m": 600, "1h": 3600}
+ANALYTICS_TREND_TAU = 600     # Seconds; time constant of the EWMA trend
+ANALYTICS_IN_NOTIFICATION = True  # Append the trend/milestone ETA to notifications
+MILESTONE_STEP = None         # Round-number step for milestones (None = auto from the count)
+ANOMALY_TAU = 300             # Seconds; time constant of the step mean/variance
+ANOMALY_Z = 6                 # Deviations from the mean step that count as a spike/drop
+ANOMALY_MIN_DELTA = 5         # Ignore steps smaller than this
+ANOMALY_WARMUP = 30           # Samples before anomalies are flagged
 
 # Note: No artificial thresholds - works for any follower count
 # ---------------------------
@@ -35,14 +156,30 @@ GAIN_PNG_SIZE = 100   # Size of gain.png (pixels)
 LOSS_GIF_SIZE = 150   # Size of loss.gif (pixels)
 LOSS_PNG_SIZE = 100   # Size of loss.png (pixels)
 
+# Pre-scaled GIFs (core/assets.py, needs Pillow; build with scripts/build_assets.py)
+ASSET_CACHE_DIR = os.path.join(PROJECT_DIR, ".cache", "assets")
+ASSET_PREBUILD = True       # The renderer builds missing/outdated entries when it starts
+ASSET_MAX_FRAMES = None     # Drop frames evenly above this many (None = keep all)
+ASSET_PALETTE_COLORS = 256  # Fewer colors = smaller files
+
+# Asset catalog (core/assets.py): GIFs are picked from a shuffle bag, so each plays before any repeats
+ASSET_WATCH = True          # Pick up added/removed GIFs without a restart (inotify, else polling)
+ASSET_WATCH_INTERVAL = 5    # Seconds between folder checks when polling
+ASSET_WEIGHTS = {}          # File name -> times in the bag, e.g. {"party.gif": 3, "rare.gif": 0 (never)}
+
 # Position from top-right corner (pixels)
 # Decrease NOTIF_RIGHT_OFFSET to move more right (closer to edge)
 # Decrease NOTIF_TOP_OFFSET to move more up (closer to top)
 NOTIF_RIGHT_OFFSET = -20  # Distance from right edge
 NOTIF_TOP_OFFSET = 0    # Distance from top edge
 
-# Cooldown after notification (seconds) - prevents overlapping notifications
+# Cooldown after notification (seconds) - prevents overlapping notifications.
+# Polling continues meanwhile; changes during the cooldown are merged into one.
 NOTIFICATION_COOLDOWN = 5  # Should be >= notification duration (~5s) + buffer
+AUDIO_COOLDOWN = 5         # Same for audio announcements (intro + voice length)
+EVENT_QUEUE_SIZE = 1000    # Max queued events per non-coalescing consumer
+NOTIFY_METRICS = ["followers"]  # Metrics that show notifications (others are logged + stored),
+                                # e.g. ["followers", "following", "posts"]
 
 # Font settings
 NOTIF_FONT_FAMILY = "Arial Black"  # Font family (e.g., "Arial", "Impact", "Comic Sans MS")
@@ -55,3 +192,21 @@ NOTIF_LINE_SPACING = 1             # Spacing between lines (pixels, lower = tigh
 # ---------------------------
 # Directory containing generated TTS files
 GENERATED_AUDIO_DIR = os.path.join(AUDIO_DIR, "generated")
+
+# ---------------------------
+# Audio Engine
+# ---------------------------
+# One long-lived mpv plays a stream mixed in-process; clips stay decoded in memory
+AUDIO_ENGINE = True          # False: start mpv per clip (intro, then voice from a timer thread)
+AUDIO_ENGINE_RATE = 48000    # Sample rate of the mixed stream (clips are resampled to it)
+AUDIO_ENGINE_LEAD = 0.05     # Seconds of audio written ahead of playback (latency vs. dropouts)
+AUDIO_ENGINE_IDLE_TIMEOUT = 300  # Player closes (releasing the audio device) after this many idle seconds (0 = never)
+AUDIO_OVERLAP = "queue"      # Announcement during another: "queue" (play after it) or "duck" (play over it)
+AUDIO_DUCK_GAIN = 0.3        # Volume the earlier announcement drops to when ducked
+AUDIO_QUEUE_MAX = 3          # Announcements waiting at most with "queue" (more are dropped)
+
+# Pre-mixed announcements (core/premix.py; build all with scripts/build_premix.py)
+AUDIO_PREMIX = True          # Play intro + voice as one cached buffer instead of mixing per event
+AUDIO_PREMIX_DIR = os.path.join(PROJECT_DIR, ".cache", "audio")
+AUDIO_PREMIX_MEMORY_MB = 32  # Pre-mixed buffers kept in memory (~0.85 MB each at 48 kHz)
+AUDIO_PREMIX_DISK_MB = 256   # Pre-mixed WAVs kept on disk (least recently used removed first)
@@ -0,0 +1,88 @@
+"""
+Change confirmation between raw readings and change events.
+
+Upstream counts sometimes jitter (+1 then -1 within seconds). Reporting every
+raw difference means a notification, audio and a storage write for a change
+that is undone a moment later. ChangeConfirmer holds a new value back until it
+has been read CONFIRM_READINGS times in a row (or it moves further than
+CONFIRM_BAND at once), so offsetting flaps net out to nothing.
+"""
+
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from .config import CONFIRM_READINGS, CONFIRM_BAND, CONFIRM_REPORT_EVERY
+from .events import ChangeEvent
+from .logger import logger, raw_logger
+
+
+class ChangeConfirmer:
+    """
+    Confirms raw changes per (account, metric) before they become events.
+
+    Args:
+        readings: Consecutive identical readings needed to confirm a new value.
+        band: Changes larger than this are confirmed immediately (None: never).
+        report_every: Polls between report lines (see count_poll).
+        raw_log: Logger for every raw reading change (None: not logged).
+    """
+
+    def __init__(self, readings: int = CONFIRM_READINGS, band: Optional[int] = CONFIRM_BAND,
+                 report_every: int = CONFIRM_REPORT_EVERY, raw_log: Optional[logging.Logger] = raw_logger):
+        self.readings = max(1, readings)
+        self.band = band
+        self.report_every = max(1, report_every)
+        self.polls = 0
+        self.raw_log = raw_log
+        self.confirmed = 0
+        self.suppressed = 0  # Raw changes that never became an event
+        self._pending: Dict[Tuple[str, str], Tuple[int, int]] = {}  # key -> (candidate, times read)
+        self._last_raw: Dict[Tuple[str, str], int] = {}
+
+    def observe(
+        self, account: str, metric: str, current: int, value: int, now: Optional[float] = None
+    ) -> Optional[ChangeEvent]:
+        """
+        Feeds one reading; returns a change event once the new value is confirmed.
+
+        Args:
+            current: The last confirmed (stored) value.
+            value: The value just read.
+            now: Time of the reading (default: time.time()).
+        """
+        key = (account, metric)
+        if self.raw_log and self._last_raw.get(key) != value:
+            self.raw_log.info(f"@{account} {metric} {value}")
+            self._last_raw[key] = value
+
+        if value == current:
+            if self._pending.pop(key, None) is not None:
+                self.suppressed += 1
+                logger.info(f"@{account}: {metric} flapped back to {current}, change suppressed "
+                            f"({self.suppressed} so far)")
+            return None
+
+        candidate, seen = self._pending.get(key, (None, 0))
+        if candidate == value:
+            seen += 1
+        else:
+            if candidate is not None:
+                self.suppressed += 1  # Superseded before it was confirmed; the net change carries on
+            seen = 1
+
+        if seen >= self.readings or (self.band is not None and abs(value - current) > self.band):
+            self._pending.pop(key, None)
+            self.confirmed += 1
+            return ChangeEvent(account, metric, current, value, now if now is not None else time.time())
+
+        self._pending[key] = (value, seen)
+        return None
+
+    def count_poll(self) -> bool:
+        """Counts one successful poll; True every report_every polls, when a report line is due."""
+        self.polls += 1
+        return self.polls % self.report_every == 0
+
+    def report(self) -> str:
+        return f"Change confirmation: {self.confirmed} confirmed, {self.suppressed} raw changes suppressed"
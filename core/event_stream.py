@@ -0,0 +1,97 @@
+"""
+Local pub/sub stream of change events.
+
+The tracker serves its change events on a Unix socket as JSON lines, one
+object per event (see ChangeEvent.to_dict), e.g.:
+
+    {"type":"change","account":"ishowspeed","metric":"followers","old":100,"new":103,
+     "delta":3,"detected_at":1760000000.12,"published_at":1760000000.13}
+
+Any number of dashboards, bots or recorders can connect and read; the stream
+is push-only, so subscribers never poll the log file or the API. Subscribers
+that cannot keep up are disconnected rather than slowing the tracker down.
+"""
+
+import json
+import socket
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from .config import EVENT_STREAM_SOCKET, EVENT_STREAM_SEND_TIMEOUT
+from .events import ChangeEvent
+from .local_socket import listen_unix, release_unix
+from .logger import logger
+
+
+def encode(event: ChangeEvent) -> bytes:
+    """One compact JSON line for an event."""
+    record = event.to_dict()
+    record["published_at"] = time.time()
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+class EventStreamServer:
+    """Accepts subscribers on a Unix socket and fans every event out to them."""
+
+    def __init__(self, socket_path: str = EVENT_STREAM_SOCKET):
+        self.socket_path = socket_path
+        self.clients: List[socket.socket] = []
+        self.published = 0
+        self._lock = threading.Lock()
+        self._listener: Optional[socket.socket] = None
+
+    def start(self) -> bool:
+        """Starts accepting subscribers; returns False if the socket is taken."""
+        listener = listen_unix(self.socket_path)
+        if listener is None:
+            logger.warning(f"Event stream {self.socket_path} is served by another tracker; not streaming")
+            return False
+        self._listener = listener
+        threading.Thread(target=self._accept, name="event-stream", daemon=True).start()
+        logger.info(f"Event stream on {self.socket_path}")
+        return True
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self._listener.accept()
+            except OSError:
+                return  # Listener closed
+            client.settimeout(EVENT_STREAM_SEND_TIMEOUT)
+            with self._lock:
+                self.clients.append(client)
+
+    def publish(self, event: ChangeEvent) -> None:
+        """Sends an event to every subscriber (encoded once)."""
+        line = encode(event)
+        with self._lock:
+            self.published += 1
+            for client in list(self.clients):
+                try:
+                    client.sendall(line)
+                except OSError:
+                    # Gone, or too slow to drain its socket buffer
+                    self.clients.remove(client)
+                    client.close()
+
+    def close(self) -> None:
+        if self._listener:
+            self._listener.close()
+            self._listener = None
+            release_unix(self.socket_path)
+        with self._lock:
+            for client in self.clients:
+                client.close()
+            self.clients.clear()
+
+
+def subscribe(socket_path: str = EVENT_STREAM_SOCKET) -> Iterator[ChangeEvent]:
+    """Yields change events from a running tracker until the stream closes."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    with sock, sock.makefile("rb") as stream:
+        for line in stream:
+            record = json.loads(line)
+            if record.get("type") == "change":
+                yield ChangeEvent.from_dict(record)
@@ -0,0 +1,184 @@
+"""
+In-process event bus between detection and presentation.
+
+The poll loop publishes typed change events and returns immediately.
+Each consumer (notifications, audio, storage...) has its own thread, queue,
+coalescing policy and cooldown, so a slow consumer never delays polling.
+Replays skip the threads and drive the same consumers with pump().
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Collection, List, Optional
+
+from .config import EVENT_QUEUE_SIZE
+from .logger import logger
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """A detected change in one of an account's profile metrics."""
+    account: str
+    metric: str  # "followers", "following", "posts"...
+    old: int
+    new: int
+    detected_at: float = field(default_factory=time.time)
+
+    @property
+    def delta(self) -> int:
+        return self.new - self.old
+
+    def merge(self, later: "ChangeEvent") -> "ChangeEvent":
+        """Combines this event with a later one for the same account and metric."""
+        return ChangeEvent(self.account, self.metric, self.old, later.new, self.detected_at)
+
+    def to_dict(self) -> dict:
+        """Wire record used by the event stream."""
+        return {
+            "type": "change",
+            "account": self.account,
+            "metric": self.metric,
+            "old": self.old,
+            "new": self.new,
+            "delta": self.delta,
+            "detected_at": self.detected_at,
+        }
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "ChangeEvent":
+        return cls(record["account"], record["metric"], record["old"], record["new"], record["detected_at"])
+
+
+class Consumer:
+    """
+    Runs a handler for bus events on its own thread.
+
+    Args:
+        name: Name used in logs and thread names.
+        handler: Called with each event (on the consumer thread); may return the
+            cooldown to wait after that event instead of the default.
+        coalesce: Merge pending events per account and metric into one net change; otherwise
+            events are handled one by one and the oldest are dropped when the queue is full.
+        cooldown: Seconds to wait after each handled event; events arriving
+            meanwhile queue up (and are merged when coalescing).
+        metrics: Only accept events for these metrics (default: all).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[ChangeEvent], None],
+        coalesce: bool = True,
+        cooldown: float = 0,
+        metrics: Optional[Collection[str]] = None
+    ):
+        self.name = name
+        self.handler = handler
+        self.coalesce = coalesce
+        self.cooldown = cooldown
+        self.metrics = set(metrics) if metrics is not None else None
+        self.stats = {"received": 0, "handled": 0, "merged": 0, "dropped": 0, "latency_total": 0.0, "latency_max": 0.0}
+        self._pending = OrderedDict() if coalesce else deque()
+        self._ready_at = 0.0  # Earliest time the next event may be handled (pump mode)
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"consumer-{name}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def offer(self, event: ChangeEvent) -> None:
+        """Queues an event without blocking."""
+        if self.metrics is not None and event.metric not in self.metrics:
+            return
+        with self._cond:
+            self.stats["received"] += 1
+            if self.coalesce:
+                key = (event.account, event.metric)
+                earlier = self._pending.pop(key, None)
+                if earlier is not None:
+                    self.stats["merged"] += 1
+                    event = earlier.merge(event)
+                self._pending[key] = event
+            else:
+                if len(self._pending) >= EVENT_QUEUE_SIZE:
+                    self._pending.popleft()
+                    self.stats["dropped"] += 1
+                    logger.warning(f"{self.name} consumer is falling behind, dropped oldest event")
+                self._pending.append(event)
+            self._cond.notify()
+
+    def _pop(self) -> ChangeEvent:
+        if self.coalesce:
+            return self._pending.popitem(last=False)[1]
+        return self._pending.popleft()
+
+    def _take(self) -> ChangeEvent:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            return self._pop()
+
+    def _dispatch(self, event: ChangeEvent, now: float) -> Optional[float]:
+        """Runs the handler; returns the cooldown to wait, or None when there was nothing to handle."""
+        if event.delta == 0:
+            return None  # Offsetting changes merged to nothing
+        latency = now - event.detected_at
+        self.stats["latency_total"] += latency
+        self.stats["latency_max"] = max(self.stats["latency_max"], latency)
+        cooldown = self.cooldown
+        try:
+            result = self.handler(event)
+            self.stats["handled"] += 1
+            if result is not None:
+                cooldown = result
+        except Exception as e:
+            logger.error(f"{self.name} consumer error: {e}")
+        return cooldown
+
+    def _run(self) -> None:
+        while True:
+            cooldown = self._dispatch(self._take(), time.time())
+            if cooldown:
+                time.sleep(cooldown)
+
+    def pump(self, now: float) -> Optional[float]:
+        """
+        Handles whatever is due at `now` without a thread (used by replays).
+        Returns the time the next pending event becomes due, or None.
+        """
+        while now >= self._ready_at:
+            with self._cond:
+                if not self._pending:
+                    return None
+                event = self._pop()
+            cooldown = self._dispatch(event, now)
+            if cooldown is not None:
+                self._ready_at = now + cooldown
+        return self._ready_at if self._pending else None
+
+
+class EventBus:
+    """Fans published events out to every consumer."""
+
+    def __init__(self, consumers: List[Consumer] = None):
+        self.consumers = list(consumers or [])
+
+    def subscribe(self, consumer: Consumer) -> Consumer:
+        self.consumers.append(consumer)
+        return consumer
+
+    def start(self) -> "EventBus":
+        for consumer in self.consumers:
+            consumer.start()
+        return self
+
+    def publish(self, event: ChangeEvent) -> None:
+        for consumer in self.consumers:
+            consumer.offer(event)
+
+    def pump(self, now: float) -> Optional[float]:
+        """Drives every consumer in the calling thread; returns the next due time, or None."""
+        wakes = [wake for wake in (consumer.pump(now) for consumer in self.consumers) if wake is not None]
+        return min(wakes) if wakes else None
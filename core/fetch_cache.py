@@ -0,0 +1,219 @@
+"""
+Local request-coalescing cache in front of an API fetch function.
+
+The daemon listens on a Unix socket and speaks newline-delimited JSON:
+    request:  {"username": "ishowspeed"}
+    response: {"count": 123456, "metrics": {"followers": 123456, "following": 10, ...},
+               "stamp": "<upstream cache stamp>"}   (count and metrics are null on error)
+
+"count" is the follower count, kept for older clients. "stamp" is the
+upstream cache stamp of the reading, so phase-locked polling keeps working
+through the cache. Identical in-flight requests share one upstream call
+(singleflight), and results are served from memory for FETCH_CACHE_TTL seconds.
+A second daemon on the same socket exits instead of taking it over.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from .config import (
+    FETCH_CACHE_SOCKET, FETCH_CACHE_TTL, FETCH_CACHE_MAX_RPS,
+    FETCH_CACHE_RECONNECT, MAX_CONCURRENT_FETCHES
+)
+from .local_socket import listen_unix, release_unix
+from .logger import logger
+
+Metrics = Dict[str, int]
+Fetch = Callable[[str], Union[int, Metrics, None]]  # A follower count or a metrics record
+Reading = Tuple[Optional[Metrics], Optional[str]]  # (metrics, upstream cache stamp)
+
+
+def _as_metrics(sample: Union[int, Metrics, None]) -> Optional[Metrics]:
+    if sample is None or isinstance(sample, dict):
+        return sample
+    return {"followers": sample}
+
+
+class FetchCacheServer:
+    """
+    Singleflight + TTL cache shared by every tracker on the host.
+
+    Args:
+        fetch: Upstream fetch for a username (metrics record or follower count).
+        get_cache_stamp: Optional function returning a username's last upstream cache stamp.
+    """
+
+    def __init__(self, fetch: Fetch, ttl: float = FETCH_CACHE_TTL,
+                 get_cache_stamp: Optional[Callable[[str], Optional[str]]] = None):
+        self.fetch = fetch
+        self.get_cache_stamp = get_cache_stamp
+        self.ttl = ttl
+        self.cache: Dict[str, Tuple[Reading, float]] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES, thread_name_prefix="upstream")
+        self._next_upstream = 0.0
+        self.stats = {"hits": 0, "coalesced": 0, "upstream": 0}
+
+    async def _throttle(self) -> None:
+        """Spaces upstream requests to at most FETCH_CACHE_MAX_RPS across all callers."""
+        now = time.monotonic()
+        slot = max(now, self._next_upstream)
+        self._next_upstream = slot + 1.0 / FETCH_CACHE_MAX_RPS
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _read(self, username: str) -> Reading:
+        """Upstream fetch plus the stamp it left (on an executor thread)."""
+        metrics = _as_metrics(self.fetch(username))
+        stamp = self.get_cache_stamp(username) if self.get_cache_stamp and metrics is not None else None
+        return metrics, stamp
+
+    async def _fetch_upstream(self, username: str) -> Reading:
+        await self._throttle()
+        self.stats["upstream"] += 1
+        reading = await asyncio.get_running_loop().run_in_executor(self.executor, self._read, username)
+        if reading[0] is not None:
+            self.cache[username] = (reading, time.monotonic())
+        return reading
+
+    async def get(self, username: str) -> Reading:
+        cached = self.cache.get(username)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            self.stats["hits"] += 1
+            return cached[0]
+
+        pending = self.inflight.get(username)
+        if pending:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(self._fetch_upstream(username))
+        self.inflight[username] = future
+        future.add_done_callback(lambda _: self.inflight.pop(username, None))
+        return await asyncio.shield(future)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    username = json.loads(line)["username"]
+                    metrics, stamp = await self.get(username)
+                except Exception as e:
+                    logger.error(f"Fetch cache request error: {e}")
+                    metrics, stamp = None, None
+                reply = {"count": metrics.get("followers") if metrics else None, "metrics": metrics, "stamp": stamp}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(60)
+            logger.info(f"Fetch cache: {self.stats['hits']} hits, {self.stats['coalesced']} coalesced, "
+                        f"{self.stats['upstream']} upstream requests, {len(self.cache)} usernames")
+
+    async def serve(self, socket_path: str = FETCH_CACHE_SOCKET) -> bool:
+        """Serves until cancelled; False right away if another daemon is serving the socket."""
+        sock = listen_unix(socket_path)
+        if sock is None:
+            logger.error(f"Fetch cache {socket_path} is already served by another daemon; exiting")
+            return False
+        try:
+            server = await asyncio.start_unix_server(self._handle_client, sock=sock)
+            logger.info(f"Fetch cache listening on {socket_path} (TTL {self.ttl}s)")
+            async with server:
+                await asyncio.gather(server.serve_forever(), self._report())
+        finally:
+            sock.close()
+            release_unix(socket_path)
+        return True
+
+
+def run_fetch_cache(fetch: Fetch, socket_path: str = FETCH_CACHE_SOCKET,
+                    get_cache_stamp: Optional[Callable[[str], Optional[str]]] = None) -> None:
+    """Runs the cache daemon until interrupted."""
+    try:
+        if not asyncio.run(FetchCacheServer(fetch, get_cache_stamp=get_cache_stamp).serve(socket_path)):
+            raise SystemExit(1)
+    except KeyboardInterrupt:
+        logger.info("Fetch cache stopped.")
+
+
+class FetchCacheClient:
+    """
+    Tracker-side client. Keeps one connection per thread and falls back to
+    fetching directly while the daemon is not running.
+
+    Args:
+        fallback: Direct fetch used while the daemon is down.
+        fallback_stamp: Cache stamp getter matching fallback.
+    """
+
+    def __init__(self, fallback: Fetch, socket_path: str = FETCH_CACHE_SOCKET, timeout: float = 20,
+                 fallback_stamp: Optional[Callable[[str], Optional[str]]] = None):
+        self.fallback = fallback
+        self.fallback_stamp = fallback_stamp
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.stamps: Dict[str, str] = {}  # Latest upstream cache stamp per username
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            conn = (sock, sock.makefile("rb"))
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn:
+            conn[1].close()
+            conn[0].close()
+
+    def fetch(self, username: str) -> Optional[Metrics]:
+        """Profile metrics for a username (None on error)."""
+        if time.monotonic() < self._down_until:
+            return self._fetch_directly(username)
+        try:
+            sock, reader = self._connection()
+            sock.sendall(json.dumps({"username": username}).encode() + b"\n")
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("fetch cache closed the connection")
+            reply = json.loads(line)
+        except (OSError, ValueError) as e:
+            self._drop_connection()
+            self._down_until = time.monotonic() + FETCH_CACHE_RECONNECT
+            logger.warning(f"Fetch cache unavailable ({e}), fetching directly")
+            return self._fetch_directly(username)
+        if reply.get("stamp"):
+            self.stamps[username] = reply["stamp"]
+        return reply.get("metrics") or _as_metrics(reply.get("count"))  # Older daemons only send "count"
+
+    def _fetch_directly(self, username: str) -> Optional[Metrics]:
+        metrics = _as_metrics(self.fallback(username))
+        stamp = self.fallback_stamp(username) if self.fallback_stamp else None
+        if stamp:
+            self.stamps[username] = stamp
+        return metrics
+
+    def get_cache_stamp(self, username: str) -> Optional[str]:
+        """Upstream cache stamp of the last reading for a username."""
+        return self.stamps.get(username)
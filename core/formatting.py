@@ -0,0 +1,39 @@
+"""
+Text formatting for change announcements.
+
+Qt-free, so both the tracker and the notification renderer (which re-renders
+popups when it merges changes into them) can use it.
+"""
+
+from typing import List, Tuple
+
+from .events import ChangeEvent
+
+# Overlay text: two lines of (text, color name) segments
+Segments = Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]
+
+
+def format_change_message(event: ChangeEvent) -> str:
+    """Formats a change as one line of text (logs and plain notifications)."""
+    if event.metric != "followers":
+        return f"{event.metric.capitalize()}: {event.delta:+d}. Total: {event.new}"
+    amount = abs(event.delta)
+    unit = "follower" if amount == 1 else "followers"
+    verb = "got" if event.delta > 0 else "lost"
+    return f"You {verb} {amount} {unit}. Total: {event.new}"
+
+
+def change_segments(event: ChangeEvent, headline: str = "") -> Segments:
+    """Builds the overlay's two lines of (text, color name) segments for a change."""
+    color = "GREEN" if event.delta > 0 else "RED"
+    if event.metric == "followers":
+        amount = abs(event.delta)
+        unit = "follower" if amount == 1 else "followers"
+        verb = "got" if event.delta > 0 else "lost"
+        line1 = [("You ", "WHITE"), (f"{verb} {amount}", color), (f" {unit}", "WHITE")]
+    else:
+        line1 = [(f"{event.metric.capitalize()} ", "WHITE"), (f"{event.delta:+d}", color)]
+    line2 = [("Total: ", "WHITE"), (str(event.new), color)]
+    if headline:
+        line2.append((f"  {headline}", "WHITE"))
+    return line1, line2
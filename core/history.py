@@ -0,0 +1,279 @@
+"""
+Durable time-series history of samples and change events (SQLite, WAL mode).
+
+- `samples` holds every successful reading, `changes` every stored change
+  (the latest change row is the stored value the tracker compares against).
+- Writes go through a background thread and are committed in batches.
+- Minute/hour/day rollups are updated incrementally in the same transaction,
+  so range aggregates over years only touch a few thousand rollup rows.
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import (
+    HISTORY_DB, HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_SAMPLE_RETENTION_DAYS
+)
+from .logger import logger
+
+# Rollup name -> bucket size in seconds
+ROLLUPS = {"minute": 60, "hour": 3600, "day": 86400}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    account TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (account, metric, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changes (
+    account TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    ts REAL NOT NULL,
+    old INTEGER,
+    new INTEGER NOT NULL,
+    PRIMARY KEY (account, metric, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    high INTEGER NOT NULL,
+    first INTEGER NOT NULL,
+    last INTEGER NOT NULL,
+    PRIMARY KEY (resolution, account, metric, bucket)
+) WITHOUT ROWID;
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, account, metric, bucket) DO UPDATE SET
+    count = count + excluded.count,
+    total = total + excluded.total,
+    low = MIN(low, excluded.low),
+    high = MAX(high, excluded.high),
+    last = excluded.last
+"""
+
+Sample = namedtuple("Sample", "account metric ts value")
+Change = namedtuple("Change", "account metric ts old new")
+
+
+def connect(path: str = HISTORY_DB) -> sqlite3.Connection:
+    """Opens the history database in WAL mode, creating the schema if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # Durable across app crashes; WAL keeps the file consistent
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _rollup_rows(samples: List[Sample]) -> Iterable[Tuple]:
+    """Aggregates a batch of samples into rollup rows (samples must be in time order)."""
+    buckets: Dict[Tuple, list] = {}
+    for s in samples:
+        for size in ROLLUPS.values():
+            key = (size, s.account, s.metric, int(s.ts // size) * size)
+            agg = buckets.get(key)
+            if agg is None:
+                buckets[key] = [1, s.value, s.value, s.value, s.value, s.value]
+            else:
+                agg[0] += 1
+                agg[1] += s.value
+                agg[2] = min(agg[2], s.value)
+                agg[3] = max(agg[3], s.value)
+                agg[5] = s.value
+    return (key + tuple(agg) for key, agg in buckets.items())
+
+
+class HistoryStore:
+    """Batched writer plus query API over the history database."""
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._latest: Dict[Tuple[str, str], int] = {}  # Written-but-maybe-unflushed stored values
+        self._local = threading.local()
+        self._last_prune = 0.0
+        connect(path).close()  # Create the schema before anyone reads
+        self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # ---- writing ----
+
+    def record_sample(self, account: str, metric: str, value: int, ts: Optional[float] = None) -> None:
+        self._queue.put(Sample(account, metric, time.time() if ts is None else ts, value))
+
+    def record_change(self, account: str, metric: str, old: Optional[int], new: int, ts: Optional[float] = None) -> None:
+        self._latest[(account, metric)] = new
+        self._queue.put(Change(account, metric, time.time() if ts is None else ts, old, new))
+
+    def _run(self) -> None:
+        conn = connect(self.path)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + HISTORY_FLUSH_INTERVAL
+            stop = False
+            while len(batch) < HISTORY_BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(conn, batch)
+            if stop:
+                break
+        conn.close()
+
+    def _flush(self, conn: sqlite3.Connection, batch: list) -> None:
+        samples = sorted((i for i in batch if isinstance(i, Sample)), key=lambda s: s.ts)
+        changes = [i for i in batch if isinstance(i, Change)]
+        try:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?)", samples)
+                conn.executemany("INSERT OR REPLACE INTO changes VALUES (?, ?, ?, ?, ?)", changes)
+                conn.executemany(UPSERT_ROLLUP, _rollup_rows(samples))
+            self._prune(conn)
+        except sqlite3.Error as e:
+            logger.error(f"History write error ({len(batch)} rows lost): {e}")
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drops raw samples past the retention window (rollups and changes are kept)."""
+        if not HISTORY_SAMPLE_RETENTION_DAYS or time.monotonic() - self._last_prune < 3600:
+            return
+        self._last_prune = time.monotonic()
+        cutoff = time.time() - HISTORY_SAMPLE_RETENTION_DAYS * 86400
+        with conn:
+            conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+
+    def close(self) -> None:
+        """Flushes pending writes and stops the writer."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+
+    # ---- reading ----
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def latest(self, account: str, metric: str = "followers") -> Optional[int]:
+        """Latest stored value (an index lookup on the newest change row)."""
+        value = self._latest.get((account, metric))
+        if value is not None:
+            return value
+        row = self._reader().execute(
+            "SELECT new FROM changes WHERE account = ? AND metric = ? ORDER BY ts DESC LIMIT 1",
+            (account, metric)
+        ).fetchone()
+        return row[0] if row else None
+
+    def samples(self, account: str, metric: str = "followers", start: float = 0, end: Optional[float] = None) -> List[Sample]:
+        rows = self._reader().execute(
+            "SELECT account, metric, ts, value FROM samples "
+            "WHERE account = ? AND metric = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (account, metric, start, end or time.time() + 1)
+        )
+        return [Sample(*row) for row in rows]
+
+    def changes(self, account: str, metric: str = "followers", start: float = 0, end: Optional[float] = None) -> List[Change]:
+        rows = self._reader().execute(
+            "SELECT account, metric, ts, old, new FROM changes "
+            "WHERE account = ? AND metric = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (account, metric, start, end or time.time() + 1)
+        )
+        return [Change(*row) for row in rows]
+
+    def rollup(self, account: str, metric: str = "followers", resolution: str = "hour",
+               start: float = 0, end: Optional[float] = None) -> List[dict]:
+        """Rollup buckets in a range (bounds are rounded down to whole buckets)."""
+        size = ROLLUPS[resolution]
+        rows = self._reader().execute(
+            "SELECT bucket, count, total, low, high, first, last FROM rollups "
+            "WHERE resolution = ? AND account = ? AND metric = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (size, account, metric, int(start // size) * size, end or time.time() + 1)
+        )
+        return [
+            {"start": bucket, "count": count, "avg": total / count, "min": low, "max": high, "first": first, "last": last}
+            for bucket, count, total, low, high, first, last in rows
+        ]
+
+    def aggregate(self, account: str, metric: str = "followers", start: float = 0,
+                  end: Optional[float] = None, resolution: Optional[str] = None) -> Optional[dict]:
+        """
+        Count/avg/min/max/first/last and net change over a range.
+
+        Uses the coarsest rollup that still has ~100 buckets in the range unless
+        a resolution is given, so bounds are only as precise as that rollup.
+        """
+        end = end or time.time()
+        if resolution is None:
+            resolution = "minute"
+            for name, size in sorted(ROLLUPS.items(), key=lambda item: -item[1]):
+                if end - start >= size * 100:
+                    resolution = name
+                    break
+        buckets = self.rollup(account, metric, resolution, start, end)
+        if not buckets:
+            return None
+        count = sum(b["count"] for b in buckets)
+        return {
+            "resolution": resolution,
+            "count": count,
+            "avg": sum(b["avg"] * b["count"] for b in buckets) / count,
+            "min": min(b["min"] for b in buckets),
+            "max": max(b["max"] for b in buckets),
+            "first": buckets[0]["first"],
+            "last": buckets[-1]["last"],
+            "change": buckets[-1]["last"] - buckets[0]["first"],
+        }
+
+
+_store: Optional[HistoryStore] = None
+_store_pid: Optional[int] = None
+_store_lock = threading.Lock()
+
+
+def set_history(store: Optional[HistoryStore]) -> Optional[HistoryStore]:
+    """
+    Replaces the process-wide store (replays write to a scratch database) and
+    returns the previous one, to put back afterwards. None restores the default.
+    """
+    global _store, _store_pid
+    with _store_lock:
+        previous = _store if _store_pid == os.getpid() else None
+        _store, _store_pid = store, os.getpid()
+        return previous
+
+
+def get_history() -> HistoryStore:
+    """Process-wide history store (recreated after a fork, since the writer thread does not survive it)."""
+    global _store, _store_pid
+    with _store_lock:
+        if _store is None or _store_pid != os.getpid():
+            _store, _store_pid = HistoryStore(), os.getpid()
+        return _store
@@ -0,0 +1,164 @@
+"""
+Rate-limit-aware HTTP client around a requests.Session.
+
+- A token bucket per host caps our request rate before the provider has to.
+- 429/503 responses with Retry-After block that host until the given time.
+- Retry delays use jittered exponential backoff chosen by error class, so a
+  timeout, a dropped connection and a rate limit each back off differently.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from .config import (
+    HTTP_RATE_LIMIT, HTTP_RATE_BURST, BACKOFF_BASE, BACKOFF_MAX, RETRY_INTERVAL
+)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> None:
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class HostState:
+    """Budget and backoff state for one host."""
+
+    def __init__(self):
+        self.bucket = TokenBucket(HTTP_RATE_LIMIT, HTTP_RATE_BURST)
+        self.blocked_until = 0.0   # monotonic time; set from Retry-After
+        self.last_error: Optional[str] = None
+        self.failures = 0          # consecutive failures of any class
+        self._lock = threading.Lock()
+
+    def record(self, error: Optional[str], retry_after: Optional[float] = None) -> None:
+        """Records one outcome: None for success, else its error class (and any Retry-After)."""
+        with self._lock:
+            if error is None:
+                self.failures = 0
+            else:
+                self.failures += 1
+                if retry_after is not None:
+                    self.blocked_until = time.monotonic() + retry_after
+            self.last_error = error
+
+    def snapshot(self) -> Tuple[int, Optional[str], float]:
+        """Consistent (failures, last_error, blocked_until)."""
+        with self._lock:
+            return self.failures, self.last_error, self.blocked_until
+
+
+def classify_error(error: Optional[BaseException] = None, status: Optional[int] = None) -> str:
+    """Maps an exception or HTTP status to a backoff class."""
+    if status == 429:
+        return "rate_limited"
+    if status is not None:
+        return "server" if status >= 500 else "client"
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.ConnectionError):
+        return "connection"
+    return "other"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds from now (accepts delta-seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitedClient:
+    """Wraps a session: every GET spends a token for its host and records the outcome."""
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+        self.hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> HostState:
+        with self._lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostState()
+            return self.hosts[host]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        state = self._host(urlsplit(url).netloc)
+
+        blocked = state.blocked_until - time.monotonic()
+        if blocked > 0:
+            time.sleep(blocked)
+        state.bucket.take()
+
+        try:
+            response = self.session.get(url, **kwargs)
+        except Exception as e:
+            state.record(classify_error(e))
+            raise
+
+        if response.status_code == 200:
+            state.record(None)
+        else:
+            retry_after = None
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            state.record(classify_error(status=response.status_code), retry_after)
+        return response
+
+    def retry_delay(self, host: str) -> float:
+        """Jittered exponential backoff for the host's last error class (honors Retry-After)."""
+        failures, last_error, blocked_until = self._host(host).snapshot()
+        base = BACKOFF_BASE.get(last_error, RETRY_INTERVAL)
+        ceiling = min(BACKOFF_MAX, base * 2 ** max(0, failures - 1))
+        delay = random.uniform(ceiling / 2, ceiling)
+        return max(delay, blocked_until - time.monotonic())
+
+    def budget(self, host: str) -> dict:
+        """Current request budget for a host."""
+        state = self._host(host)
+        failures, last_error, blocked_until = state.snapshot()
+        return {
+            "tokens": round(state.bucket.available(), 2),
+            "rate": state.bucket.rate,
+            "blocked_for": round(max(0.0, blocked_until - time.monotonic()), 2),
+            "failures": failures,
+            "last_error": last_error,
+        }
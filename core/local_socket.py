@@ -0,0 +1,51 @@
+"""
+Ownership of the Unix sockets served on this host (fetch cache, event stream).
+
+A server holds an exclusive lock on "<socket>.lock" for as long as it runs.
+A second instance fails to take the lock and leaves the socket alone, and a
+socket file whose lock is free was left by a server that is gone, so it can
+be replaced. There is no window between checking and binding in which two
+servers can both decide the path is free.
+"""
+
+import fcntl
+import os
+import socket
+from typing import IO, Dict, Optional
+
+_locks: Dict[str, IO] = {}  # Socket path -> lock file held by this process
+
+
+def listen_unix(path: str) -> Optional[socket.socket]:
+    """Listening socket on path, or None if another server holds it."""
+    lock = open(f"{path}.lock", "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        if os.path.exists(path):
+            os.unlink(path)  # Stale: its server no longer holds the lock
+        sock.bind(path)
+        os.chmod(path, 0o600)
+        sock.listen()
+    except OSError:
+        sock.close()
+        lock.close()
+        raise
+    _locks[path] = lock
+    return sock
+
+
+def release_unix(path: str) -> None:
+    """Removes the socket file and gives up the path (call after closing the listener)."""
+    lock = _locks.pop(path, None)
+    if lock is None:
+        return
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    lock.close()
@@ -5,7 +5,7 @@ Logging setup for Instagram Follower Tracker.
 import logging
 from logging.handlers import RotatingFileHandler
 
-from .config import LOG_FILE
+from .config import LOG_FILE, RAW_LOG_FILE
 
 # Create logger
 logger = logging.getLogger("FollowerTracker")
@@ -27,3 +27,11 @@ console_handler.setFormatter(formatter)
 # Add handlers
 logger.addHandler(file_handler)
 logger.addHandler(console_handler)
+
+# Raw reading stream (before change confirmation), kept out of the main log
+raw_logger = logging.getLogger("FollowerTracker.raw")
+raw_logger.setLevel(logging.DEBUG)
+raw_logger.propagate = False
+raw_handler = RotatingFileHandler(RAW_LOG_FILE, maxBytes=5*1024*1024, backupCount=2, delay=True)
+raw_handler.setFormatter(formatter)
+raw_logger.addHandler(raw_handler)
@@ -0,0 +1,185 @@
+"""
+Concurrent multi-account tracker built on asyncio.
+One process polls many usernames over a single pooled HTTP session.
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Union
+
+from .config import (
+    CHECK_INTERVAL, RETRY_INTERVAL,
+    ACCOUNT_CHECK_INTERVALS, MAX_CONCURRENT_FETCHES,
+    PHASE_LOCKED_POLLING, SCHEDULER_REPORT_EVERY, MULTI_ANALYTICS
+)
+from .logger import logger
+from .storage import record_sample
+from .network import connectivity, wait_for_internet
+from .formatting import format_change_message
+from .tracker import as_metrics, create_event_bus, diff_metrics, update_analytics
+from .events import ChangeEvent, EventBus
+from .confirmation import ChangeConfirmer
+from .scheduler import PhaseLockedScheduler
+from .analytics import get_analytics
+
+
+class AccountState:
+    """Per-account tracking state (slots keep hundreds of accounts cheap)."""
+
+    __slots__ = ("username", "stored", "interval", "failures", "scheduler")
+
+    def __init__(self, username: str):
+        self.username = username
+        self.stored: Dict[str, int] = {}  # metric -> last stored value, loaded on first sample
+        self.interval = ACCOUNT_CHECK_INTERVALS.get(username, CHECK_INTERVAL)
+        self.failures = 0
+        self.scheduler = PhaseLockedScheduler(min_interval=self.interval) if PHASE_LOCKED_POLLING else None
+
+    @property
+    def stored_count(self) -> int:
+        return self.stored.get("followers", 0)
+
+
+async def _track_account(
+    state: AccountState,
+    fetch: Callable[[str], Union[int, Dict[str, int], None]],
+    executor: ThreadPoolExecutor,
+    bus: EventBus,
+    confirmer: ChangeConfirmer,
+    on_sample: Optional[Callable[[AccountState], None]] = None,
+    get_cache_stamp: Optional[Callable[[str], Optional[str]]] = None,
+    retry_delay: Optional[Callable[[], float]] = None
+) -> None:
+    """Polling loop for one account; runs as its own task."""
+    loop = asyncio.get_running_loop()
+
+    # Spread the first polls so accounts don't all hit the API in the same instant
+    await asyncio.sleep(random.uniform(0, state.interval))
+
+    while True:
+        if connectivity.is_open:
+            # Offline: one cheap probe at a time instead of a request per account
+            if not await loop.run_in_executor(executor, connectivity.probe):
+                await asyncio.sleep(1)
+                continue
+            state.failures = 0
+
+        try:
+            started = time.monotonic()
+            sample = as_metrics(await loop.run_in_executor(executor, fetch, state.username))
+
+            if sample is None:
+                state.failures += 1
+                if on_sample:
+                    on_sample(state)
+                if retry_delay:
+                    delay = retry_delay()
+                elif state.failures >= 3:
+                    delay = RETRY_INTERVAL * 2
+                else:
+                    delay = RETRY_INTERVAL
+                if state.failures >= 3:
+                    logger.warning(f"@{state.username}: failed {state.failures} times, waiting {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+
+            state.failures = 0
+            record_sample(state.username, sample)
+            if MULTI_ANALYTICS:
+                update_analytics(state.username, sample, interval=state.interval)
+
+            if state.scheduler:
+                stamp = get_cache_stamp(state.username) if get_cache_stamp else None
+                state.scheduler.observe(started, time.monotonic(), sample, stamp)
+                if state.scheduler.polls % SCHEDULER_REPORT_EVERY == 0:
+                    logger.info(f"@{state.username}: {state.scheduler.report()}")
+            if confirmer.count_poll():
+                logger.info(confirmer.report())  # Shared: counts polls across all accounts
+
+            events = diff_metrics(state.username, state.stored, sample, confirmer)
+            if not events:
+                logger.debug(f"@{state.username}: no change in followers ({state.stored_count}).")
+            for event in events:
+                logger.info(f"@{state.username}: {format_change_message(event)}")
+                if MULTI_ANALYTICS and event.metric == "followers":
+                    logger.info(f"@{state.username}: stats: {get_analytics(state.username).summary()}")
+                bus.publish(event)
+
+            if on_sample:
+                on_sample(state)
+
+        except Exception as e:
+            logger.error(f"@{state.username}: error during follower count processing: {e}")
+            await asyncio.sleep(RETRY_INTERVAL)
+
+        if state.scheduler:
+            await asyncio.sleep(state.scheduler.next_delay(time.monotonic()))
+        else:
+            await asyncio.sleep(state.interval + random.uniform(0, 1))
+
+
+async def track_accounts(
+    fetch_follower_count_for: Callable[[str], Optional[int]],
+    usernames: Iterable[str],
+    on_sample: Optional[Callable[[AccountState], None]] = None,
+    announce: bool = True,
+    get_cache_stamp: Optional[Callable[[str], Optional[str]]] = None,
+    retry_delay: Optional[Callable[[], float]] = None,
+    stream: Optional[Callable[[ChangeEvent], None]] = None
+) -> None:
+    """
+    Runs one polling task per username until cancelled.
+
+    Args:
+        on_sample: Called with the account state after every poll (success or failure).
+        announce: Show notifications/audio for changes; when False changes are only logged.
+        get_cache_stamp: Optional function returning a username's last upstream cache stamp.
+        retry_delay: Optional function giving the wait after a failed fetch.
+        stream: Optional replacement for serving the event stream from this process
+            (shard workers hand their events to the coordinator instead).
+    """
+    states = [AccountState(username) for username in dict.fromkeys(usernames)]
+    bus = create_event_bus(announce, handlers={"stream": stream} if stream else None)
+    confirmer = ChangeConfirmer()
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES, thread_name_prefix="fetch") as executor:
+        await asyncio.gather(*(
+            _track_account(
+                state, fetch_follower_count_for, executor, bus, confirmer,
+                on_sample, get_cache_stamp, retry_delay
+            )
+            for state in states
+        ))
+
+
+def run_multi_tracker(
+    fetch_follower_count_for: Callable[[str], Optional[int]],
+    usernames: Iterable[str],
+    api_name: str = "API",
+    get_cache_stamp: Optional[Callable[[str], Optional[str]]] = None,
+    retry_delay: Optional[Callable[[], float]] = None
+) -> None:
+    """
+    Multi-account tracker entry point.
+
+    Args:
+        fetch_follower_count_for: Function that takes a username and returns its follower count
+            (or a dict of profile metrics including "followers") or None on error.
+        usernames: Accounts to track.
+        api_name: Name of the API for logging purposes.
+        get_cache_stamp: Optional function returning a username's last upstream cache stamp.
+        retry_delay: Optional function giving the wait after a failed fetch.
+    """
+    usernames = list(usernames)
+    logger.info(f"🚀 Starting Instagram Follower Tracker ({api_name}) for {len(usernames)} accounts")
+    wait_for_internet()
+
+    try:
+        asyncio.run(track_accounts(
+            fetch_follower_count_for, usernames,
+            get_cache_stamp=get_cache_stamp, retry_delay=retry_delay
+        ))
+    except KeyboardInterrupt:
+        logger.info("Tracker stopped.")
@@ -1,23 +1,108 @@
 """
 Network utilities for internet connectivity checks.
+
+Connectivity is inferred from the real API requests: fetch functions report
+connection errors, timeouts and DNS failures to the shared circuit breaker,
+so steady-state polling makes no extra requests. While the breaker is open,
+the tracker probes with a bare TCP connect instead of a full HTTPS request.
 """
 
+import socket
+import threading
 import time
+
 import requests
+
+from .config import BREAKER_FAILURE_THRESHOLD, BREAKER_PROBE_INTERVAL, BREAKER_PROBE_HOST
 from .logger import logger
 
+# Errors that mean "no network", as opposed to the API misbehaving
+CONNECTIVITY_ERRORS = (requests.ConnectionError, requests.Timeout, socket.gaierror, socket.timeout, ConnectionError)
+
+
+def is_connectivity_error(error: BaseException) -> bool:
+    return isinstance(error, CONNECTIVITY_ERRORS)
 
-def is_connected() -> bool:
-    """Checks for an active internet connection."""
+
+def is_connected(host: str = BREAKER_PROBE_HOST, port: int = 443, timeout: float = 3) -> bool:
+    """Cheap connectivity probe: DNS lookup + TCP handshake, no TLS or HTTP."""
     try:
-        requests.get("https://www.google.com", timeout=5)
-        return True
-    except:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
         return False
 
 
+class CircuitBreaker:
+    """
+    Tracks connectivity from request outcomes.
+
+    closed    - requests flow normally
+    open      - BREAKER_FAILURE_THRESHOLD connectivity failures in a row; callers
+                wait and probe cheaply instead of sending requests
+    half-open - a probe succeeded; the next real request decides (success closes,
+                failure re-opens)
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, probe_interval: float = BREAKER_PROBE_INTERVAL):
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.state = self.CLOSED
+        self.failures = 0
+        self._last_probe = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            if self.state != self.CLOSED:
+                logger.info("Internet connection restored.")
+            self.state = self.CLOSED
+
+    def record_failure(self, error: BaseException) -> None:
+        """Counts a failed request; only connectivity errors can open the breaker."""
+        if not is_connectivity_error(error):
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+                logger.warning(f"Internet connection lost ({error}). Waiting...")
+                self.state = self.OPEN
+                self._last_probe = time.monotonic()
+
+    def probe(self) -> bool:
+        """Runs at most one cheap probe per probe_interval; returns True once requests may flow."""
+        with self._lock:
+            if self.state != self.OPEN:
+                return True
+            if time.monotonic() - self._last_probe < self.probe_interval:
+                return False
+            self._last_probe = time.monotonic()
+        if is_connected():
+            with self._lock:
+                if self.state == self.OPEN:
+                    self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def wait_until_closed(self) -> None:
+        """Blocks while the breaker is open, probing every probe_interval."""
+        while not self.probe():
+            time.sleep(1)
+
+
+# Shared by every fetch function and tracker in the process
+connectivity = CircuitBreaker()
+
+
 def wait_for_internet() -> None:
     """Waits until an internet connection is detected."""
     while not is_connected():
-        logger.warning("No internet connection. Retrying in 10 seconds...")
-        time.sleep(10)
+        logger.warning(f"No internet connection. Retrying in {BREAKER_PROBE_INTERVAL} seconds...")
+        time.sleep(BREAKER_PROBE_INTERVAL)
@@ -0,0 +1,129 @@
+"""
+Client for the notification renderer daemon (core/notification_daemon.py).
+
+Qt-free: the tracker only writes JSON lines to a Unix socket. The daemon is
+started on first use and started again if it has died. Without the daemon,
+show_streaming_notification hands each notification to a one-off overlay
+process instead. Either way PyQt5 is only ever imported by the process that draws.
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from .config import PROJECT_DIR, NOTIF_DAEMON_SOCKET, NOTIF_DAEMON_START_TIMEOUT
+from .logger import logger
+
+Segments = List[Tuple[str, str]]  # (text, color name)
+
+RESTART_BACKOFF = 60  # Seconds before trying again after the renderer failed to start
+
+
+class RendererClient:
+    """Sends show requests to the renderer daemon, starting it when needed."""
+
+    def __init__(self, socket_path: str = NOTIF_DAEMON_SOCKET):
+        self.socket_path = socket_path
+        self.process: Optional[subprocess.Popen] = None
+        self.starts = 0
+        self._retry_at = 0.0
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Optional[socket.socket]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            return sock
+        except OSError:
+            sock.close()
+            return None
+
+    def _spawn(self) -> Optional[socket.socket]:
+        """Starts the daemon and waits for its socket."""
+        if time.monotonic() < self._retry_at:
+            return None  # Failed to start recently; callers fall back meanwhile
+        if self.process is not None and self.process.poll() is not None:
+            logger.warning(f"Notification renderer exited (code {self.process.returncode}), restarting")
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "core.notification_daemon"],
+                cwd=PROJECT_DIR,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True  # Keeps running (warm) across tracker restarts until idle
+            )
+            self.starts += 1
+        deadline = time.monotonic() + NOTIF_DAEMON_START_TIMEOUT
+        while time.monotonic() < deadline:
+            sock = self._connect()
+            if sock:
+                return sock
+            if self.process.poll() is not None:
+                break
+            time.sleep(0.05)
+        logger.error("Notification renderer did not start")
+        self._retry_at = time.monotonic() + RESTART_BACKOFF
+        return None
+
+    def ensure_running(self) -> bool:
+        """Connects to (or starts) the daemon ahead of the first notification."""
+        with self._lock:
+            if self._sock is None:
+                self._sock = self._connect() or self._spawn()
+            return self._sock is not None
+
+    def show(self, line1: Segments, line2: Segments, is_gain: bool = True, gif_path: Optional[str] = None,
+             change: Optional[dict] = None) -> bool:
+        """
+        Asks the daemon to show a notification; returns False if it can't be reached.
+
+        change (a ChangeEvent record plus "headline") lets the daemon merge the
+        notification into one already showing for the same account and metric.
+        """
+        request = {"line1": line1, "line2": line2, "is_gain": is_gain, "gif_path": gif_path, "change": change}
+        line = json.dumps(request).encode() + b"\n"
+        with self._lock:
+            for _ in range(2):
+                if self._sock is None:
+                    self._sock = self._connect() or self._spawn()
+                    if self._sock is None:
+                        return False
+                try:
+                    self._sock.sendall(line)
+                    return True
+                except OSError:
+                    # Daemon went away (crash or idle exit): reconnect, restarting it if needed
+                    self._sock.close()
+                    self._sock = None
+        return False
+
+
+renderer = RendererClient()
+
+
+def show_streaming_notification(line1, line2, is_gain: bool = True, gif_path: str = None) -> None:
+    """
+    Shows streaming-style notification with stroked text in a one-off overlay process.
+
+    Args:
+        line1, line2: Lists of (text, color name) segments, color names from
+            core.notification_streaming.COLOR_NAMES.
+    """
+    # The overlay runs in its own process; the notification is handed over as data
+    payload = json.dumps({"line1": line1, "line2": line2, "is_gain": is_gain, "gif_path": gif_path})
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", "core.notification_streaming", payload],
+            cwd=PROJECT_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+    except Exception as e:
+        logger.error(f"Streaming notification error: {e}")
+        text = "\n".join("".join(text for text, _ in line) for line in (line1, line2) if line)
+        subprocess.run(["notify-send", "Instagram Followers", text])
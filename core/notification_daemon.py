@@ -0,0 +1,209 @@
+"""
+Long-lived notification renderer.
+
+Spawning a Python process per notification means a fresh interpreter, PyQt5
+import, QApplication, font load and GIF decode before anything appears.
+This daemon keeps all of that warm and shows notifications described by
+JSON lines on a local socket (see core/notification_client.py), so the
+fade-in starts as soon as a request arrives.
+
+The daemon also owns the on-screen queue. A change for an account and metric
+that already has a popup showing in the same direction is merged into it in
+place ("+3" becomes "+8"), and NOTIF_STACK_POLICY decides what happens to the
+rest: "stack" shows up to NOTIF_MAX_VISIBLE popups below each other, "queue"
+shows one at a time and "replace" closes the current popup for the new one.
+Requests waiting for a free slot are merged the same way, so a viral spike
+ends up as a handful of popups with growing numbers.
+
+Run with: python3 -m core.notification_daemon  (the client starts it on demand)
+"""
+
+import json
+import sys
+import threading
+from collections import OrderedDict, deque
+from typing import Optional
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from PyQt5.QtWidgets import QApplication
+
+from .config import (
+    NOTIF_DAEMON_SOCKET, NOTIF_DAEMON_MOVIE_CACHE, NOTIF_DAEMON_IDLE_TIMEOUT,
+    NOTIF_STACK_POLICY, NOTIF_MAX_VISIBLE, ASSET_PREBUILD
+)
+from .assets import asset_cache, asset_catalog
+from .events import ChangeEvent
+from .formatting import change_segments
+from .logger import logger
+from .notification_streaming import COLOR_NAMES, StreamingNotification, get_font_family
+
+
+class RendererDaemon:
+    """Accepts show requests on a QLocalServer and renders them in this process."""
+
+    def __init__(self, socket_path: str = NOTIF_DAEMON_SOCKET, policy: str = NOTIF_STACK_POLICY,
+                 max_visible: int = NOTIF_MAX_VISIBLE):
+        if policy not in ("stack", "queue", "replace"):
+            raise ValueError(f"Unknown notification stack policy: {policy}")
+        self.socket_path = socket_path
+        self.policy = policy
+        self.capacity = max(1, max_visible) if policy == "stack" else 1
+        self.server = QLocalServer()
+        self.server.newConnection.connect(self._on_connection)
+        self.visible = []        # Popups on screen, top first
+        self.pending = deque()   # Requests waiting for a free slot
+        self.shown = 0
+        self.merged = 0
+        self._buffers = {}  # QLocalSocket -> partial line
+        StreamingNotification.movie_cache = OrderedDict()
+        StreamingNotification.movie_cache_size = NOTIF_DAEMON_MOVIE_CACHE
+
+        self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self._on_idle)
+
+    def listen(self) -> bool:
+        probe = QLocalSocket()
+        probe.connectToServer(self.socket_path)
+        if probe.waitForConnected(200):
+            probe.disconnectFromServer()
+            logger.info("Notification renderer already running")
+            return False
+        QLocalServer.removeServer(self.socket_path)  # Stale socket from a crashed daemon
+        if not self.server.listen(self.socket_path):
+            logger.error(f"Notification renderer can't listen on {self.socket_path}: {self.server.errorString()}")
+            return False
+        get_font_family()  # Load the font before the first request
+        asset_catalog.start()  # Index the GIFs (and watch for new ones) before the first request
+        if ASSET_PREBUILD:
+            # Pre-scale new or changed GIFs; until then the originals are scaled at display time
+            asset_catalog.listeners.append(self._prebuild)
+            self._prebuild()
+        self._arm_idle_timer()
+        logger.info(f"Notification renderer listening on {self.socket_path}")
+        return True
+
+    @staticmethod
+    def _prebuild() -> None:
+        threading.Thread(target=asset_cache.build_all, name="asset-build", daemon=True).start()
+
+    def _arm_idle_timer(self) -> None:
+        if NOTIF_DAEMON_IDLE_TIMEOUT:
+            self.idle_timer.start(NOTIF_DAEMON_IDLE_TIMEOUT * 1000)
+
+    def _on_idle(self) -> None:
+        if self.visible:
+            self._arm_idle_timer()
+            return
+        logger.info("Notification renderer idle, exiting")
+        QApplication.instance().quit()
+
+    def _on_connection(self) -> None:
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self._buffers[sock] = b""
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+
+    def _on_disconnected(self, sock: QLocalSocket) -> None:
+        self._buffers.pop(sock, None)
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock: QLocalSocket) -> None:
+        data = self._buffers.get(sock, b"") + bytes(sock.readAll())
+        *lines, self._buffers[sock] = data.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                self.show(json.loads(line))
+            except Exception as e:
+                logger.error(f"Notification renderer: bad request: {e}")
+
+    def show(self, request: dict) -> None:
+        """Merges a request into a matching popup or queued request, or shows it when there is room."""
+        self._arm_idle_timer()
+        change = request.get("change")
+        if change:
+            request["event"] = event = ChangeEvent.from_dict(change)
+            popup = self._match(self.visible, event)
+            if popup is not None:
+                popup.event = popup.event.merge(event)
+                line1, line2 = change_segments(popup.event, change.get("headline", ""))
+                popup.update_content(_colors(line1), _colors(line2))
+                self.merged += 1
+                return
+            queued = self._match(self.pending, event)
+            if queued is not None:
+                queued["event"] = queued["event"].merge(event)
+                queued["change"] = change  # Newest headline
+                self.merged += 1
+                return
+        if self.policy == "replace":
+            for popup in list(self.visible):
+                popup.close()
+        if len(self.visible) < self.capacity:
+            self._open(request)
+        else:
+            self.pending.append(request)
+
+    @staticmethod
+    def _match(items, event: ChangeEvent):
+        """Popup or queued request for the same account and metric changing in the same direction."""
+        for item in items:
+            other: Optional[ChangeEvent] = item.get("event") if isinstance(item, dict) else item.event
+            if (other is not None and other.account == event.account and other.metric == event.metric
+                    and (other.delta > 0) == (event.delta > 0)):
+                return item
+        return None
+
+    def _open(self, request: dict) -> None:
+        event = request.get("event")
+        if event is not None:
+            line1, line2 = change_segments(event, request["change"].get("headline", ""))
+            is_gain = event.delta > 0
+        else:
+            line1, line2 = request["line1"], request["line2"]
+            is_gain = request.get("is_gain", True)
+        notif = StreamingNotification(_colors(line1), _colors(line2), is_gain, request.get("gif_path"))
+        notif.event = event
+        notif.setAttribute(Qt.WA_DeleteOnClose)
+        notif.closed.connect(lambda n=notif: self._on_closed(n))
+        notif.position_notification(sum(p.height() for p in self.visible))
+        self.visible.append(notif)
+        notif.show_notification()
+        self.shown += 1
+
+    def _on_closed(self, notif: StreamingNotification) -> None:
+        if notif not in self.visible:
+            return
+        self.visible.remove(notif)
+        movie = notif.movie
+        if movie is not None and all(other.movie is not movie for other in self.visible):
+            movie.stop()  # Cached GIFs don't keep animating off screen
+        # Close the gap and fill freed slots
+        y_offset = 0
+        for popup in self.visible:
+            popup.position_notification(y_offset)
+            y_offset += popup.height()
+        while self.pending and len(self.visible) < self.capacity:
+            self._open(self.pending.popleft())
+
+
+def _colors(segments):
+    """(text, color name) segments -> (text, QColor)."""
+    return [(text, COLOR_NAMES[color]) for text, color in segments]
+
+
+def main() -> None:
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+    daemon = RendererDaemon()
+    if not daemon.listen():
+        return
+    app.exec_()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,81 +2,28 @@
 Streaming-style notification overlay with thick black text strokes.
 """
 
+import math
 import os
 import sys
-import re
+from collections import OrderedDict
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QVBoxLayout
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QSize, QRectF
+from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QSize, pyqtSignal
 from PyQt5.QtGui import (
     QMovie, QFont, QColor, QPainter, QPixmap, 
     QPen, QBrush, QPainterPath, QFontMetrics
 )
 
 from .config import (
-    PROJECT_DIR, GAIN_GIF_SIZE, GAIN_PNG_SIZE, LOSS_GIF_SIZE, LOSS_PNG_SIZE,
+    GAIN_GIF_SIZE, GAIN_PNG_SIZE, LOSS_GIF_SIZE, LOSS_PNG_SIZE,
     NOTIF_RIGHT_OFFSET, NOTIF_TOP_OFFSET,
     NOTIF_LINE1_SIZE, NOTIF_LINE2_SIZE, NOTIF_LINE_SPACING
 )
 from .logger import logger
-import random
-import glob
-
-# Asset paths
-ASSETS_DIR = os.path.join(PROJECT_DIR, "assets")
-
-# GIF folders (put multiple .gif files here for random selection)
-GIF_GAIN_DIR = os.path.join(ASSETS_DIR, "gain")
-GIF_LOSS_DIR = os.path.join(ASSETS_DIR, "loss")
-
-# Single file fallbacks (if folders are empty)
-GIF_GAIN_FALLBACK = os.path.join(ASSETS_DIR, "gain.gif")
-GIF_LOSS_FALLBACK = os.path.join(ASSETS_DIR, "loss.gif")
-IMG_GAIN_FALLBACK = os.path.join(ASSETS_DIR, "gain.png")
-IMG_LOSS_FALLBACK = os.path.join(ASSETS_DIR, "loss.png")
+from .assets import ASSETS_DIR, asset_cache, get_random_gif
 
 # Custom font (put font.ttf or font.otf in assets folder)
 FALLBACK_FONT = "Arial Black"  # System font fallback
 
-# Track last used GIFs to avoid consecutive repeats
-_last_gain_gif = None
-_last_loss_gif = None
-
-def get_random_gif(is_gain: bool) -> str:
-    """Get a random GIF from the gain/loss folder, avoiding consecutive repeats."""
-    global _last_gain_gif, _last_loss_gif
-    
-    folder = GIF_GAIN_DIR if is_gain else GIF_LOSS_DIR
-    last_used = _last_gain_gif if is_gain else _last_loss_gif
-    
-    # Look for GIFs in folder
-    if os.path.isdir(folder):
-        gifs = glob.glob(os.path.join(folder, "*.gif"))
-        if gifs:
-            # Filter out last used if we have more than 1 option
-            if len(gifs) > 1 and last_used in gifs:
-                gifs = [g for g in gifs if g != last_used]
-            
-            chosen = random.choice(gifs)
-            
-            # Update last used
-            if is_gain:
-                _last_gain_gif = chosen
-            else:
-                _last_loss_gif = chosen
-            
-            return chosen
-    
-    # Fallback to single files
-    single_gif = GIF_GAIN_FALLBACK if is_gain else GIF_LOSS_FALLBACK
-    if os.path.exists(single_gif):
-        return single_gif
-    
-    single_png = IMG_GAIN_FALLBACK if is_gain else IMG_LOSS_FALLBACK
-    if os.path.exists(single_png):
-        return single_png
-    
-    return ""  # No asset found
-
 # Notification settings
 NOTIFICATION_DURATION = 5000
 FADE_DURATION = 400
@@ -121,72 +68,114 @@ def get_font_family():
 
 
 class StrokedTextLabel(QWidget):
-    """Custom widget that draws text with thick black stroke."""
-    
+    """
+    Custom widget that draws text with thick black stroke.
+
+    Building the glyph outlines and stroking them is the expensive part, so the
+    text is rendered once per content/font/stroke into a pixmap (shared by all
+    labels through a small LRU) and every repaint, e.g. each fade frame, is a blit.
+    """
+
+    pixmap_cache = OrderedDict()  # (segments, font, stroke width, pixel ratio) -> QPixmap
+    pixmap_cache_size = 64
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.segments = []  # List of (text, color) tuples
         self.font = QFont(get_font_family(), 20, QFont.Black)
         self.stroke_width = 4
         self.setAttribute(Qt.WA_TranslucentBackground)
+        self._measure()
     
     def set_text_segments(self, segments):
         """Set text as list of (text, QColor) tuples."""
         self.segments = segments
+        self._measure()
         self.update()
         self.adjustSize()
     
     def set_font_size(self, size):
         self.font.setPointSize(size)
+        self._measure()
         self.update()
+
+    def _measure(self):
+        """Caches the metrics that sizing and painting need."""
+        self.metrics = QFontMetrics(self.font)
+        self.text_width = sum(self.metrics.horizontalAdvance(text) for text, _ in self.segments)
     
     def sizeHint(self):
-        fm = QFontMetrics(self.font)
-        total_text = "".join([s[0] for s in self.segments])
-        width = fm.horizontalAdvance(total_text) + self.stroke_width * 4
-        height = fm.height() + self.stroke_width * 4
         return self.minimumSizeHint()
     
     def minimumSizeHint(self):
-        fm = QFontMetrics(self.font)
-        total_text = "".join([s[0] for s in self.segments])
-        width = fm.horizontalAdvance(total_text) + self.stroke_width * 4
-        height = fm.height() + self.stroke_width * 4
-        from PyQt5.QtCore import QSize
+        width = self.text_width + self.stroke_width * 4
+        height = self.metrics.height() + self.stroke_width * 4
         return QSize(max(width, 350), max(height, 30))
-    
-    def paintEvent(self, event):
-        painter = QPainter(self)
+
+    def text_pixmap(self, offset_x: float = 0, offset_y: float = 0):
+        """
+        The stroked text as a transparent pixmap, from the cache when possible.
+
+        offset_x/offset_y are the sub-pixel part of the text position, drawn into
+        the pixmap so blitting it at whole pixels matches drawing the text directly.
+        """
+        ratio = self.devicePixelRatioF()
+        key = (
+            tuple((text, color.rgba()) for text, color in self.segments),
+            self.font.key(), self.stroke_width, ratio, offset_x, offset_y
+        )
+        cache = StrokedTextLabel.pixmap_cache
+        pixmap = cache.get(key)
+        if pixmap is not None:
+            cache.move_to_end(key)
+            return pixmap
+
+        fm = self.metrics
+        pad = self.stroke_width  # Room for the stroke around the glyphs
+        pixmap = QPixmap(int((self.text_width + 2 * pad + 1) * ratio), int((fm.height() + 2 * pad + 1) * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setRenderHint(QPainter.TextAntialiasing)
-        painter.setFont(self.font)
-        
-        fm = QFontMetrics(self.font)
-        
-        # Calculate total width for centering
-        total_width = sum(fm.horizontalAdvance(seg[0]) for seg in self.segments)
-        x_start = (self.width() - total_width) / 2
-        y = self.height() / 2 + fm.ascent() / 2 - fm.descent() / 2
-        
-        current_x = x_start
-        
+        stroke_pen = QPen(BLACK, self.stroke_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        current_x = pad + offset_x
         for text, color in self.segments:
-            # Create path for this segment
             path = QPainterPath()
-            path.addText(current_x, y, self.font, text)
-            
-            # Draw thick black stroke
-            stroke_pen = QPen(BLACK, self.stroke_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            painter.strokePath(path, stroke_pen)
-            
-            # Fill with color
-            painter.fillPath(path, QBrush(color))
-            
+            path.addText(current_x, pad + offset_y + fm.ascent(), self.font, text)
+            painter.strokePath(path, stroke_pen)  # Thick black stroke
+            painter.fillPath(path, QBrush(color))  # Fill with color
             current_x += fm.horizontalAdvance(text)
+        painter.end()
+
+        cache[key] = pixmap
+        while len(cache) > self.pixmap_cache_size:
+            cache.popitem(last=False)
+        return pixmap
+    
+    def paintEvent(self, event):
+        if not self.segments:
+            return
+        fm = self.metrics
+        # Centered; baseline where the text used to be drawn directly
+        x_start = (self.width() - self.text_width) / 2
+        y = self.height() / 2 + fm.ascent() / 2 - fm.descent() / 2
+        left = x_start - self.stroke_width
+        top = y - fm.ascent() - self.stroke_width
+        painter = QPainter(self)
+        painter.drawPixmap(math.floor(left), math.floor(top), self.text_pixmap(left % 1, top % 1))
 
 
 class StreamingNotification(QWidget):
     """Streaming-style transparent notification with stroked text."""
+
+    # Long-lived processes (the renderer daemon) set this to an OrderedDict so
+    # decoded GIFs are kept between notifications: path -> QMovie, most recent last
+    movie_cache = None
+    movie_cache_size = 0
+
+    closed = pyqtSignal()  # Emitted when the window closes (faded out, dismissed or replaced)
     
     def __init__(self, line1_segments, line2_segments, is_gain: bool = True, gif_path: str = None):
         self.app = QApplication.instance()
@@ -228,20 +217,9 @@ class StreamingNotification(QWidget):
         gif_path = self.gif_path if self.gif_path else get_random_gif(self.is_gain)
         
         if gif_path and gif_path.endswith('.gif'):
-            self.movie = QMovie(gif_path)
             target_height = GAIN_GIF_SIZE if self.is_gain else LOSS_GIF_SIZE
-            
-            # Get original size and calculate scaled width to preserve aspect ratio
-            self.movie.jumpToFrame(0)
-            original_size = self.movie.currentImage().size()
-            if original_size.height() > 0:
-                aspect_ratio = original_size.width() / original_size.height()
-                scaled_width = int(target_height * aspect_ratio)
-            else:
-                scaled_width = target_height
-            
+            self.movie = self.load_movie(gif_path, target_height)
             self.current_img_size = target_height
-            self.movie.setScaledSize(QSize(scaled_width, target_height))
             self.char_label.setMovie(self.movie)
             self.movie.start()
         elif gif_path and gif_path.endswith('.png'):
@@ -281,10 +259,43 @@ class StreamingNotification(QWidget):
         self.position_notification()
         self.setWindowOpacity(0)
     
-    def position_notification(self):
+    @classmethod
+    def load_movie(cls, gif_path: str, target_height: int) -> QMovie:
+        """Opens a GIF at target_height (pre-scaled copy if built), reusing a decoded one when caching is on."""
+        key = (gif_path, target_height)
+        if cls.movie_cache is not None and key in cls.movie_cache:
+            cls.movie_cache.move_to_end(key)
+            movie = cls.movie_cache[key]
+            movie.jumpToFrame(0)
+            return movie
+
+        prebuilt = asset_cache.lookup(gif_path, target_height)
+        movie = QMovie(prebuilt["path"] if prebuilt else gif_path)
+        if cls.movie_cache is not None:
+            movie.setCacheMode(QMovie.CacheAll)  # Decode each frame once
+
+        if prebuilt is None:
+            # Not pre-scaled: get original size and calculate scaled width to preserve aspect ratio
+            movie.jumpToFrame(0)
+            original_size = movie.currentImage().size()
+            if original_size.height() > 0:
+                aspect_ratio = original_size.width() / original_size.height()
+                scaled_width = int(target_height * aspect_ratio)
+            else:
+                scaled_width = target_height
+            movie.setScaledSize(QSize(scaled_width, target_height))
+
+        if cls.movie_cache is not None:
+            cls.movie_cache[key] = movie
+            while len(cls.movie_cache) > cls.movie_cache_size:
+                cls.movie_cache.popitem(last=False)  # A notification still showing it keeps its reference
+        return movie
+    
+    def position_notification(self, y_offset: int = 0):
+        """Places the window top-right; y_offset moves it below stacked notifications."""
         screen = QApplication.primaryScreen().geometry()
         x = screen.width() - self.width() - NOTIF_RIGHT_OFFSET
-        y = NOTIF_TOP_OFFSET
+        y = NOTIF_TOP_OFFSET + y_offset
         self.move(x, y)
     
     def setup_animations(self):
@@ -310,72 +321,45 @@ class StreamingNotification(QWidget):
         self.fade_in.start()
         self.close_timer.start(NOTIFICATION_DURATION)
 
+    def update_content(self, line1_segments, line2_segments):
+        """Replaces the text of a visible notification and shows it for another full duration."""
+        self.line1_segments = line1_segments
+        self.line2_segments = line2_segments
+        self.line1_widget.set_text_segments(line1_segments)
+        self.line2_widget.set_text_segments(line2_segments)
+        if self.fade_out.state() == QPropertyAnimation.Running:
+            self.fade_out.stop()
+            self.fade_in.setStartValue(self.windowOpacity())
+            self.fade_in.start()
+        self.close_timer.start(NOTIFICATION_DURATION)
+
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        self.closed.emit()
 
-def show_streaming_notification(message: str, is_gain: bool = True, gif_path: str = None) -> None:
-    """Shows streaming-style notification with stroked text."""
-    import subprocess
+
+COLOR_NAMES = {"GREEN": GREEN, "RED": RED, "WHITE": WHITE}
+
+
+def main(argv) -> None:
+    """Overlay process entry point: shows one notification described by a JSON payload."""
     import json
-    
-    color = "GREEN" if is_gain else "RED"
-    
-    # Parse: "You got X followers. Total: Y"
-    match = re.match(r"You (got|lost) (\d+) (followers?)\. Total: (\d+)", message)
-    
-    if match:
-        verb = match.group(1)
-        count = match.group(2)
-        unit = match.group(3)
-        total = match.group(4)
-        
-        # Build segments for line 1
-        line1_data = [
-            ("You ", "WHITE"),
-            (f"{verb} {count}", color),
-            (f" {unit}", "WHITE")
-        ]
-        
-        # Build segments for line 2
-        line2_data = [
-            ("Total: ", "WHITE"),
-            (total, color)
-        ]
-    else:
-        line1_data = [(message, "WHITE")]
-        line2_data = []
-    
-    script = f'''
-import sys
-sys.path.insert(0, "{PROJECT_DIR}")
-from core.notification_streaming import StreamingNotification, GREEN, RED, WHITE
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
 
-color_map = {{"GREEN": GREEN, "RED": RED, "WHITE": WHITE}}
+    data = json.loads(argv[1])
+    line1_segments = [(text, COLOR_NAMES[color]) for text, color in data["line1"]]
+    line2_segments = [(text, COLOR_NAMES[color]) for text, color in data["line2"]]
 
-line1 = {line1_data}
-line2 = {line2_data}
+    app = QApplication(argv)
+    notif = StreamingNotification(line1_segments, line2_segments, data["is_gain"], data["gif_path"])
+    notif.show_notification()
 
-line1_segments = [(t, color_map[c]) for t, c in line1]
-line2_segments = [(t, color_map[c]) for t, c in line2]
+    # Connect to closed signal to quit app
+    notif.destroyed.connect(app.quit)
 
-app = QApplication(sys.argv)
-notif = StreamingNotification(line1_segments, line2_segments, {is_gain}, "{gif_path}")
-notif.show_notification()
+    # Fallback quit timer (in case close doesn't trigger)
+    QTimer.singleShot(NOTIFICATION_DURATION + FADE_DURATION + 500, app.quit)
+    app.exec_()
 
-# Connect to closed signal to quit app
-notif.destroyed.connect(app.quit)
 
-# Fallback quit timer (in case close doesn't trigger)
-QTimer.singleShot({NOTIFICATION_DURATION + FADE_DURATION + 500}, app.quit)
-app.exec_()
-'''
-    
-    try:
-        subprocess.Popen(
-            ["python3", "-c", script],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-    except Exception as e:
-        logger.error(f"Streaming notification error: {e}")
-        subprocess.run(["notify-send", "Instagram Followers", message])
+if __name__ == "__main__":
+    main(sys.argv)
@@ -4,22 +4,47 @@ Uses streaming-style overlay notifications.
 """
 
 import subprocess
+from .assets import get_random_gif
+from .config import NOTIF_DAEMON
 from .logger import logger
+from .notification_client import renderer, show_streaming_notification
 
 # Use streaming-style notifications
 USE_STREAMING = True
 
 
-def send_notification(message: str, title: str = "Instagram Followers", is_gain: bool = True, gif_path: str = None) -> None:
+def send_notification(
+    message: str,
+    title: str = "Instagram Followers",
+    is_gain: bool = True,
+    gif_path: str = None,
+    segments=None,
+    change: dict = None
+) -> bool:
     """
-    Sends a desktop notification.
-    Uses streaming-style overlay if enabled.
+    Sends a desktop notification; returns True if the renderer daemon took it.
+    Uses streaming-style overlay if enabled, shown by the persistent renderer
+    when it is reachable and by a one-off process otherwise.
+
+    Args:
+        message: Plain text (used by notify-send, and by the overlay when no segments are given).
+        gif_path: GIF to show (default: the next one from the asset catalog).
+        segments: Optional (line1, line2) lists of (text, color name) for the overlay.
+        change: Optional change record, lets the renderer merge it into a visible popup.
     """
     if USE_STREAMING:
+        line1, line2 = segments or ([(message, "WHITE")], [])
+        if NOTIF_DAEMON:
+            try:
+                if renderer.show(line1, line2, is_gain, gif_path, change):
+                    return True
+            except Exception as e:
+                logger.warning(f"Notification renderer failed: {e}")
+        # The renderer picks a GIF itself; a one-off process has no shuffle bag, so pick here
+        gif_path = gif_path or get_random_gif(is_gain)
         try:
-            from .notification_streaming import show_streaming_notification
-            show_streaming_notification(message, is_gain, gif_path)
-            return
+            show_streaming_notification(line1, line2, is_gain, gif_path)
+            return False
         except Exception as e:
             logger.warning(f"Streaming notification failed: {e}")
     
@@ -28,3 +53,4 @@ def send_notification(message: str, title: str = "Instagram Followers", is_gain:
         subprocess.run(["notify-send", title, message], check=True)
     except Exception as e:
         logger.error(f"Notification error: {e}")
+    return False
@@ -0,0 +1,297 @@
+"""
+HTTP overlay server for OBS browser sources.
+
+Serves an HTML/CSS version of the gain/loss popup at "/", pushes change
+events to every open page over Server-Sent Events ("/events"), and serves
+the GIFs from assets/ with long-lived caching headers. Events come from the
+tracker's event stream (core/event_stream.py), so the server can run on its
+own and reconnects whenever the tracker restarts.
+
+Everything runs on one asyncio loop: an open page costs one socket and a
+small write buffer, and each event is encoded once for all of them.
+"""
+
+import asyncio
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from .config import (
+    EVENT_STREAM_SOCKET, NOTIFY_METRICS,
+    GAIN_GIF_SIZE, LOSS_GIF_SIZE, NOTIF_LINE1_SIZE, NOTIF_LINE2_SIZE,
+    NOTIF_RIGHT_OFFSET, NOTIF_TOP_OFFSET,
+    OVERLAY_HOST, OVERLAY_PORT, OVERLAY_HEARTBEAT, OVERLAY_ASSET_MAX_AGE, OVERLAY_CLIENT_BUFFER
+)
+from .assets import ASSETS_DIR, asset_catalog
+from .logger import logger
+NOTIFICATION_DURATION = 5000  # ms, same as the desktop overlay
+FADE_DURATION = 400
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Follower overlay</title>
+<style>
+  {font_face}
+  html, body {{ margin: 0; background: transparent; overflow: hidden; }}
+  #popup {{
+    position: absolute; top: {top}px; right: {right}px;
+    display: flex; flex-direction: column; align-items: center;
+    font-family: {font_family}; font-weight: 900; text-align: center;
+    opacity: 0; transition: opacity {fade}ms ease;
+  }}
+  #popup.visible {{ opacity: 1; }}
+  #popup img {{ height: {gif_size}px; }}
+  .line {{ color: #fff; -webkit-text-stroke: 8px #000; paint-order: stroke fill; white-space: pre; }}
+  #line1 {{ font-size: {line1}pt; }}
+  #line2 {{ font-size: {line2}pt; }}
+  .gain {{ color: rgb(76, 175, 80); }}
+  .loss {{ color: rgb(244, 67, 54); }}
+</style>
+</head>
+<body>
+<div id="popup"><img id="gif" alt=""><div class="line" id="line1"></div><div class="line" id="line2"></div></div>
+<script>
+const DURATION = {duration}, FADE = {fade};
+const popup = document.getElementById("popup");
+const queue = [];
+let showing = false;
+
+function span(text, cls) {{
+  const s = document.createElement("span");
+  s.textContent = text;
+  if (cls) s.className = cls;
+  return s;
+}}
+
+function render(e) {{
+  const cls = e.delta > 0 ? "gain" : "loss";
+  const amount = Math.abs(e.delta);
+  const line1 = document.getElementById("line1"), line2 = document.getElementById("line2");
+  line1.replaceChildren();
+  line2.replaceChildren(span("Total: "), span(String(e.new), cls));
+  if (e.metric === "followers") {{
+    line1.append(span("You "), span((e.delta > 0 ? "got " : "lost ") + amount, cls),
+                 span(amount === 1 ? " follower" : " followers"));
+  }} else {{
+    const name = e.metric.charAt(0).toUpperCase() + e.metric.slice(1);
+    line1.append(span(name + " "), span((e.delta > 0 ? "+" : "") + e.delta, cls));
+  }}
+  const gif = document.getElementById("gif");
+  gif.style.display = e.gif ? "" : "none";
+  if (e.gif) gif.src = e.gif;
+}}
+
+function next() {{
+  const e = queue.shift();
+  if (!e) {{ showing = false; return; }}
+  showing = true;
+  render(e);
+  popup.classList.add("visible");
+  setTimeout(() => popup.classList.remove("visible"), DURATION);
+  setTimeout(next, DURATION + FADE);
+}}
+
+new EventSource("/events").addEventListener("change", (msg) => {{
+  const e = JSON.parse(msg.data);
+  // Merge with a queued change for the same account and metric (net change)
+  const pending = queue.find((q) => q.account === e.account && q.metric === e.metric);
+  if (pending) {{
+    pending.delta += e.delta;
+    pending.new = e.new;
+    pending.gif = e.gif;
+    if (pending.delta === 0) queue.splice(queue.indexOf(pending), 1);
+  }} else {{
+    queue.push(e);
+  }}
+  if (!showing) next();
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def _font_face() -> Tuple[str, str]:
+    """@font-face rule for assets/font.ttf|otf if present, and the font-family to use."""
+    for name in ("font.ttf", "font.otf"):
+        if os.path.exists(os.path.join(ASSETS_DIR, name)):
+            return f'@font-face {{ font-family: "overlay"; src: url("/assets/{name}"); }}', '"overlay", "Arial Black", sans-serif'
+    return "", '"Arial Black", sans-serif'
+
+
+def render_page() -> bytes:
+    font_face, font_family = _font_face()
+    return PAGE.format(
+        font_face=font_face, font_family=font_family,
+        top=NOTIF_TOP_OFFSET + 20, right=max(0, NOTIF_RIGHT_OFFSET + 40),
+        gif_size=max(GAIN_GIF_SIZE, LOSS_GIF_SIZE),
+        line1=NOTIF_LINE1_SIZE, line2=NOTIF_LINE2_SIZE,
+        duration=NOTIFICATION_DURATION, fade=FADE_DURATION,
+    ).encode()
+
+
+def pick_gif_url(kind: str) -> Optional[str]:
+    """URL of the next gain/loss GIF from the asset catalog."""
+    choice = asset_catalog.pick(kind == "gain")
+    if choice is None:
+        return None
+    return "/assets/" + quote(os.path.relpath(choice, ASSETS_DIR).replace(os.sep, "/"))
+
+
+class OverlayServer:
+    """Serves the overlay page, assets and the SSE event feed."""
+
+    def __init__(self, event_socket: str = EVENT_STREAM_SOCKET):
+        self.event_socket = event_socket
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.page = render_page()
+        self._assets: Dict[str, Tuple[float, bytes]] = {}  # path -> (mtime, bytes)
+        self.events = 0
+
+    # ---- HTTP ----
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            writer.close()
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        path = unquote(urlsplit(target).path)
+
+        if method not in ("GET", "HEAD"):
+            await self._respond(writer, 405, b"Method not allowed")
+        elif path == "/events":
+            await self._subscribe(writer)
+            return  # Stays open
+        elif path in ("/", "/index.html"):
+            await self._respond(writer, 200, self.page, "text/html; charset=utf-8",
+                                {"Cache-Control": "no-cache"}, head=method == "HEAD")
+        elif path.startswith("/assets/"):
+            await self._asset(writer, path[len("/assets/"):], headers, method == "HEAD")
+        else:
+            await self._respond(writer, 404, b"Not found")
+        writer.close()
+
+    async def _respond(self, writer, status: int, body: bytes, content_type: str = "text/plain",
+                       extra: Optional[Dict[str, str]] = None, head: bool = False) -> None:
+        reason = {200: "OK", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed"}[status]
+        header_lines = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}",
+                        f"Content-Length: {len(body)}", "Connection: close"]
+        header_lines += [f"{key}: {value}" for key, value in (extra or {}).items()]
+        writer.write(("\r\n".join(header_lines) + "\r\n\r\n").encode())
+        if not head and status != 304:
+            writer.write(body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _asset(self, writer, relative: str, headers: Dict[str, str], head: bool) -> None:
+        path = os.path.realpath(os.path.join(ASSETS_DIR, relative))
+        if not path.startswith(os.path.realpath(ASSETS_DIR) + os.sep) or not os.path.isfile(path):
+            await self._respond(writer, 404, b"Not found")
+            return
+        stat = os.stat(path)
+        etag = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+        extra = {
+            "Cache-Control": f"public, max-age={OVERLAY_ASSET_MAX_AGE}",
+            "ETag": etag,
+            "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        }
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if headers.get("if-none-match") == etag:
+            await self._respond(writer, 304, b"", content_type, extra)
+            return
+        cached = self._assets.get(path)
+        if cached is None or cached[0] != stat.st_mtime:
+            with open(path, "rb") as f:
+                cached = self._assets[path] = (stat.st_mtime, f.read())
+        await self._respond(writer, 200, cached[1], content_type, extra, head)
+
+    # ---- SSE ----
+
+    async def _subscribe(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\nAccess-Control-Allow-Origin: *\r\n\r\nretry: 2000\n\n"
+        )
+        self.clients.add(writer)
+        logger.info(f"Overlay viewer connected ({len(self.clients)} open)")
+
+    def _broadcast(self, chunk: bytes) -> None:
+        for writer in list(self.clients):
+            # A viewer that stopped reading is dropped instead of buffering forever
+            if writer.is_closing() or writer.transport.get_write_buffer_size() > OVERLAY_CLIENT_BUFFER:
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(chunk)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(OVERLAY_HEARTBEAT)
+            self._broadcast(b": keep-alive\n\n")
+
+    # ---- events from the tracker ----
+
+    def _on_record(self, record: dict) -> None:
+        if record.get("type") != "change" or record.get("metric") not in NOTIFY_METRICS or not record.get("delta"):
+            return
+        record["gif"] = pick_gif_url("gain" if record["delta"] > 0 else "loss")
+        self.events += 1
+        self._broadcast(b"event: change\ndata: " + json.dumps(record, separators=(",", ":")).encode() + b"\n\n")
+
+    async def _follow_tracker(self) -> None:
+        """Reads the tracker's event stream, reconnecting whenever it goes away."""
+        warned = False
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.event_socket)
+            except OSError:
+                if not warned:
+                    logger.warning(f"Waiting for a tracker event stream on {self.event_socket}...")
+                    warned = True
+                await asyncio.sleep(2)
+                continue
+            logger.info("Connected to the tracker event stream")
+            warned = False
+            try:
+                async for line in reader:
+                    try:
+                        self._on_record(json.loads(line))
+                    except ValueError:
+                        continue
+            except ConnectionError:
+                pass
+            writer.close()
+            logger.warning("Tracker event stream closed")
+
+    async def serve(self, host: str = OVERLAY_HOST, port: int = OVERLAY_PORT) -> None:
+        asset_catalog.start()  # Index the GIFs up front instead of on the first event
+        server = await asyncio.start_server(self._handle, host, port)
+        logger.info(f"Overlay server on http://{host}:{port}/ (add it as an OBS browser source)")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self._heartbeat(), self._follow_tracker())
+
+
+def run_overlay_server(host: str = OVERLAY_HOST, port: int = OVERLAY_PORT) -> None:
+    try:
+        asyncio.run(OverlayServer().serve(host, port))
+    except KeyboardInterrupt:
+        logger.info("Overlay server stopped.")
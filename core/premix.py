@@ -0,0 +1,203 @@
+"""
+Pre-mixed announcements: intro + voice rendered once into a single buffer.
+
+Every gain or loss mixes the same intro with the same voice clip at the same
+offset, so the result is cached per (gain|loss, bucket) key, where the
+bucket is the voice clip (e.g. "12", "more_than_300", or "intro" without one).
+Entries live in a bounded LRU in memory and as WAV files in AUDIO_PREMIX_DIR
+(also bounded, least recently used removed first), are built lazily on first
+use or up front by scripts/build_premix.py, and are rebuilt when the intro,
+the voice clip, AUDIO_OVERLAY_DELAY or the engine rate change.
+"""
+
+import hashlib
+import os
+import threading
+import wave
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .audio_engine import CHANNELS, AudioEngine, audio_engine
+from .config import (
+    AUDIO_GET, AUDIO_LOST, GENERATED_AUDIO_DIR, AUDIO_OVERLAY_DELAY,
+    AUDIO_PREMIX_DIR, AUDIO_PREMIX_MEMORY_MB, AUDIO_PREMIX_DISK_MB
+)
+from .logger import logger
+
+PREMIX_VERSION = 1  # Bump when the mix itself changes, to rebuild every entry
+
+
+def bucket_of(voice_path: str) -> str:
+    """Bucket name of a voice clip ("intro" for an announcement without one)."""
+    return os.path.splitext(os.path.basename(voice_path))[0] if voice_path else "intro"
+
+
+def _source_signature(path: str) -> str:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def mix(parts: Iterable[Tuple[float, np.ndarray]], rate: int) -> np.ndarray:
+    """(offset seconds, float32 stereo) parts summed into one int16 stereo buffer."""
+    placed = [(int(round(offset * rate)), samples) for offset, samples in parts]
+    out = np.zeros((max((start + len(s) for start, s in placed), default=0), CHANNELS), dtype=np.float32)
+    for start, samples in placed:
+        out[start:start + len(samples)] += samples
+    np.clip(out, -1, 1, out=out)
+    return (out * 32767).astype("<i2")
+
+
+class PremixCache:
+    """Memory and disk LRU of pre-mixed announcements."""
+
+    def __init__(self, engine: AudioEngine = audio_engine, cache_dir: str = AUDIO_PREMIX_DIR,
+                 memory_mb: float = AUDIO_PREMIX_MEMORY_MB, disk_mb: float = AUDIO_PREMIX_DISK_MB):
+        self.engine = engine
+        self.cache_dir = cache_dir
+        self.memory_bytes = int(memory_mb * 1e6)
+        self.disk_bytes = int(disk_mb * 1e6)
+        self.stats = {"memory": 0, "disk": 0, "mixed": 0}
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, np.ndarray]]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+
+    def _signature(self, intro_path: str, voice_path: str, delay: float) -> str:
+        return (f"v{PREMIX_VERSION}:{self.engine.rate}:{delay}:"
+                f"{_source_signature(intro_path)}:{_source_signature(voice_path) if voice_path else ''}")
+
+    def _file(self, key: Tuple[str, str], signature: str) -> str:
+        digest = hashlib.sha1(signature.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key[0]}_{key[1]}_{digest}.wav")
+
+    def get(self, kind: str, intro_path: str, voice_path: str = "",
+            delay: float = AUDIO_OVERLAY_DELAY) -> Optional[np.ndarray]:
+        """The pre-mixed announcement as int16 stereo at the engine rate (mixed now if not cached)."""
+        key = (kind, bucket_of(voice_path))
+        signature = self._signature(intro_path, voice_path, delay)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[0] == signature:
+                self._memory.move_to_end(key)
+                self.stats["memory"] += 1
+                return cached[1]
+
+        path = self._file(key, signature)
+        samples = self._read(path)
+        if samples is not None:
+            self.stats["disk"] += 1
+            try:
+                os.utime(path)  # Recently used, for the disk LRU
+            except OSError:
+                pass
+        else:
+            samples = self._render(intro_path, voice_path, delay)
+            if samples is None:
+                return None
+            self.stats["mixed"] += 1
+            self._write(key, path, samples)
+        self._remember(key, signature, samples)
+        return samples
+
+    def _render(self, intro_path: str, voice_path: str, delay: float) -> Optional[np.ndarray]:
+        parts = []
+        intro = self.engine.clip(intro_path)
+        if intro is not None:
+            parts.append((0.0, intro.render(self.engine.rate)))
+        voice = self.engine.clip(voice_path) if voice_path else None
+        if voice is not None:
+            parts.append((delay if intro is not None else 0.0, voice.render(self.engine.rate)))
+        return mix(parts, self.engine.rate) if parts else None
+
+    def _remember(self, key: Tuple[str, str], signature: str, samples: np.ndarray) -> None:
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_used -= old[1].nbytes
+            if samples.nbytes > self.memory_bytes:
+                return
+            self._memory[key] = (signature, samples)
+            self._memory_used += samples.nbytes
+            while self._memory_used > self.memory_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_used -= evicted.nbytes
+
+    # ---- disk ----
+
+    def _read(self, path: str) -> Optional[np.ndarray]:
+        try:
+            with wave.open(path, "rb") as w:
+                if (w.getframerate(), w.getnchannels(), w.getsampwidth()) != (self.engine.rate, CHANNELS, 2):
+                    return None
+                data = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+        except (OSError, EOFError, wave.Error):
+            return None
+        return data.reshape(-1, CHANNELS)
+
+    def _write(self, key: Tuple[str, str], path: str, samples: np.ndarray) -> None:
+        if samples.nbytes > self.disk_bytes:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with wave.open(tmp, "wb") as w:
+                w.setnchannels(CHANNELS)
+                w.setsampwidth(2)
+                w.setframerate(self.engine.rate)
+                w.writeframes(samples.tobytes())
+            os.replace(tmp, path)
+            # Older mixes of the same announcement (source or delay changed) are stale
+            prefix = f"{key[0]}_{key[1]}_"
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and name.endswith(".wav") and name != os.path.basename(path):
+                    os.remove(os.path.join(self.cache_dir, name))
+            self._trim_disk()
+        except OSError as e:
+            logger.warning(f"Could not cache pre-mixed {key[0]}/{key[1]}: {e}")
+
+    def _trim_disk(self) -> None:
+        """Removes the least recently used files while over AUDIO_PREMIX_DISK_MB."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".wav"):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        used = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if used <= self.disk_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            used -= size
+
+    # ---- offline build ----
+
+    def targets(self) -> List[Tuple[str, str, str]]:
+        """(kind, intro, voice) of every announcement: each voice clip, and the intro alone."""
+        result = []
+        for kind, intro in (("gain", AUDIO_GET), ("loss", AUDIO_LOST)):
+            result.append((kind, intro, ""))
+            folder = os.path.join(GENERATED_AUDIO_DIR, kind)
+            if os.path.isdir(folder):
+                result += [(kind, intro, os.path.join(folder, name))
+                           for name in sorted(os.listdir(folder)) if name.endswith(".wav")]
+        return result
+
+    def build_all(self, delay: float = AUDIO_OVERLAY_DELAY) -> dict:
+        """Mixes every announcement that isn't cached on disk yet (up to the disk budget)."""
+        report = {"built": 0, "cached": 0, "failed": 0, "bytes": 0}
+        for kind, intro, voice in self.targets():
+            mixed_before = self.stats["mixed"]
+            samples = self.get(kind, intro, voice, delay)
+            if samples is None:
+                report["failed"] += 1
+                continue
+            report["built" if self.stats["mixed"] > mixed_before else "cached"] += 1
+            report["bytes"] += samples.nbytes
+        return report
+
+
+premix_cache = PremixCache()
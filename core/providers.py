@@ -0,0 +1,149 @@
+"""
+Follower-count provider registry with hedged requests.
+
+Every provider is a per-username fetch function (username -> count or None).
+HedgedFetcher sends each request to the best provider and, if it has not
+answered within its own p95 latency, sends a backup request to the next one,
+returning whichever valid answer arrives first.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from .config import (
+    MAX_CONCURRENT_FETCHES, PROVIDER_STATS_WINDOW,
+    HEDGE_MIN_SAMPLES, HEDGE_DEFAULT_DELAY, PROVIDER_REPORT_EVERY
+)
+from .logger import logger
+
+ProviderFetch = Callable[[str], Optional[int]]
+
+
+class ProviderStats:
+    """Rolling latency and error statistics for one provider."""
+
+    def __init__(self, window: int = PROVIDER_STATS_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True = valid answer
+        self.requests = 0
+        self.wins = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency)
+
+    def percentile(self, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self._lock:
+            if not self.latencies or len(self.latencies) < min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def score(self) -> float:
+        """Lower is better: median latency inflated by the error rate."""
+        p50 = self.percentile(0.5, min_samples=1)
+        if p50 is None:
+            return 0.0 if self.requests == 0 else float("inf")  # Untried providers get a turn first
+        return p50 / max(0.05, 1 - self.error_rate)
+
+
+class ProviderRegistry:
+    """Named providers with their statistics."""
+
+    def __init__(self):
+        self.providers: Dict[str, ProviderFetch] = {}
+        self.stats: Dict[str, ProviderStats] = {}
+
+    def register(self, name: str, fetch: ProviderFetch) -> None:
+        self.providers[name] = fetch
+        self.stats[name] = ProviderStats()
+
+    def ranked(self) -> List[str]:
+        """Provider names, best first."""
+        return sorted(self.providers, key=lambda name: self.stats[name].score())
+
+
+class HedgedFetcher:
+    """Per-username fetch function that hedges slow requests across providers."""
+
+    def __init__(self, registry: ProviderRegistry):
+        if not registry.providers:
+            raise ValueError("HedgedFetcher needs at least one provider")
+        self.registry = registry
+        self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES * 2, thread_name_prefix="provider")
+        self.hedged = 0
+        self.fetches = 0
+
+    def _submit(self, name: str, username: str) -> Future:
+        stats = self.registry.stats[name]
+        fetch = self.registry.providers[name]
+
+        def timed() -> Optional[int]:
+            started = time.monotonic()
+            try:
+                count = fetch(username)
+            except Exception as e:
+                logger.error(f"Provider {name} error: {e}")
+                count = None
+            stats.record(time.monotonic() - started, count is not None)
+            return count
+
+        future = self.executor.submit(timed)
+        future.provider = name
+        return future
+
+    def fetch(self, username: str) -> Optional[int]:
+        ranked = self.registry.ranked()
+        primary = ranked[0]
+        # With a single provider the backup request goes to the same provider
+        backups = ranked[1:] or ranked
+
+        self.fetches += 1
+        if self.fetches % PROVIDER_REPORT_EVERY == 0:
+            logger.info(self.report())
+
+        pending = {self._submit(primary, username)}
+        delay = self.registry.stats[primary].percentile(0.95) or HEDGE_DEFAULT_DELAY
+
+        while pending:
+            done, pending = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                count = future.result()
+                if count is not None:
+                    self.registry.stats[future.provider].wins += 1
+                    return count
+            if backups:
+                # Primary is slower than usual (or failed): race a backup against it
+                if not done:
+                    self.hedged += 1
+                pending.add(self._submit(backups.pop(0), username))
+            delay = None
+        return None
+
+    def fetcher(self, username: str) -> Callable[[], Optional[int]]:
+        """fetch_follower_count-style callable bound to one username."""
+        return partial(self.fetch, username)
+
+    def report(self) -> str:
+        parts = []
+        for name in self.registry.ranked():
+            stats = self.registry.stats[name]
+            p95 = stats.percentile(0.95)
+            p95_text = f"{p95 * 1000:.0f}ms" if p95 is not None else "n/a"
+            parts.append(f"{name}: p95 {p95_text}, {stats.error_rate:.0%} errors, {stats.wins}/{stats.requests} won")
+        return f"Providers ({self.hedged}/{self.fetches} hedged) - " + "; ".join(parts)
@@ -0,0 +1,163 @@
+"""
+Replay / backtest: run the real tracker loop over a recorded or synthetic series.
+
+The tracker runs on a VirtualClock, so every sleep just moves time forward
+and hours of history replay in seconds. Storage, notification and audio
+handlers are replaced by counting stubs, but the consumers keep their real
+coalescing and cooldown policies. Samples go to a scratch history database
+(the previous store is put back afterwards) and raw readings are not logged.
+"""
+
+import csv
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .clock import VirtualClock
+from .confirmation import ChangeConfirmer
+from .events import ChangeEvent
+from .history import HistoryStore, set_history
+from .tracker import create_event_bus, run_tracker
+
+Series = List[Tuple[float, int]]  # (timestamp, follower count), in time order
+
+
+class CountingSink:
+    """Consumer handler stand-in that only counts what it receives."""
+
+    def __init__(self):
+        self.calls = 0
+        self.net = 0
+
+    def __call__(self, event: ChangeEvent) -> None:
+        self.calls += 1
+        self.net += event.delta
+
+
+class SeriesFetcher:
+    """fetch_follower_count stand-in returning the series value at the clock's current time."""
+
+    def __init__(self, series: Sequence[Tuple[float, int]], clock: VirtualClock, stop: threading.Event):
+        self.times = [ts for ts, _ in series]
+        self.values = [value for _, value in series]
+        self.clock = clock
+        self.stop = stop
+        self.polls = 0
+
+    def __call__(self) -> int:
+        self.polls += 1
+        now = self.clock.time()
+        if now >= self.times[-1]:
+            self.stop.set()
+        return self.values[max(0, bisect_right(self.times, now) - 1)]
+
+
+def synthetic_series(
+    hours: float,
+    start_value: int = 100000,
+    gains_per_hour: float = 600,
+    losses_per_hour: float = 200,
+    flaps_per_hour: float = 20,
+    bursts: int = 3,
+    seed: Optional[int] = None
+) -> Series:
+    """One sample per second: random gains/losses, +1/-1 flaps and a few large bursts."""
+    rng = random.Random(seed)
+    seconds = int(hours * 3600)
+    start = time.time() - seconds
+    burst_at = {rng.randrange(seconds): rng.choice([-1, 1]) * rng.randint(20, 200) for _ in range(bursts)}
+    series, value, flap = [], start_value, 0
+    for i in range(seconds):
+        value += flap  # Undo last second's flap
+        flap = 0
+        if rng.random() < gains_per_hour / 3600:
+            value += 1
+        if rng.random() < losses_per_hour / 3600:
+            value -= 1
+        if rng.random() < flaps_per_hour / 3600:
+            flap = rng.choice([-1, 1])
+            value -= flap
+        value += burst_at.get(i, 0)
+        series.append((start + i, value))
+    return series
+
+
+def load_csv_series(path: str) -> Series:
+    """Reads "timestamp,count" rows (a header row is skipped)."""
+    series = []
+    with open(path) as f:
+        for row in csv.reader(f):
+            try:
+                series.append((float(row[0]), int(row[1])))
+            except (ValueError, IndexError):
+                continue
+    return sorted(series)
+
+
+def load_history_series(account: str, metric: str = "followers", start: float = 0, end: Optional[float] = None) -> Series:
+    """Reads recorded samples from the history database."""
+    return [(s.ts, s.value) for s in HistoryStore().samples(account, metric, start, end)]
+
+
+def run_replay(series: Series, announce: bool = True) -> dict:
+    """Replays a series through run_tracker and returns the report."""
+    if len(series) < 2:
+        raise ValueError("Replay needs at least two samples")
+
+    clock = VirtualClock(start=series[0][0])
+    stop = threading.Event()
+    sinks = {name: CountingSink() for name in ("storage", "notification", "audio", "stream")}
+    bus = create_event_bus(announce, handlers=sinks, start=False)
+    clock.on_advance(bus.pump)
+    confirmer = ChangeConfirmer(raw_log=None)  # Keep replayed readings out of raw.txt
+    fetch = SeriesFetcher(series, clock, stop)
+
+    scratch = tempfile.mkdtemp(prefix="replay-")
+    history = HistoryStore(os.path.join(scratch, "history.db"))
+    previous = set_history(history)
+    try:
+        started = time.perf_counter()
+        run_tracker(fetch, "replay", account="replay", clock=clock, stop=stop, bus=bus, confirmer=confirmer)
+        # Let the consumers finish what is still waiting on a cooldown
+        wake = bus.pump(clock.time())
+        while wake is not None:
+            clock.sleep(wake - clock.time())
+            wake = bus.pump(clock.time())
+        wall = time.perf_counter() - started
+    finally:
+        set_history(previous)
+        history.close()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    raw_changes = sum(1 for (_, a), (_, b) in zip(series, series[1:]) if a != b)
+    consumers: Dict[str, dict] = {}
+    for consumer in bus.consumers:
+        stats = consumer.stats
+        consumers[consumer.name] = {
+            "received": stats["received"],
+            "handled": stats["handled"],
+            "merged": stats["merged"],
+            "dropped": stats["dropped"],
+            "merge_rate": round(stats["merged"] / stats["received"], 3) if stats["received"] else 0.0,
+            "latency_avg": round(stats["latency_total"] / stats["handled"], 3) if stats["handled"] else None,
+            "latency_max": round(stats["latency_max"], 3),
+            "sink_calls": sinks[consumer.name].calls,
+        }
+    return {
+        "samples": len(series),
+        "virtual_seconds": round(clock.monotonic(), 1),
+        "wall_seconds": round(wall, 3),
+        "speedup": round(clock.monotonic() / wall) if wall else None,
+        "polls": fetch.polls,
+        "us_per_poll": round(wall / fetch.polls * 1e6, 1) if fetch.polls else None,
+        "raw_changes": raw_changes,
+        "events": confirmer.confirmed,
+        "suppressed": confirmer.suppressed,
+        "events_per_second": round(confirmer.confirmed / wall, 1) if wall else None,
+        "consumers": consumers,
+    }
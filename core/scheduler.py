@@ -0,0 +1,162 @@
+"""
+Poll scheduler phase-locked to the upstream cache refresh.
+
+InstaStatistics only refreshes its data every UPSTREAM_REFRESH_INTERVAL
+seconds, so polling on a free-running timer either re-reads the same cached
+snapshot or sees a change up to one refresh late. The scheduler learns when
+refreshes happen from the polls themselves: whenever the value (or the
+response cache stamp) changes, the refresh must have happened between the
+previous poll and this one. Intersecting those windows narrows down the
+refresh phase, and once locked each poll is timed just after the next refresh.
+
+Locked polls are one period apart, so each sees exactly one refresh whatever
+the phase and their windows say nothing new. A locked poll that sees its
+refresh confirms the estimate; one that misses it (with cache stamps) drops
+the lock; and every SCHEDULER_PROBE_EVERY polls an extra probe just before
+the expected refresh re-checks the phase from the other side.
+"""
+
+import random
+from typing import Hashable, Optional
+
+from .config import (
+    UPSTREAM_REFRESH_INTERVAL, CHECK_INTERVAL,
+    SCHEDULER_GUARD, SCHEDULER_LOCK_UNCERTAINTY, SCHEDULER_DRIFT, SCHEDULER_PROBE_EVERY
+)
+
+
+class PhaseLockedScheduler:
+    """
+    Estimates the upstream refresh phase and picks the next poll time.
+
+    Times are seconds on any monotonic clock (time.monotonic() in the tracker).
+    """
+
+    def __init__(self, period: float = UPSTREAM_REFRESH_INTERVAL, min_interval: float = CHECK_INTERVAL):
+        self.period = period
+        # Poll once per refresh, or every k-th refresh when CHECK_INTERVAL is longer
+        self.stride = max(1, round(min_interval / period))
+        self.phase: Optional[float] = None  # refresh time modulo period
+        self.uncertainty = period / 2       # half-width of the phase estimate
+        self.polls = 0
+        self.wasted_polls = 0
+        self._last_value = None
+        self._last_stamp: Optional[Hashable] = None
+        self._last_started: Optional[float] = None
+        self._last_target: Optional[float] = None
+        self._latency = 0.0
+        self._since_probe = 0
+        self._probing = False  # The next observed poll is a probe sent before the refresh
+
+    @property
+    def locked(self) -> bool:
+        return self.phase is not None and self.uncertainty <= SCHEDULER_LOCK_UNCERTAINTY
+
+    def _circular_offset(self, a: float, b: float) -> float:
+        """Signed distance from b to a on the period circle, in [-period/2, period/2)."""
+        return (a - b + self.period / 2) % self.period - self.period / 2
+
+    def _narrow(self, window_start: float, window_end: float) -> None:
+        """Intersects the phase estimate with a window known to contain a refresh."""
+        half = (window_end - window_start) / 2
+        if half >= self.period / 2:
+            return  # Window spans a whole period, says nothing about the phase
+        center = (window_start + half) % self.period
+
+        if self.phase is None:
+            self.phase, self.uncertainty = center, half
+            return
+
+        delta = self._circular_offset(center, self.phase)
+        low = max(-self.uncertainty, delta - half)
+        high = min(self.uncertainty, delta + half)
+        if low > high:
+            # Inconsistent with what we believed (upstream shifted): start over from this window
+            self.phase, self.uncertainty = center, half
+        else:
+            self.phase = (self.phase + (low + high) / 2) % self.period
+            self.uncertainty = (high - low) / 2
+
+    def observe(self, started: float, finished: float, value, stamp: Optional[Hashable] = None) -> None:
+        """
+        Records one successful poll.
+
+        Args:
+            started: Time the request was sent.
+            finished: Time the response arrived.
+            value: Value returned by the fetch.
+            stamp: Optional upstream cache stamp (ETag, Last-Modified...). When given,
+                a refresh is detected even if the value itself did not change.
+        """
+        self.polls += 1
+        probe, self._probing = self._probing, False
+        self._latency = finished - started
+        confirmed = False
+
+        if self._last_started is not None:
+            stamped = stamp is not None and self._last_stamp is not None
+            if stamped:
+                refreshed = stamp != self._last_stamp
+            else:
+                # Without a stamp an unchanged value may still be a fresh snapshot,
+                # so wasted_polls is an upper bound in this mode
+                refreshed = value != self._last_value
+            if not refreshed:
+                self.wasted_polls += 1
+
+            if refreshed:
+                # A locked poll landing after its refresh confirms the estimate
+                confirmed = self.locked and not probe
+                self._narrow(self._last_started, finished)
+            if self.locked and (refreshed if probe else stamped and not refreshed):
+                # The refresh came before the estimate allows (probe), or not yet when it should
+                # have (regular poll): upstream shifted, re-acquire
+                self.uncertainty = self.period / 2
+
+        if not confirmed:
+            # Let the estimate widen slowly so drift between clocks is picked up again
+            self.uncertainty = min(self.period / 2, self.uncertainty + SCHEDULER_DRIFT)
+
+        self._last_value = value
+        self._last_stamp = stamp
+        self._last_started = started
+
+    def next_delay(self, now: float) -> float:
+        """Seconds to wait before the next poll."""
+        if not self.locked:
+            self._last_target = None
+            # Still acquiring: probe twice per period at jittered offsets so
+            # successive change windows land in different places and intersect
+            return self.period / 2 * random.uniform(0.6, 1.0)
+
+        # Latest plausible refresh moment, plus a guard for upstream processing
+        offset = self.phase + self.uncertainty + SCHEDULER_GUARD
+        target = now - (now - offset) % self.period + self.period * self.stride
+        # Right after locking, the last poll may already have seen the refresh this targets
+        last = self._last_target if self._last_target is not None else self._last_started
+        if last is not None and target - last < self.period * self.stride / 2:
+            # The estimate crept forward (drift/narrowing) past the refresh we just polled;
+            # don't poll that same refresh twice
+            target += self.period * self.stride
+
+        self._since_probe += 1
+        if self._since_probe >= SCHEDULER_PROBE_EVERY:
+            # Answered before the earliest plausible refresh, so it should see the old snapshot;
+            # the regular poll after it then brackets the refresh in a window shorter than a period
+            probe = target - 2 * self.uncertainty - SCHEDULER_GUARD - self._latency
+            if probe > now:
+                self._since_probe = 0
+                self._probing = True
+                return probe - now
+
+        self._last_target = target
+        return target - now
+
+    def report(self) -> str:
+        """One-line summary of the current phase estimate and poll efficiency."""
+        if self.phase is None:
+            estimate = "unknown"
+        else:
+            state = "locked" if self.locked else "acquiring"
+            estimate = f"{self.phase:.2f}s ± {self.uncertainty:.2f}s ({state})"
+        return f"Upstream phase {estimate}; {self.wasted_polls}/{self.polls} polls saw no refresh"
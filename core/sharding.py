@@ -0,0 +1,295 @@
+"""
+Sharded multi-process tracker for very large username lists.
+A coordinator splits accounts across worker processes; each worker runs the
+multi-account tracker for its shard and publishes counts into shared memory.
+Workers send their change events to the coordinator, which serves the one
+event stream for all shards.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import (
+    SHARD_WORKERS, SHARD_MAX_WORKERS, SHARD_HEARTBEAT_TIMEOUT,
+    SHARD_LAG_THRESHOLD, SHARD_SUPERVISE_INTERVAL, SHARD_ANNOUNCE_CHANGES, EVENT_STREAM
+)
+from .event_stream import EventStreamServer
+from .logger import logger
+
+# Factory returning a fetch_follower_count-style callable for one username.
+# Must be picklable (a module-level function), e.g. apis.instastatistics.make_fetcher
+FetcherFactory = Callable[[str], Callable[[], Optional[int]]]
+
+# Optional (also picklable) hooks passed on to track_accounts in every worker
+CacheStampGetter = Callable[[str], Optional[str]]
+RetryDelay = Callable[[], float]
+
+
+class SharedCountTable:
+    """
+    Fixed-size table of per-account state in shared memory.
+
+    Workers write their own slots; the parent reads any slot without IPC.
+    Each slot is guarded by a sequence counter (seqlock) so readers never
+    see a count from one sample paired with the timestamp of another.
+    """
+
+    def __init__(self, size: int, max_workers: int):
+        self.size = size
+        self._seq = RawArray('Q', size)
+        self._count = RawArray('q', size)
+        self._updated = RawArray('d', size)
+        self._failures = RawArray('l', size)
+        self._heartbeat = RawArray('d', max_workers)
+
+    def publish(self, slot: int, count: int, failures: int) -> None:
+        """Writes one account's latest state (called from the owning worker only)."""
+        # Odd while writing; "| 1" also recovers a slot left odd by a writer that died mid-update
+        seq = (self._seq[slot] + 1) | 1
+        self._seq[slot] = seq
+        self._count[slot] = count
+        self._updated[slot] = time.time()
+        self._failures[slot] = failures
+        self._seq[slot] = seq + 1
+
+    def read(self, slot: int) -> Tuple[int, float, int]:
+        """Returns (count, updated_at, failures) for one slot."""
+        for _ in range(1000):
+            before = self._seq[slot]
+            if before & 1:
+                continue
+            row = (self._count[slot], self._updated[slot], self._failures[slot])
+            if self._seq[slot] == before:
+                return row
+        # Writer died mid-update; its replacement will overwrite the slot
+        return (self._count[slot], self._updated[slot], self._failures[slot])
+
+    def beat(self, worker_id: int) -> None:
+        self._heartbeat[worker_id] = time.time()
+
+    def last_beat(self, worker_id: int) -> float:
+        return self._heartbeat[worker_id]
+
+
+async def _heartbeat(table: SharedCountTable, worker_id: int) -> None:
+    """Marks the worker alive; stalls if the worker's event loop is blocked."""
+    while True:
+        table.beat(worker_id)
+        await asyncio.sleep(1)
+
+
+async def _run_shard(
+    worker_id: int,
+    shard: Sequence[Tuple[int, str]],
+    make_fetcher: FetcherFactory,
+    table: SharedCountTable,
+    events: Optional[multiprocessing.Queue] = None,
+    get_cache_stamp: Optional[CacheStampGetter] = None,
+    retry_delay: Optional[RetryDelay] = None
+) -> None:
+    from .multi_tracker import track_accounts
+
+    fetchers = {username: make_fetcher(username) for _, username in shard}
+    slots = {username: slot for slot, username in shard}
+
+    def publish(state) -> None:
+        table.publish(slots[state.username], state.stored_count, state.failures)
+
+    await asyncio.gather(
+        _heartbeat(table, worker_id),
+        track_accounts(
+            lambda username: fetchers[username](),
+            list(slots),
+            on_sample=publish,
+            announce=SHARD_ANNOUNCE_CHANGES,
+            get_cache_stamp=get_cache_stamp,
+            retry_delay=retry_delay,
+            stream=events.put if events is not None else None
+        )
+    )
+
+
+def _worker_main(
+    worker_id: int,
+    shard: Sequence[Tuple[int, str]],
+    make_fetcher: FetcherFactory,
+    table: SharedCountTable,
+    events: Optional[multiprocessing.Queue] = None,
+    get_cache_stamp: Optional[CacheStampGetter] = None,
+    retry_delay: Optional[RetryDelay] = None
+) -> None:
+    """Worker process entry point."""
+    try:
+        asyncio.run(_run_shard(worker_id, shard, make_fetcher, table, events, get_cache_stamp, retry_delay))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardCoordinator:
+    """Starts, supervises and rebalances the worker processes."""
+
+    def __init__(self, usernames: Sequence[str], make_fetcher: FetcherFactory, workers: int = SHARD_WORKERS,
+                 get_cache_stamp: Optional[CacheStampGetter] = None, retry_delay: Optional[RetryDelay] = None):
+        self.usernames = list(dict.fromkeys(usernames))
+        self.make_fetcher = make_fetcher
+        self.get_cache_stamp = get_cache_stamp
+        self.retry_delay = retry_delay
+        self.max_workers = max(SHARD_MAX_WORKERS, workers)
+        self.table = SharedCountTable(len(self.usernames), self.max_workers)
+        # Change events from every worker, published by the coordinator's event stream
+        self.events: Optional[multiprocessing.Queue] = multiprocessing.Queue() if EVENT_STREAM else None
+        self.stream: Optional[EventStreamServer] = None
+
+        # worker_id -> list of (slot, username); slot indexes the shared table
+        self.shards: Dict[int, List[Tuple[int, str]]] = {}
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.started_at: Dict[int, float] = {}
+
+        workers = max(1, min(workers, len(self.usernames)))
+        for worker_id in range(workers):
+            self.shards[worker_id] = [
+                (slot, username) for slot, username in enumerate(self.usernames)
+                if slot % workers == worker_id
+            ]
+
+    def _spawn(self, worker_id: int) -> None:
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(worker_id, self.shards[worker_id], self.make_fetcher, self.table,
+                  self.events, self.get_cache_stamp, self.retry_delay),
+            name=f"shard-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self.processes[worker_id] = process
+        self.started_at[worker_id] = time.time()
+        self.table.beat(worker_id)
+        logger.info(f"Started shard {worker_id} (pid {process.pid}) with {len(self.shards[worker_id])} accounts")
+
+    def _stop(self, worker_id: int) -> None:
+        process = self.processes.pop(worker_id, None)
+        if process and process.is_alive():
+            process.terminate()
+            process.join(5)
+
+    def _lagging_accounts(self, worker_id: int, now: float) -> int:
+        """Counts accounts in a shard that have not published a sample recently."""
+        if now - self.started_at[worker_id] < SHARD_LAG_THRESHOLD:
+            return 0
+        return sum(
+            1 for slot, _ in self.shards[worker_id]
+            if now - self.table.read(slot)[1] > SHARD_LAG_THRESHOLD
+        )
+
+    def _split(self, worker_id: int) -> None:
+        """Moves half of a lagging shard to a new worker."""
+        new_id = next(i for i in range(self.max_workers) if i not in self.shards)
+        shard = self.shards[worker_id]
+        self.shards[worker_id], self.shards[new_id] = shard[::2], shard[1::2]
+        self._stop(worker_id)
+        self._spawn(worker_id)
+        self._spawn(new_id)
+        logger.warning(f"Shard {worker_id} fell behind; split into shards {worker_id} and {new_id}")
+
+    def supervise_once(self) -> None:
+        """Restarts dead or stalled workers and splits shards that fall behind."""
+        now = time.time()
+        for worker_id in list(self.shards):
+            process = self.processes.get(worker_id)
+
+            if process is None or not process.is_alive():
+                code = process.exitcode if process else None
+                logger.error(f"Shard {worker_id} died (exit code {code}), restarting...")
+                self._stop(worker_id)
+                self._spawn(worker_id)
+            elif now - self.table.last_beat(worker_id) > SHARD_HEARTBEAT_TIMEOUT:
+                logger.error(f"Shard {worker_id} stopped responding, restarting...")
+                self._stop(worker_id)
+                self._spawn(worker_id)
+            else:
+                lagging = self._lagging_accounts(worker_id, now)
+                shard_size = len(self.shards[worker_id])
+                if lagging > shard_size // 2:
+                    if shard_size > 1 and len(self.shards) < self.max_workers:
+                        self._split(worker_id)
+                    else:
+                        logger.warning(f"Shard {worker_id}: {lagging}/{shard_size} accounts are lagging")
+
+    def snapshot(self) -> Dict[str, Tuple[int, float, int]]:
+        """Returns username -> (count, updated_at, failures) for every account."""
+        return {username: self.table.read(slot) for slot, username in enumerate(self.usernames)}
+
+    def _forward_events(self) -> None:
+        """Publishes the workers' change events (dropped if another tracker serves the stream)."""
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            if self.stream:
+                self.stream.publish(event)
+
+    def start(self) -> None:
+        if self.events is not None:
+            stream = EventStreamServer()
+            try:
+                self.stream = stream if stream.start() else None
+            except OSError as e:
+                logger.warning(f"Event stream unavailable: {e}")
+            threading.Thread(target=self._forward_events, name="shard-events", daemon=True).start()
+        for worker_id in self.shards:
+            self._spawn(worker_id)
+
+    def stop(self) -> None:
+        for worker_id in list(self.processes):
+            self._stop(worker_id)
+        if self.events is not None:
+            self.events.put(None)
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+    def run(self) -> None:
+        """Starts all workers and supervises them until interrupted."""
+        self.start()
+        try:
+            while True:
+                time.sleep(SHARD_SUPERVISE_INTERVAL)
+                self.supervise_once()
+                fresh = sum(
+                    1 for _, updated, _ in self.snapshot().values()
+                    if time.time() - updated <= SHARD_LAG_THRESHOLD
+                )
+                logger.debug(f"{fresh}/{len(self.usernames)} accounts fresh across {len(self.processes)} shards")
+        except KeyboardInterrupt:
+            logger.info("Tracker stopped.")
+        finally:
+            self.stop()
+
+
+def run_sharded_tracker(
+    make_fetcher: FetcherFactory,
+    usernames: Sequence[str],
+    workers: int = SHARD_WORKERS,
+    api_name: str = "API",
+    get_cache_stamp: Optional[CacheStampGetter] = None,
+    retry_delay: Optional[RetryDelay] = None
+) -> None:
+    """
+    Sharded tracker entry point.
+
+    Args:
+        make_fetcher: Picklable factory returning a fetch_follower_count callable for a username.
+        usernames: Accounts to track.
+        workers: Number of worker processes to start with.
+        api_name: Name of the API for logging purposes.
+        get_cache_stamp: Optional picklable function returning a username's last upstream
+            cache stamp in the worker (phase-locked polling).
+        retry_delay: Optional picklable function giving the wait after a failed fetch.
+    """
+    logger.info(f"🚀 Starting sharded Instagram Follower Tracker ({api_name}): "
+                f"{len(usernames)} accounts across {workers} workers")
+    ShardCoordinator(usernames, make_fetcher, workers, get_cache_stamp, retry_delay).run()
@@ -1,14 +1,38 @@
 """
-File storage utilities for follower count persistence.
+Storage utilities for follower count persistence.
+
+Stored values live in the history database (core/history.py). The old
+followers.txt / accounts/<username>.txt files are only read once, to migrate
+an existing count into the history. read_stored_followers/write_followers
+keep their original path-based signatures for older callers and map those
+paths onto the history.
 """
 
 import os
-from .config import FOLLOWERS_FILE
+from typing import Dict, Optional, Tuple
+
+from .config import PROJECT_DIR, FOLLOWERS_FILE, ACCOUNTS_DIR, INSTAGRAM_USERNAME
+from .events import ChangeEvent
+from .history import get_history
 from .logger import logger
 
 
-def read_stored_followers(filepath: str = FOLLOWERS_FILE) -> int:
-    """Reads the stored follower count from file."""
+def get_metric_file(metric: str = "followers") -> str:
+    """Returns the legacy stored value file for a metric of the single-account tracker."""
+    if metric == "followers":
+        return FOLLOWERS_FILE
+    return os.path.join(PROJECT_DIR, f"{metric}.txt")
+
+
+def get_followers_file(username: str, metric: str = "followers") -> str:
+    """Returns the legacy per-account stored value file used by the multi-account tracker."""
+    if metric == "followers":
+        return os.path.join(ACCOUNTS_DIR, f"{username}.txt")
+    return os.path.join(ACCOUNTS_DIR, f"{username}.{metric}.txt")
+
+
+def read_legacy_file(filepath: str) -> int:
+    """Reads a count from a legacy stored value file."""
     try:
         if os.path.exists(filepath):
             with open(filepath, 'r') as f:
@@ -19,10 +43,78 @@ def read_stored_followers(filepath: str = FOLLOWERS_FILE) -> int:
     return 0
 
 
+def _migrate_legacy(account: str, metric: str) -> Optional[int]:
+    """Imports a count from the legacy text files into the history, if there is one."""
+    paths = [get_followers_file(account, metric)]
+    if account == INSTAGRAM_USERNAME:
+        paths.append(get_metric_file(metric))
+    for path in paths:
+        count = read_legacy_file(path)
+        if count:
+            get_history().record_change(account, metric, None, count, ts=os.path.getmtime(path))
+            logger.info(f"Migrated stored {metric} for @{account} from {path}: {count}")
+            return count
+    return None
+
+
+def read_stored_value(account: str = INSTAGRAM_USERNAME, metric: str = "followers") -> Optional[int]:
+    """Reads the stored value (follower count by default) for an account, None if none."""
+    try:
+        value = get_history().latest(account, metric)
+        if value is None:
+            value = _migrate_legacy(account, metric)
+        return value
+    except Exception as e:
+        logger.error(f"Reading history error: {e}")
+        return None
+
+
+def store_value(count: int, account: str = INSTAGRAM_USERNAME, metric: str = "followers") -> None:
+    """Stores an initial value (no previous value known) for an account."""
+    get_history().record_change(account, metric, None, count)
+
+
+def _legacy_key(filepath: str) -> Optional[Tuple[str, str]]:
+    """(account, metric) stored in place of a legacy value file, None for any other path."""
+    path = os.path.abspath(filepath)
+    if path == os.path.abspath(FOLLOWERS_FILE):
+        return INSTAGRAM_USERNAME, "followers"
+    if os.path.dirname(path) == os.path.abspath(ACCOUNTS_DIR):
+        name = os.path.splitext(os.path.basename(path))[0]
+        account, _, metric = name.partition(".")
+        return account, metric or "followers"
+    return None
+
+
+def read_stored_followers(filepath: str = FOLLOWERS_FILE) -> int:
+    """Legacy path-based reader (0 if nothing is stored); use read_stored_value(account, metric)."""
+    key = _legacy_key(filepath)
+    if not key:
+        return read_legacy_file(filepath)
+    value = read_stored_value(*key)
+    return 0 if value is None else value
+
+
 def write_followers(count: int, filepath: str = FOLLOWERS_FILE) -> None:
-    """Writes the current follower count to file."""
+    """Legacy path-based writer; use store_value(count, account, metric)."""
+    key = _legacy_key(filepath)
+    if key:
+        store_value(count, *key)
+        return
     try:
         with open(filepath, 'w') as f:
             f.write(str(count))
     except Exception as e:
         logger.error(f"Writing file error: {e}")
+
+
+def record_change(event: ChangeEvent) -> None:
+    """Stores a change event."""
+    get_history().record_change(event.account, event.metric, event.old, event.new, ts=event.detected_at)
+
+
+def record_sample(account: str, sample: Dict[str, int], ts: Optional[float] = None) -> None:
+    """Appends one reading of every metric to the history."""
+    history = get_history()
+    for metric, value in sample.items():
+        history.record_sample(account, metric, value, ts)
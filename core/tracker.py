@@ -2,108 +2,272 @@
 Main tracker loop - the core logic that all API implementations share.
 """
 
+import threading
 import time
 import random
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional, Union
 
 from .config import (
-    CHECK_INTERVAL, RETRY_INTERVAL,
-    NOTIFICATION_COOLDOWN
+    INSTAGRAM_USERNAME, CHECK_INTERVAL, RETRY_INTERVAL,
+    NOTIFICATION_COOLDOWN, AUDIO_COOLDOWN, NOTIFY_METRICS, ANALYTICS_IN_NOTIFICATION, EVENT_STREAM,
+    NOTIF_DAEMON, NOTIF_DAEMON_COOLDOWN, AUDIO_ENGINE,
+    PHASE_LOCKED_POLLING, SCHEDULER_REPORT_EVERY
 )
 from .logger import logger
-from .storage import read_stored_followers, write_followers
-from .network import is_connected, wait_for_internet
+from .storage import read_stored_value, store_value, record_change, record_sample
+from .network import connectivity, wait_for_internet
 from .notifications import send_notification
-from .notification_streaming import get_random_gif
-from .audio import play_gain_audio, play_loss_audio
+from .notification_client import renderer
+from .audio import play_gain_audio, play_loss_audio, warm_up as warm_up_audio
+from .scheduler import PhaseLockedScheduler
+from .events import ChangeEvent, Consumer, EventBus
+from .formatting import format_change_message, change_segments
+from .clock import SystemClock, VirtualClock, system_clock
+from .event_stream import EventStreamServer
+from .confirmation import ChangeConfirmer
+from .analytics import get_analytics
+
+
+def as_metrics(sample: Union[int, Dict[str, int], None]) -> Optional[Dict[str, int]]:
+    """Accepts either a plain follower count or a metrics record from a fetch function."""
+    if sample is None or isinstance(sample, dict):
+        return sample
+    return {"followers": sample}
+
+
+def diff_metrics(
+    account: str,
+    stored: Dict[str, int],
+    sample: Dict[str, int],
+    confirmer: Optional[ChangeConfirmer] = None,
+    now: Optional[float] = None
+) -> List[ChangeEvent]:
+    """
+    Compares a sample with the stored values and returns one event per changed metric.
+    Metrics with nothing stored yet are initialized instead. With a confirmer, a
+    change is only returned (and stored) once it is confirmed.
+    """
+    now = now if now is not None else time.time()
+    events = []
+    for metric, value in sample.items():
+        if metric not in stored:
+            stored_value = read_stored_value(account, metric)
+            if stored_value is None:
+                stored[metric] = value
+                store_value(value, account, metric)
+                logger.info(f"@{account}: initialized {metric}: {value}")
+                continue
+            stored[metric] = stored_value
+        if confirmer:
+            event = confirmer.observe(account, metric, stored[metric], value, now)
+        elif value != stored[metric]:
+            event = ChangeEvent(account, metric, stored[metric], value, now)
+        else:
+            event = None
+        if event:
+            events.append(event)
+            stored[metric] = value
+    return events
+
+
+def update_analytics(
+    account: str, sample: Dict[str, int], now: Optional[float] = None, interval: float = CHECK_INTERVAL
+) -> None:
+    """Feeds the follower count into the account's rolling analytics and logs anomalies."""
+    engine = get_analytics(account, interval)
+    flag = engine.add(now if now is not None else time.time(), sample["followers"])
+    if flag:
+        anomaly = engine.last_anomaly
+        logger.warning(f"@{account}: sudden {flag} in followers ({anomaly['delta']:+d} in one poll, z={anomaly['z']})")
+
+
+def notify_change(event: ChangeEvent) -> Optional[float]:
+    """
+    Shows the desktop notification for a change. Returns NOTIFICATION_COOLDOWN
+    when the renderer daemon didn't take it: one-off overlays don't merge, so
+    they must not follow each other at the daemon's short cooldown.
+    """
+    is_gain = event.delta > 0
+    message = format_change_message(event)
+    headline = ""
+    if ANALYTICS_IN_NOTIFICATION and event.metric == "followers":
+        headline = get_analytics(event.account).headline()
+        if headline:
+            message += f" · {headline}"
+    shown = send_notification(
+        message, is_gain=is_gain, segments=change_segments(event, headline),
+        change=dict(event.to_dict(), headline=headline)
+    )
+    return None if shown else NOTIFICATION_COOLDOWN
+
+
+def play_change_audio(event: ChangeEvent) -> None:
+    """Plays the intro + voice announcement for a change."""
+    if event.delta > 0:
+        play_gain_audio(event.delta)
+    else:
+        play_loss_audio(abs(event.delta))
+
+
+def create_event_bus(
+    announce: bool = True,
+    handlers: Optional[Dict[str, Callable[[ChangeEvent], None]]] = None,
+    start: bool = True
+) -> EventBus:
+    """
+    Builds (and by default starts) the bus the tracker publishes changes to.
+
+    Args:
+        announce: Attach the notification and audio consumers (storage, and the event
+            stream with EVENT_STREAM, are attached either way).
+        handlers: Replacement handlers by consumer name ("storage", "notification", "audio",
+            "stream"), e.g. counting stubs in a replay; the consumer policies stay the same.
+        start: Start the consumer threads; replays leave them stopped and call bus.pump().
+    """
+    handlers = handlers or {}
+    bus = EventBus()
+    # History keeps every change, so storage does not coalesce
+    bus.subscribe(Consumer("storage", handlers.get("storage", record_change), coalesce=False))
+    if announce:
+        # Changes arriving during a cooldown are merged into one net announcement;
+        # the renderer daemon merges into visible popups, so it only needs a short one
+        # (notify_change asks for the full cooldown whenever the daemon wasn't reached)
+        bus.subscribe(Consumer(
+            "notification", handlers.get("notification", notify_change),
+            cooldown=NOTIF_DAEMON_COOLDOWN if NOTIF_DAEMON else NOTIFICATION_COOLDOWN, metrics=NOTIFY_METRICS
+        ))
+        # Voice clips only exist for follower changes
+        bus.subscribe(Consumer(
+            "audio", handlers.get("audio", play_change_audio),
+            cooldown=AUDIO_COOLDOWN, metrics=["followers"]
+        ))
+        if start and NOTIF_DAEMON and "notification" not in handlers:
+            # Start the renderer now so the first notification doesn't wait for Qt to load
+            threading.Thread(target=renderer.ensure_running, name="notify-warmup", daemon=True).start()
+        if start and AUDIO_ENGINE and "audio" not in handlers:
+            # Same for the audio player and the decoded clips
+            threading.Thread(target=warm_up_audio, name="audio-warmup", daemon=True).start()
+    if EVENT_STREAM:
+        # Subscribers want changes even from a tracker that doesn't announce them
+        publish = handlers.get("stream") or (start and _start_event_stream())
+        if publish:
+            bus.subscribe(Consumer("stream", publish, coalesce=False))
+    return bus.start() if start else bus
+
+
+def _start_event_stream() -> Optional[Callable[[ChangeEvent], None]]:
+    server = EventStreamServer()
+    try:
+        return server.publish if server.start() else None
+    except OSError as e:
+        logger.warning(f"Event stream unavailable: {e}")
+        return None
 
 
 def run_tracker(
-    fetch_follower_count: Callable[[], Optional[int]],
-    api_name: str = "API"
+    fetch_follower_count: Callable[[], Union[int, Dict[str, int], None]],
+    api_name: str = "API",
+    get_cache_stamp: Optional[Callable[[], Optional[str]]] = None,
+    retry_delay: Optional[Callable[[], float]] = None,
+    account: str = INSTAGRAM_USERNAME,
+    clock: Union[SystemClock, VirtualClock] = system_clock,
+    stop: Optional[threading.Event] = None,
+    bus: Optional[EventBus] = None,
+    confirmer: Optional[ChangeConfirmer] = None
 ) -> None:
     """
     Main tracker loop.
     
     Args:
-        fetch_follower_count: Function that returns current follower count or None on error.
+        fetch_follower_count: Function that returns current follower count (or a dict of
+            profile metrics including "followers") or None on error.
         api_name: Name of the API for logging purposes.
+        get_cache_stamp: Optional function returning the upstream cache stamp of the last
+            response, which helps the phase-locked scheduler spot refreshes.
+        retry_delay: Optional function giving the wait after a failed fetch (e.g. the
+            HTTP client's backoff); defaults to RETRY_INTERVAL, doubled after 3 failures.
+        account: Account the fetch function reads (used for storage and logs).
+        clock: Time source for every sleep and timestamp (a VirtualClock in replays,
+            which also skips the network checks).
+        stop: Optional event that ends the loop once set.
+        bus: Event bus to publish to (default: create_event_bus()).
+        confirmer: Change confirmer to use (default: a new ChangeConfirmer).
     """
     logger.info(f"🚀 Starting Instagram Follower Tracker ({api_name})")
-    wait_for_internet()
-
-    stored_count = read_stored_followers()
-    if stored_count == 0:
-        new_count = fetch_follower_count()
-        if new_count is not None:
-            stored_count = new_count
-            write_followers(stored_count)
-            logger.info(f"Initialized followers: {stored_count}")
+    if not clock.virtual:
+        wait_for_internet()
+
+    stored: Dict[str, int] = {}
+    stored_count = read_stored_value(account)
+    if stored_count is None:
+        sample = as_metrics(fetch_follower_count())
+        if sample is not None:
+            for metric, value in sample.items():
+                stored[metric] = value
+                store_value(value, account, metric)
+            logger.info(f"Initialized followers: {sample['followers']}")
         else:
             logger.error("Failed to initialize, exiting...")
             return
     else:
         logger.info(f"Stored followers: {stored_count}")
 
+    bus = bus or create_event_bus()
+    confirmer = confirmer or ChangeConfirmer()
     consecutive_failures = 0
+    scheduler = PhaseLockedScheduler() if PHASE_LOCKED_POLLING else None
     
-    while True:
-        if not is_connected():
-            logger.warning("Internet connection lost. Waiting...")
-            wait_for_internet()
-            logger.info("Internet connection restored.")
+    while not (stop and stop.is_set()):
+        if connectivity.is_open and not clock.virtual:
+            connectivity.wait_until_closed()
             consecutive_failures = 0
 
         try:
-            new_count = fetch_follower_count()
+            started = clock.monotonic()
+            sample = as_metrics(fetch_follower_count())
             
-            if new_count is None:
+            if sample is None:
                 consecutive_failures += 1
-                if consecutive_failures >= 3:
-                    logger.warning(f"Failed {consecutive_failures} times, waiting longer...")
-                    time.sleep(RETRY_INTERVAL * 2)
+                if retry_delay:
+                    delay = retry_delay()
+                elif consecutive_failures >= 3:
+                    delay = RETRY_INTERVAL * 2
                 else:
-                    time.sleep(RETRY_INTERVAL)
+                    delay = RETRY_INTERVAL
+                if consecutive_failures >= 3:
+                    logger.warning(f"Failed {consecutive_failures} times, waiting {delay:.1f}s...")
+                clock.sleep(delay)
                 continue
             
             consecutive_failures = 0
+            now = clock.time()
+            record_sample(account, sample, now)
+            update_analytics(account, sample, now)
+
+            if scheduler:
+                stamp = get_cache_stamp() if get_cache_stamp else None
+                scheduler.observe(started, clock.monotonic(), sample, stamp)
+                if scheduler.polls % SCHEDULER_REPORT_EVERY == 0:
+                    logger.info(scheduler.report())
+            if confirmer.count_poll():
+                logger.info(confirmer.report())
 
-            diff = new_count - stored_count
+            events = diff_metrics(account, stored, sample, confirmer, now)
             
-            if diff == 0:
-                logger.info(f"No change in followers ({new_count}).")
-            elif diff > 0:
-                unit = "follower" if diff == 1 else "followers"
-                message = f"You got {diff} {unit}. Total: {new_count}"
-                logger.info(message)
-                
-                # Get GIF here to ensure we track last used (since tracker process persists)
-                gif_path = get_random_gif(is_gain=True)
-                send_notification(message, is_gain=True, gif_path=gif_path)
-                
-                play_gain_audio(diff)
-                stored_count = new_count
-                write_followers(stored_count)
-                # Wait for notification to finish before next check
-                time.sleep(NOTIFICATION_COOLDOWN)
-            else:
-                drop = abs(diff)
-                unit = "follower" if drop == 1 else "followers"
-                message = f"You lost {drop} {unit}. Total: {new_count}"
-                logger.info(message)
-                
-                # Get GIF here to ensure we track last used
-                gif_path = get_random_gif(is_gain=False)
-                send_notification(message, is_gain=False, gif_path=gif_path)
-                
-                play_loss_audio(drop)
-                stored_count = new_count
-                write_followers(stored_count)
-                # Wait for notification to finish before next check
-                time.sleep(NOTIFICATION_COOLDOWN)
+            if not events:
+                logger.info(f"No change in followers ({stored['followers']}).")
+            for event in events:
+                logger.info(format_change_message(event))
+                if event.metric == "followers":
+                    logger.info(f"Stats: {get_analytics(account).summary()}")
+                # Presentation and storage happen on the bus; polling carries on immediately
+                bus.publish(event)
                         
         except Exception as e:
             logger.error(f"Error during follower count processing: {e}")
-            time.sleep(RETRY_INTERVAL)
+            clock.sleep(RETRY_INTERVAL)
             
-        time.sleep(CHECK_INTERVAL + random.uniform(0, 1))
+        if scheduler:
+            clock.sleep(scheduler.next_delay(clock.monotonic()))
+        else:
+            clock.sleep(CHECK_INTERVAL + random.uniform(0, 1))
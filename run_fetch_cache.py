@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Local fetch cache daemon for InstaStatistics.
+Start once per host, then run trackers with --cache.
+"""
+
+from apis.instastatistics import fetch_profile_metrics_for, get_cache_stamp
+from core.fetch_cache import run_fetch_cache
+
+if __name__ == "__main__":
+    run_fetch_cache(fetch_profile_metrics_for, get_cache_stamp=get_cache_stamp)
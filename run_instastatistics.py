@@ -2,10 +2,68 @@
 """
 Instagram Follower Tracker - InstaStatistics API
 Fastest option with 2-second cache refresh!
+
+Usage:
+    python3 run_instastatistics.py                      # track INSTAGRAM_USERNAMES from config
+    python3 run_instastatistics.py user1 user2 ...      # track these accounts concurrently
+    python3 run_instastatistics.py --file users.txt --workers 8   # shard a large list across processes
+    python3 run_instastatistics.py --cache ...          # fetch through run_fetch_cache.py
+    python3 run_instastatistics.py --providers instastatistics ...  # hedge requests across providers
 """
 
-from apis.instastatistics import fetch_follower_count
+import argparse
+from functools import partial
+
+from apis import PROVIDERS, get_hedged_fetcher, make_hedged_fetcher
+from apis.instastatistics import (
+    fetch_profile_metrics, fetch_profile_metrics_for, make_metrics_fetcher,
+    fetch_follower_count_cached, make_cached_fetcher, get_cached_stamp, get_cache_stamp, retry_delay
+)
+from core.config import INSTAGRAM_USERNAMES
 from core.tracker import run_tracker
+from core.multi_tracker import run_multi_tracker
+from core.sharding import run_sharded_tracker
+
+API_NAME = "InstaStatistics API - 2s cache"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("usernames", nargs="*", help="Accounts to track (default: INSTAGRAM_USERNAMES)")
+    parser.add_argument("--file", help="Read usernames from a file, one per line")
+    parser.add_argument("--workers", type=int, default=0, help="Split accounts across this many worker processes")
+    parser.add_argument("--cache", action="store_true", help="Fetch through the local fetch cache daemon")
+    parser.add_argument("--providers", help=f"Comma-separated providers to hedge across ({', '.join(PROVIDERS)})")
+    args = parser.parse_args()
+
+    usernames = list(args.usernames)
+    if args.file:
+        with open(args.file) as f:
+            usernames += [line.strip().lstrip("@") for line in f if line.strip()]
+
+    if args.providers:
+        names = [name.strip() for name in args.providers.split(",") if name.strip()]
+        hedged = get_hedged_fetcher(names)
+        fetch_for, factory = hedged.fetch, partial(make_hedged_fetcher, names)
+        fetch_single = hedged.fetcher(INSTAGRAM_USERNAMES[0])
+        stamp_for = get_cache_stamp
+    elif args.cache:
+        fetch_for, factory = fetch_follower_count_cached, make_cached_fetcher
+        fetch_single = make_cached_fetcher(INSTAGRAM_USERNAMES[0])
+        stamp_for = get_cached_stamp  # Stamps come back from the daemon, not this process's fetches
+    else:
+        fetch_for, factory, fetch_single = fetch_profile_metrics_for, make_metrics_fetcher, fetch_profile_metrics
+        stamp_for = get_cache_stamp
+
+    if args.workers > 0:
+        run_sharded_tracker(
+            factory, usernames or INSTAGRAM_USERNAMES, args.workers, API_NAME, stamp_for, retry_delay
+        )
+    elif usernames or len(INSTAGRAM_USERNAMES) > 1:
+        run_multi_tracker(fetch_for, usernames or INSTAGRAM_USERNAMES, API_NAME, stamp_for, retry_delay)
+    else:
+        run_tracker(fetch_single, API_NAME, stamp_for, retry_delay)
+
 
 if __name__ == "__main__":
-    run_tracker(fetch_follower_count, "InstaStatistics API - 2s cache")
+    main()
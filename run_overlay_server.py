@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+OBS overlay server: serves the gain/loss popup as a browser source.
+Run it next to a tracker, then add http://<host>:<port>/ as a Browser Source in OBS.
+"""
+
+import argparse
+
+from core.config import OVERLAY_HOST, OVERLAY_PORT
+from core.overlay_server import run_overlay_server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the follower popup to OBS browser sources")
+    parser.add_argument("--host", default=OVERLAY_HOST, help="Use 0.0.0.0 for OBS on other machines")
+    parser.add_argument("--port", type=int, default=OVERLAY_PORT)
+    args = parser.parse_args()
+    run_overlay_server(args.host, args.port)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark the follower-count extraction paths on recorded API payloads.
+
+Compares the full parse (json.loads + dict lookups) with the incremental
+fast path (scan_profile_metrics) on the same bytes, and reports time, peak
+allocation, how much of the body the fast path had to read, and the
+compressed transfer size.
+
+Usage:
+    python3 scripts/bench_extract.py --record ishowspeed   # save a live payload
+    python3 scripts/bench_extract.py                       # benchmark scripts/payloads/*.json
+    python3 scripts/bench_extract.py payload1.json ...     # benchmark specific files
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOAD_DIR = os.path.join(BASE_DIR, "scripts", "payloads")
+sys.path.insert(0, BASE_DIR)
+
+from apis.instastatistics import (  # noqa: E402
+    API_URL_TEMPLATE, session, scan_profile_metrics, extract_profile_metrics
+)
+
+
+def record(username):
+    os.makedirs(PAYLOAD_DIR, exist_ok=True)
+    response = session.get(API_URL_TEMPLATE.format(username=username), timeout=15)
+    response.raise_for_status()
+    path = os.path.join(PAYLOAD_DIR, f"{username}.json")
+    with open(path, "wb") as f:
+        f.write(response.content)
+    print(f"Saved {len(response.content)} bytes to {path}")
+
+
+def synthetic_payload():
+    """Profile-shaped payload used only when no recorded payloads exist."""
+    posts = [{"id": str(i), "caption": "x" * 200, "likeCount": i * 7, "commentCount": i} for i in range(60)]
+    return json.dumps({
+        "success": True,
+        "user": {
+            "username": "synthetic",
+            "fullName": "Synthetic Profile",
+            "biography": "b" * 150,
+            "followerCount": 123456,
+            "followingCount": 321,
+            "mediaCount": 60,
+            "posts": posts,
+        },
+    }).encode()
+
+
+def chunked(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def full_parse(body):
+    return extract_profile_metrics(json.loads(body))
+
+
+def fast_parse(chunks):
+    metrics, buffer = scan_profile_metrics(iter(chunks))
+    if metrics is None:
+        return extract_profile_metrics(json.loads(buffer)), len(buffer)
+    return metrics, len(buffer)
+
+
+def time_it(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def peak_alloc(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench(name, body, iterations, chunk_size):
+    chunks = chunked(body, chunk_size)
+    full_metrics = full_parse(body)
+    fast_metrics, read = fast_parse(chunks)
+
+    full_s = time_it(lambda: full_parse(body), iterations)
+    fast_s = time_it(lambda: fast_parse(chunks), iterations)
+
+    return {
+        "payload": name,
+        "bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body)),
+        "fast_bytes_read": read,
+        "full_us": round(full_s * 1e6, 1),
+        "fast_us": round(fast_s * 1e6, 1),
+        "speedup": round(full_s / fast_s, 2) if fast_s else None,
+        "full_peak_bytes": peak_alloc(lambda: full_parse(body)),
+        "fast_peak_bytes": peak_alloc(lambda: fast_parse(chunks)),
+        "agree": full_metrics == fast_metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("payloads", nargs="*", help="Recorded payload files (default: scripts/payloads/*.json)")
+    parser.add_argument("--record", metavar="USERNAME", help="Fetch and save a live payload, then exit")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--chunk", type=int, default=8192, help="Chunk size fed to the fast path")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    paths = args.payloads or sorted(glob.glob(os.path.join(PAYLOAD_DIR, "*.json")))
+    if paths:
+        payloads = [(os.path.basename(p), open(p, "rb").read()) for p in paths]
+    else:
+        print("No recorded payloads found (use --record USERNAME); using a synthetic one.\n")
+        payloads = [("synthetic", synthetic_payload())]
+
+    for name, body in payloads:
+        result = bench(name, body, args.iterations, args.chunk)
+        if args.json:
+            print(json.dumps(result))
+            continue
+        print(f"{result['payload']}: {result['bytes']} bytes ({result['gzip_bytes']} gzipped), "
+              f"fast path read {result['fast_bytes_read']} bytes")
+        print(f"  full parse: {result['full_us']} us, peak {result['full_peak_bytes']} B")
+        print(f"  fast path:  {result['fast_us']} us, peak {result['fast_peak_bytes']} B "
+              f"({result['speedup']}x){'' if result['agree'] else '  !! metrics differ'}")
+
+
+if __name__ == "__main__":
+    main()
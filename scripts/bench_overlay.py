@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Benchmark the notification overlay under Qt's offscreen platform (no display needed).
+
+Measures, per notification:
+  - construction to first painted frame (setup_ui, GIF load, font, first paint)
+  - paint time per frame while fading in and out (the window rendered at each
+    opacity step, ~60 fps for FADE_DURATION)
+  - resident memory: peak while shown and what is left after it closes
+and per asset in assets/gain and assets/loss, the time to decode every GIF frame
+(pre-scaled copy when built, see scripts/build_assets.py, and the original).
+
+Usage:
+    python3 scripts/bench_overlay.py                   # human-readable summary
+    python3 scripts/bench_overlay.py --json > run.json # machine-readable, for comparing runs
+    python3 scripts/bench_overlay.py --runs 50 --movie-cache
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from collections import OrderedDict  # noqa: E402
+
+from PyQt5.QtCore import QEvent, QObject, QSize, QT_VERSION_STR, PYQT_VERSION_STR  # noqa: E402
+from PyQt5.QtGui import QImage, QMovie, QPainter  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from core.assets import asset_cache, asset_catalog  # noqa: E402
+from core.config import GAIN_GIF_SIZE, LOSS_GIF_SIZE  # noqa: E402
+from core.notification_streaming import (  # noqa: E402
+    FADE_DURATION, GREEN, RED, WHITE, StreamingNotification
+)
+
+FRAME_MS = 1000 / 60
+
+
+def rss_kb(field="VmRSS"):
+    """Resident memory (or VmHWM, the peak) of this process in kB; 0 where /proc isn't available."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def reset_peak_rss():
+    """Resets VmHWM so the next reading is the peak since now (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class PaintWatcher(QObject):
+    """Notes when a widget receives its first paint event."""
+
+    def __init__(self):
+        super().__init__()
+        self.painted_at = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def summarize(samples_us):
+    samples = sorted(samples_us)
+    if not samples:
+        return None
+    return {
+        "mean": round(statistics.fmean(samples), 1),
+        "median": round(statistics.median(samples), 1),
+        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+        "max": round(samples[-1], 1),
+    }
+
+
+def segments(i, is_gain):
+    color = GREEN if is_gain else RED
+    line1 = [("You ", WHITE), (f"{'got' if is_gain else 'lost'} {i + 1}", color), (" followers", WHITE)]
+    line2 = [("Total: ", WHITE), (str(100000 + i), color)]
+    return line1, line2
+
+
+def fade_frames(notif, target, start, end):
+    """Renders the window once per frame of a fade from start to end opacity; returns per-frame us."""
+    steps = max(1, round(FADE_DURATION / FRAME_MS))
+    times = []
+    for step in range(steps + 1):
+        opacity = start + (end - start) * step / steps
+        started = time.perf_counter()
+        target.fill(0)
+        painter = QPainter(target)
+        painter.setOpacity(opacity)
+        notif.render(painter)
+        painter.end()
+        times.append((time.perf_counter() - started) * 1e6)
+    return times
+
+
+def bench_notification(app, i, is_gain, gif_path):
+    baseline = rss_kb()
+    peak_tracked = reset_peak_rss()
+    watcher = PaintWatcher()
+
+    started = time.perf_counter()
+    line1, line2 = segments(i, is_gain)
+    notif = StreamingNotification(line1, line2, is_gain, gif_path)
+    notif.installEventFilter(watcher)
+    notif.show_notification()
+    deadline = started + 2
+    while watcher.painted_at is None and time.perf_counter() < deadline:
+        app.processEvents()
+    if watcher.painted_at is None:
+        notif.grab()  # Platform didn't paint on its own; force the first frame
+        watcher.painted_at = time.perf_counter()
+    first_paint_ms = (watcher.painted_at - started) * 1000
+
+    target = QImage(notif.size(), QImage.Format_ARGB32_Premultiplied)
+    fade_in = fade_frames(notif, target, 0.0, 1.0)
+    fade_out = fade_frames(notif, target, 1.0, 0.0)
+    shown_kb = rss_kb("VmHWM") if peak_tracked else rss_kb()
+
+    notif.close_timer.stop()
+    notif.close()
+    notif.deleteLater()
+    app.processEvents()
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    after_kb = rss_kb()
+
+    return {
+        "gif": os.path.basename(gif_path) if gif_path else None,
+        "first_paint_ms": round(first_paint_ms, 2),
+        "fade_in_frame_us": fade_in,
+        "fade_out_frame_us": fade_out,
+        "peak_rss_kb": shown_kb - baseline,
+        "retained_rss_kb": after_kb - baseline,
+    }
+
+
+def bench_decode(path, height, prebuilt):
+    """Decodes every frame of a GIF the way the overlay loads it."""
+    entry = asset_cache.lookup(path, height) if prebuilt else None
+    if prebuilt and entry is None:
+        return None
+    started = time.perf_counter()
+    movie = QMovie(entry["path"] if entry else path)
+    if not entry:
+        movie.jumpToFrame(0)
+        size = movie.currentImage().size()
+        movie.setScaledSize(QSize(int(height * size.width() / max(1, size.height())), height))
+    frames = movie.frameCount()
+    for frame in range(frames):
+        movie.jumpToFrame(frame)
+        movie.currentImage()
+    total_ms = (time.perf_counter() - started) * 1000
+    return {"frames": frames, "total_ms": round(total_ms, 2), "per_frame_us": round(total_ms * 1000 / max(1, frames), 1)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the notification overlay offscreen")
+    parser.add_argument("--runs", type=int, default=20, help="Notifications to show (alternating gain/loss)")
+    parser.add_argument("--movie-cache", action="store_true", help="Keep decoded GIFs like the renderer daemon does")
+    parser.add_argument("--skip-decode", action="store_true", help="Skip the per-asset GIF decode benchmark")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    if args.movie_cache:
+        StreamingNotification.movie_cache = OrderedDict()
+        StreamingNotification.movie_cache_size = 16
+    asset_catalog.watch = False
+    asset_catalog.start()
+
+    runs = []
+    for i in range(args.runs):
+        is_gain = i % 2 == 0
+        runs.append(bench_notification(app, i, is_gain, asset_catalog.pick(is_gain)))
+
+    warm = runs[1:] or runs
+    fade_in = [us for r in warm for us in r["fade_in_frame_us"]]
+    fade_out = [us for r in warm for us in r["fade_out_frame_us"]]
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "platform": app.platformName(),
+        "movie_cache": args.movie_cache,
+        "runs": args.runs,
+        "first_notification_ms": runs[0]["first_paint_ms"] if runs else None,
+        "first_paint_ms": summarize([r["first_paint_ms"] for r in warm]),
+        "fade_in_frame_us": summarize(fade_in),
+        "fade_out_frame_us": summarize(fade_out),
+        "peak_rss_kb": summarize([r["peak_rss_kb"] for r in warm]),
+        "retained_rss_kb": sum(r["retained_rss_kb"] for r in warm),
+        "notifications": [
+            {k: v for k, v in r.items() if not k.endswith("_frame_us")} for r in runs
+        ],
+        "assets": [],
+    }
+
+    if not args.skip_decode:
+        for kind, height in (("gain", GAIN_GIF_SIZE), ("loss", LOSS_GIF_SIZE)):
+            for path, asset in sorted(asset_catalog.assets[kind].items()):
+                if not path.lower().endswith(".gif"):
+                    continue
+                result["assets"].append({
+                    "kind": kind,
+                    "file": os.path.basename(path),
+                    "bytes": asset.bytes,
+                    "source_size": [asset.width, asset.height],
+                    "original": bench_decode(path, height, prebuilt=False),
+                    "prebuilt": bench_decode(path, height, prebuilt=True),
+                })
+
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(f"Overlay benchmark ({result['platform']}, Qt {result['qt']}, {args.runs} notifications"
+          f"{', movie cache' if args.movie_cache else ''})")
+    print(f"  first notification: {result['first_notification_ms']} ms to first paint")
+    fp = result["first_paint_ms"]
+    if fp:
+        print(f"  construction -> first paint: {fp['median']} ms median, {fp['p95']} ms p95")
+    for name in ("fade_in_frame_us", "fade_out_frame_us"):
+        s = result[name]
+        if s:
+            print(f"  {name.split('_frame')[0].replace('_', '-')} frame: {s['median']} us median, "
+                  f"{s['p95']} us p95, {s['max']} us max")
+    if result["peak_rss_kb"]:
+        print(f"  memory: {result['peak_rss_kb']['median']} kB peak per notification, "
+              f"{result['retained_rss_kb']} kB retained after {len(warm)} closed")
+    for a in result["assets"]:
+        original = a["original"]
+        line = f"  {a['kind']}/{a['file'][:40]}: {original['frames']} frames, {original['total_ms']} ms"
+        if a["prebuilt"]:
+            line += f" (pre-scaled {a['prebuilt']['total_ms']} ms)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Pre-scale the notification GIFs to their display size (needs Pillow).
+
+The renderer also does this when it starts; run it by hand after adding GIFs
+or changing GAIN_GIF_SIZE/LOSS_GIF_SIZE/ASSET_* to have them ready at once.
+
+Usage:
+    python3 scripts/build_assets.py           # build new or changed entries
+    python3 scripts/build_assets.py --force   # rebuild everything
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core.assets import asset_cache, pillow_available  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-scale notification GIFs")
+    parser.add_argument("--force", action="store_true", help="Rebuild entries that are up to date")
+    args = parser.parse_args()
+
+    if not pillow_available():
+        print("Pillow is not installed (pip install Pillow).")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    report = asset_cache.build_all(force=args.force)
+    elapsed = time.perf_counter() - started
+    print(f"{report['built']} built, {report['cached']} up to date, {report['failed']} failed "
+          f"in {elapsed:.1f}s -> {asset_cache.cache_dir}")
+    if report["source_bytes"]:
+        print(f"  {report['source_bytes'] / 1e6:.1f} MB of sources -> {report['cache_bytes'] / 1e6:.1f} MB cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Pre-mix every announcement (intro + voice clip at AUDIO_OVERLAY_DELAY) into AUDIO_PREMIX_DIR.
+
+The tracker also mixes and caches them on first use; run this after
+generating voices or changing AUDIO_OVERLAY_DELAY to have them all ready.
+Decoding the mp3 intros needs mpv.
+
+Usage:
+    python3 scripts/build_premix.py
+"""
+
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core.premix import premix_cache  # noqa: E402
+
+
+def main():
+    started = time.perf_counter()
+    report = premix_cache.build_all()
+    elapsed = time.perf_counter() - started
+    print(f"{report['built']} mixed, {report['cached']} up to date, {report['failed']} failed "
+          f"in {elapsed:.1f}s -> {premix_cache.cache_dir}")
+    if report["bytes"]:
+        print(f"  {report['bytes'] / 1e6:.1f} MB of pre-mixed audio "
+              f"(disk budget {premix_cache.disk_bytes / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
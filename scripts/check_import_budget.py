@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check that the headless tracker stays light to import.
+
+Imports each tracker module in a fresh interpreter and fails (exit 1) if
+a GUI/imaging module gets pulled in (PyQt5 and Pillow belong to the renderer
+process only), or if the import time or resident memory goes over budget.
+
+Usage:
+    python3 scripts/check_import_budget.py
+    python3 scripts/check_import_budget.py --max-ms 300 --max-rss-mb 32 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the polling process loads
+TARGETS = ["core.tracker", "core.multi_tracker", "core.sharding"]
+
+# Only the renderer (core.notification_daemon / core.notification_streaming) and the asset build may load these
+FORBIDDEN = ["PyQt5", "PIL"]
+
+MAX_IMPORT_MS = 500   # Best of --runs, cold-ish interpreter
+MAX_RSS_MB = 40       # Resident memory added by the import
+
+CHILD = """
+import json, sys, time
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+before = rss_kb()
+started = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - started
+loaded = sorted({name.split(".")[0] for name in sys.modules})
+print(json.dumps({"ms": elapsed * 1000, "rss_mb": (rss_kb() - before) / 1024, "modules": loaded}))
+"""
+
+
+def slowest_imports(importtime_log: str, count: int = 5):
+    """Direct imports of the target with the largest cumulative time (from -X importtime)."""
+    entries = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        if level == 1 and cumulative.strip().isdigit():
+            entries.append((name.strip(), int(cumulative) / 1000))
+    return sorted(entries, key=lambda entry: -entry[1])[:count]
+
+
+def measure(target: str, runs: int) -> dict:
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD, target],
+            cwd=BASE_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit code {result.returncode}"
+            return {"target": target, "error": error}
+        record = json.loads(result.stdout.strip().splitlines()[-1])
+        if best is None or record["ms"] < best["ms"]:
+            best = dict(record, slowest=slowest_imports(result.stderr))
+    loaded = best.pop("modules")
+    best["forbidden"] = [name for name in FORBIDDEN if name in loaded]
+    best["target"] = target
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the tracker's import time and memory budget")
+    parser.add_argument("--max-ms", type=float, default=MAX_IMPORT_MS, help="Import time budget per module (ms)")
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_RSS_MB, help="Resident memory budget per module (MB)")
+    parser.add_argument("--runs", type=int, default=3, help="Imports per module (the fastest counts)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(target, args.runs) for target in TARGETS]
+    failures = []
+    for r in results:
+        if "error" in r:
+            failures.append(f"{r['target']}: import failed ({r['error']})")
+            continue
+        if r["forbidden"]:
+            failures.append(f"{r['target']}: imports {', '.join(r['forbidden'])}")
+        if r["ms"] > args.max_ms:
+            failures.append(f"{r['target']}: {r['ms']:.0f} ms > {args.max_ms:.0f} ms")
+        if r["rss_mb"] > args.max_rss_mb:
+            failures.append(f"{r['target']}: {r['rss_mb']:.1f} MB > {args.max_rss_mb:.0f} MB")
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}))
+    else:
+        for r in results:
+            if "error" in r:
+                continue
+            slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in r["slowest"])
+            print(f"{r['target']}: {r['ms']:.0f} ms, +{r['rss_mb']:.1f} MB RSS (slowest: {slowest})")
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if not failures:
+            print(f"OK: within {args.max_ms:.0f} ms / {args.max_rss_mb:.0f} MB, no {'/'.join(FORBIDDEN)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Query the follower history database.
+
+Usage:
+    python3 scripts/history.py ishowspeed                      # summary of the last 24h
+    python3 scripts/history.py ishowspeed --since 30d --rollup day
+    python3 scripts/history.py ishowspeed --changes --since 1h
+    python3 scripts/history.py ishowspeed --samples --since 10m --metric following
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core.config import INSTAGRAM_USERNAME  # noqa: E402
+from core.history import ROLLUPS, HistoryStore  # noqa: E402
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+
+
+def parse_time(value):
+    """Accepts a relative age (90s, 10m, 24h, 30d, 1y), a unix timestamp or an ISO date."""
+    if value[-1] in UNITS and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * UNITS[value[-1]]
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def fmt(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the follower history database")
+    parser.add_argument("account", nargs="?", default=INSTAGRAM_USERNAME)
+    parser.add_argument("--metric", default="followers")
+    parser.add_argument("--since", default="24h", help="Start: age (10m, 24h, 30d), timestamp or ISO date")
+    parser.add_argument("--until", help="End (default: now)")
+    view = parser.add_mutually_exclusive_group()
+    view.add_argument("--rollup", choices=list(ROLLUPS), help="List rollup buckets")
+    view.add_argument("--changes", action="store_true", help="List stored changes")
+    view.add_argument("--samples", action="store_true", help="List raw samples")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args()
+
+    start = parse_time(args.since)
+    end = parse_time(args.until) if args.until else time.time()
+    history = HistoryStore()
+
+    if args.rollup:
+        rows = history.rollup(args.account, args.metric, args.rollup, start, end)
+    elif args.changes:
+        rows = [c._asdict() for c in history.changes(args.account, args.metric, start, end)]
+    elif args.samples:
+        rows = [s._asdict() for s in history.samples(args.account, args.metric, start, end)]
+    else:
+        summary = history.aggregate(args.account, args.metric, start, end)
+        if args.json:
+            print(json.dumps(summary))
+        elif summary is None:
+            print(f"No {args.metric} history for @{args.account} in that range.")
+        else:
+            print(f"@{args.account} {args.metric}, {fmt(start)} - {fmt(end)} ({summary['resolution']} rollups)")
+            print(f"  {summary['first']} -> {summary['last']} ({summary['change']:+d}), "
+                  f"min {summary['min']}, max {summary['max']}, avg {summary['avg']:.1f}, "
+                  f"{summary['count']} samples")
+            print(f"  stored value: {history.latest(args.account, args.metric)}")
+        return
+
+    if args.json:
+        print(json.dumps(rows))
+        return
+    for row in rows:
+        when = fmt(row.get("ts", row.get("start")))
+        if args.rollup:
+            print(f"{when}  first {row['first']}  last {row['last']}  min {row['min']}  max {row['max']}  n={row['count']}")
+        elif args.changes:
+            old = row["old"] if row["old"] is not None else "-"
+            print(f"{when}  {old} -> {row['new']}")
+        else:
+            print(f"{when}  {row['value']}")
+
+
+if __name__ == "__main__":
+    main()
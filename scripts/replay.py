@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Replay a follower series through the real tracker on a virtual clock.
+
+Usage:
+    python3 scripts/replay.py --synthetic 6                # 6 hours of synthetic data
+    python3 scripts/replay.py --account ishowspeed --since 24h   # recorded history
+    python3 scripts/replay.py --csv series.csv --json      # "timestamp,count" rows
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core.logger import logger  # noqa: E402
+from core.replay import (  # noqa: E402
+    load_csv_series, load_history_series, run_replay, synthetic_series
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a follower series through the tracker")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--synthetic", type=float, metavar="HOURS", help="Generate a synthetic series")
+    source.add_argument("--account", help="Replay recorded samples of an account from history.db")
+    source.add_argument("--csv", help="Replay a CSV of timestamp,count rows")
+    parser.add_argument("--since", type=float, default=24, metavar="HOURS", help="With --account: hours of history")
+    parser.add_argument("--seed", type=int, help="With --synthetic: random seed")
+    parser.add_argument("--quiet-consumers", action="store_true", help="Only the storage consumer (announce=False)")
+    parser.add_argument("--verbose", action="store_true", help="Keep tracker log output")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    if args.synthetic:
+        series = synthetic_series(args.synthetic, seed=args.seed)
+    elif args.account:
+        series = load_history_series(args.account, start=time.time() - args.since * 3600)
+    else:
+        series = load_csv_series(args.csv)
+
+    if len(series) < 2:
+        print("Not enough samples to replay.")
+        return
+
+    report = run_replay(series, announce=not args.quiet_consumers)
+    if args.json:
+        print(json.dumps(report))
+        return
+
+    print(f"Replayed {report['samples']} samples ({report['virtual_seconds'] / 3600:.1f}h) "
+          f"in {report['wall_seconds']}s ({report['speedup']}x)")
+    print(f"  {report['polls']} polls, {report['us_per_poll']} us per poll")
+    print(f"  {report['raw_changes']} raw changes -> {report['events']} events "
+          f"({report['suppressed']} suppressed), {report['events_per_second']} events/s")
+    for name, c in report["consumers"].items():
+        latency = f"{c['latency_avg']}s avg, {c['latency_max']}s max" if c["latency_avg"] is not None else "n/a"
+        print(f"  {name}: {c['received']} received, {c['handled']} handled, "
+              f"{c['merged']} merged ({c['merge_rate']:.0%}), latency {latency}")
+
+
+if __name__ == "__main__":
+    main()
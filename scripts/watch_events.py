@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Print (or record) change events from a running tracker's event stream.
+
+Usage:
+    python3 scripts/watch_events.py                    # human-readable
+    python3 scripts/watch_events.py --json >> events.jsonl
+    python3 scripts/watch_events.py --metric followers --account ishowspeed
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core.config import EVENT_STREAM_SOCKET  # noqa: E402
+from core.event_stream import subscribe  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch change events from a running tracker")
+    parser.add_argument("--socket", default=EVENT_STREAM_SOCKET)
+    parser.add_argument("--account", help="Only this account")
+    parser.add_argument("--metric", help="Only this metric")
+    parser.add_argument("--json", action="store_true", help="Print JSON lines")
+    args = parser.parse_args()
+
+    try:
+        for event in subscribe(args.socket):
+            if (args.account and event.account != args.account) or (args.metric and event.metric != args.metric):
+                continue
+            if args.json:
+                print(json.dumps(event.to_dict()), flush=True)
+            else:
+                when = datetime.fromtimestamp(event.detected_at).strftime("%H:%M:%S")
+                print(f"{when}  @{event.account} {event.metric} {event.old} -> {event.new} ({event.delta:+d})", flush=True)
+    except (ConnectionRefusedError, FileNotFoundError):
+        print(f"No tracker is streaming on {args.socket}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Stub provider for tests: synthetic follower counts without network access.
+Not registered in apis.PROVIDERS, so it can never feed made-up counts to a real tracker.
+"""
+
+import random
+import time
+from typing import Dict, Optional
+
+
+class StubProvider:
+    """
+    Per-username fetch function returning synthetic counts.
+
+    Args:
+        start: Initial count for every username.
+        step: Maximum change per call (counts drift by a random amount in [-step, step]).
+        latency: Simulated response time in seconds.
+        jitter: Random extra latency added on top, in seconds.
+        failure_rate: Fraction of calls that return None.
+    """
+
+    def __init__(self, start: int = 1000, step: int = 0, latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0):
+        self.start = start
+        self.step = step
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.counts: Dict[str, int] = {}
+        self.calls = 0
+
+    def __call__(self, username: str) -> Optional[int]:
+        self.calls += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if random.random() < self.failure_rate:
+            return None
+        count = self.counts.get(username, self.start) + random.randint(-self.step, self.step)
+        self.counts[username] = max(0, count)
+        return self.counts[username]
@@ -0,0 +1,49 @@
+import random
+
+from core.analytics import INITIAL_SLOTS, RollingAnalytics, ring_capacity
+
+WINDOWS = {"1m": 60, "10m": 600}
+
+
+def naive_window(points, now, span):
+    """Gains/losses between consecutive samples that arrived within span of now."""
+    gained = lost = 0
+    for (_, previous), (ts, value) in zip(points, points[1:]):
+        if ts >= now - span:
+            delta = value - previous
+            gained += max(delta, 0)
+            lost += max(-delta, 0)
+    return gained, lost
+
+
+def test_ring_is_sized_from_the_longest_window_and_interval():
+    assert ring_capacity(WINDOWS, 1) == 601
+    assert ring_capacity(WINDOWS, 2.5) == 241
+    assert RollingAnalytics(windows=WINDOWS, interval=2).capacity == 301
+
+
+def test_ring_is_allocated_lazily_and_grows_to_its_capacity():
+    engine = RollingAnalytics(windows=WINDOWS, interval=1)
+    assert engine.slots == 0 and engine.ts is None
+    engine.add(0.0, 100)
+    assert engine.slots == INITIAL_SLOTS
+    for k in range(1, 2000):
+        engine.add(float(k), 100 + k)
+    assert engine.slots == engine.capacity == 601
+
+
+def test_windows_match_a_naive_recount_across_growth_and_wrap():
+    rng = random.Random(7)
+    engine = RollingAnalytics(windows=WINDOWS, interval=1)
+    points = []
+    value = 1000
+    for k in range(1500):
+        value += rng.randint(-3, 4)
+        points.append((float(k), value))
+        engine.add(float(k), value)
+        if k % 97 == 0 or k == 1499:
+            for name, span in WINDOWS.items():
+                window = engine.window(name)
+                assert (window["gained"], window["lost"]) == naive_window(points, float(k), span)
+    ts, values = engine.series("1m")
+    assert list(values) == [v for t, v in points if t >= points[-1][0] - 60]
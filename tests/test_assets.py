@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+
+import pytest
+
+from core.assets import Asset, AssetCatalog
+
+
+def catalog(weights):
+    """Started catalog (no folder scan, no watcher) holding gain assets with the given weights."""
+    cat = AssetCatalog(watch=False)
+    cat.assets["gain"] = {path: Asset(path, "gain", 1, 1, 1, 1, 0, weight) for path, weight in weights.items()}
+    cat._started = True
+    return cat
+
+
+def picks(cat, count):
+    return [cat.pick(True) for _ in range(count)]
+
+
+@pytest.mark.parametrize("weights", [
+    {"a": 1, "b": 1, "c": 1},
+    {"a": 3, "b": 1, "c": 1},
+    {"a": 2, "b": 2},
+    {"a": 0.4, "b": 2.6},
+])
+def test_bag_holds_each_asset_weight_times(weights):
+    random.seed(1)
+    cat = catalog(weights)
+    cat._fill_bag("gain")
+    assert Counter(cat._bags["gain"]) == {path: max(1, round(w)) for path, w in weights.items()}
+
+
+@pytest.mark.parametrize("weights", [
+    {"a": 1, "b": 1},
+    {"a": 1, "b": 1, "c": 1},
+    {"a": 3, "b": 2, "c": 1},
+    {"a": 2, "b": 2},
+    {"a": 4, "b": 4},
+])
+def test_no_repeat_in_a_row_when_avoidable(weights):
+    for seed in range(50):
+        random.seed(seed)
+        cat = catalog(weights)
+        sequence = picks(cat, 4 * sum(weights.values()))  # Several bags, including their boundaries
+        assert all(a != b for a, b in zip(sequence, sequence[1:])), (seed, sequence)
+
+
+@pytest.mark.parametrize("weights", [{"a": 3, "b": 1, "c": 1}, {"a": 5, "b": 4}])
+def test_asset_holding_most_of_the_bag_is_spread_out(weights):
+    # Over half the bag: it must start (and end) every bag, so only bag boundaries repeat
+    for seed in range(50):
+        random.seed(seed)
+        cat = catalog(weights)
+        cat._fill_bag("gain")
+        bag = cat._bags["gain"][::-1]  # Pick order
+        assert bag[0] == bag[-1] == "a"
+        assert all(x != y for x, y in zip(bag, bag[1:])), (seed, bag)
+
+
+def test_dominant_asset_repeats_only_when_unavoidable():
+    random.seed(3)
+    cat = catalog({"a": 5, "b": 1})
+    cat._fill_bag("gain")
+    bag = cat._bags["gain"][::-1]
+    assert Counter(bag) == {"a": 5, "b": 1}
+    assert bag[:2] == ["a", "b"]  # b goes early to break the run as soon as possible
+
+
+def test_single_asset_and_empty_catalog():
+    assert picks(catalog({"a": 2}), 3) == ["a", "a", "a"]
+    assert catalog({}).pick(True) is None
@@ -0,0 +1,51 @@
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from core.audio_engine import AudioEngine
+
+# Stands in for mpv: reads the PCM stream until stdin closes
+DRAIN = [sys.executable, "-c", "import sys\nwhile sys.stdin.buffer.read(65536): pass"]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.fixture
+def engine():
+    engine = AudioEngine(rate=8000, idle_timeout=0.3)
+    engine.player_cmd = DRAIN
+    yield engine
+    engine.close()
+
+
+def test_player_closes_when_idle_and_restarts_on_demand(engine):
+    assert engine.start()
+    first = engine.process
+    assert wait_for(lambda: engine.process is None)
+    assert first.wait(timeout=2) == 0  # Closed by us, not killed
+    assert engine.stats == dict(engine.stats, idle_stops=1, restarts=0)
+
+    samples = np.zeros((engine.rate, 2), dtype="<i2")  # One second
+    assert engine.play_buffer(samples)
+    second = engine.process
+    assert second is not None and second is not first
+    time.sleep(0.8)  # Still playing, so not idle
+    assert engine.process is second
+    assert wait_for(lambda: engine.process is None)
+    assert engine.stats["idle_stops"] == 2
+
+
+def test_no_idle_stop_with_zero_timeout(engine):
+    engine.idle_timeout = 0
+    assert engine.start()
+    time.sleep(0.5)
+    assert engine.process is not None and engine.process.poll() is None
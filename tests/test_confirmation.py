@@ -0,0 +1,63 @@
+import pytest
+
+from core.confirmation import ChangeConfirmer
+
+
+def feed(confirmer, readings, current=100):
+    """Feeds readings like diff_metrics does; returns the events, with current following confirmations."""
+    events = []
+    for value in readings:
+        event = confirmer.observe("someone", "followers", current, value, now=0.0)
+        if event:
+            events.append(event)
+            current = event.new
+    return events
+
+
+@pytest.fixture(autouse=True)
+def no_raw_log(monkeypatch):
+    monkeypatch.setattr("core.confirmation.raw_logger.disabled", True)
+
+
+def test_change_needs_consecutive_readings():
+    confirmer = ChangeConfirmer(readings=2, band=None)
+    events = feed(confirmer, [101, 101])
+    assert [(e.old, e.new) for e in events] == [(100, 101)]
+    assert confirmer.confirmed == 1
+
+
+def test_flap_is_suppressed():
+    confirmer = ChangeConfirmer(readings=2, band=None)
+    assert feed(confirmer, [101, 100, 100]) == []
+    assert confirmer.suppressed == 1
+
+
+def test_superseded_candidate_carries_the_net_change():
+    confirmer = ChangeConfirmer(readings=2, band=None)
+    events = feed(confirmer, [101, 102, 102])
+    assert [(e.old, e.new) for e in events] == [(100, 102)]
+    assert confirmer.suppressed == 1
+
+
+def test_jump_beyond_band_is_immediate():
+    confirmer = ChangeConfirmer(readings=3, band=2)
+    assert [(e.old, e.new) for e in feed(confirmer, [110])] == [(100, 110)]
+    assert feed(confirmer, [102], current=100) == []
+
+
+def test_single_reading_reports_every_change():
+    confirmer = ChangeConfirmer(readings=1, band=None)
+    assert [e.new for e in feed(confirmer, [101, 100, 99])] == [101, 100, 99]
+
+
+def test_metrics_are_confirmed_independently():
+    confirmer = ChangeConfirmer(readings=2, band=None)
+    assert confirmer.observe("someone", "followers", 100, 101) is None
+    assert confirmer.observe("someone", "posts", 5, 6) is None
+    assert confirmer.observe("other", "followers", 100, 101) is None
+    assert confirmer.observe("someone", "followers", 100, 101).new == 101
+
+
+def test_report_is_due_every_report_every_polls():
+    confirmer = ChangeConfirmer(report_every=3)
+    assert [confirmer.count_poll() for _ in range(7)] == [False, False, True, False, False, True, False]
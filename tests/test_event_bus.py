@@ -0,0 +1,83 @@
+import os
+import socket
+
+import pytest
+
+from core import tracker
+from core.event_stream import EventStreamServer
+from core.events import ChangeEvent, Consumer
+
+
+def consumer_names(bus):
+    return [consumer.name for consumer in bus.consumers]
+
+
+@pytest.mark.parametrize("announce", [True, False])
+def test_event_stream_does_not_depend_on_announce(monkeypatch, announce):
+    monkeypatch.setattr(tracker, "EVENT_STREAM", True)
+    received = []
+    handlers = {"storage": lambda event: None, "stream": received.append}
+    bus = tracker.create_event_bus(announce, handlers=handlers, start=False)
+    assert "stream" in consumer_names(bus)
+    assert ("notification" in consumer_names(bus)) == announce
+
+    bus.publish(ChangeEvent("someone", "followers", 100, 101, 0.0))
+    bus.pump(0.0)
+    assert [event.new for event in received] == [101]
+
+
+def test_event_stream_off(monkeypatch):
+    monkeypatch.setattr(tracker, "EVENT_STREAM", False)
+    bus = tracker.create_event_bus(False, handlers={"stream": lambda event: None}, start=False)
+    assert "stream" not in consumer_names(bus)
+
+
+def test_handler_can_lengthen_the_cooldown():
+    handled = []
+
+    def handler(event):
+        handled.append(event.new)
+        return 5.0 if event.new == 101 else None
+
+    consumer = Consumer("notification", handler, cooldown=0.25)
+    consumer.offer(ChangeEvent("someone", "followers", 100, 101, 0.0))
+    assert consumer.pump(0.0) is None
+    consumer.offer(ChangeEvent("someone", "followers", 101, 102, 1.0))
+    assert consumer.pump(1.0) == 5.0  # Still cooling down from the first event
+    assert consumer.pump(5.0) is None
+    consumer.offer(ChangeEvent("someone", "followers", 102, 103, 5.1))
+    assert consumer.pump(5.1) == 5.25
+    assert handled == [101, 102]
+
+
+@pytest.mark.parametrize("shown, cooldown", [(True, None), (False, tracker.NOTIFICATION_COOLDOWN)])
+def test_notification_fallback_uses_the_full_cooldown(monkeypatch, shown, cooldown):
+    monkeypatch.setattr(tracker, "ANALYTICS_IN_NOTIFICATION", False)
+    monkeypatch.setattr(tracker, "send_notification", lambda *args, **kwargs: shown)
+    assert tracker.notify_change(ChangeEvent("someone", "followers", 100, 101, 0.0)) == cooldown
+
+
+def test_second_event_stream_leaves_the_socket_alone(tmp_path):
+    path = str(tmp_path / "events.sock")
+    first, second = EventStreamServer(path), EventStreamServer(path)
+    assert first.start()
+    try:
+        assert not second.start()
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        with probe:
+            probe.connect(path)  # Still the first server's socket
+    finally:
+        first.close()
+    assert not os.path.exists(path)
+    assert second.start()  # Free once the first one is gone
+    second.close()
+
+
+def test_event_stream_replaces_a_stale_socket(tmp_path):
+    path = str(tmp_path / "events.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()  # Left behind by a tracker that crashed
+    server = EventStreamServer(path)
+    assert server.start()
+    server.close()
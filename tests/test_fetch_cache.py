@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from core.fetch_cache import FetchCacheClient, FetchCacheServer
+
+
+class StubFetch:
+    """Upstream stand-in that counts calls and leaves a cache stamp per username."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.stamps = {}
+
+    def __call__(self, username):
+        self.calls += 1
+        time.sleep(self.delay)
+        self.stamps[username] = f"stamp-{self.calls}"
+        return {"followers": 100 + self.calls, "following": 7, "posts": 3}
+
+
+@contextmanager
+def serving(server, path):
+    """Runs server.serve(path) on its own loop in a background thread."""
+    started = {}
+
+    async def main():
+        started["loop"], started["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        try:
+            await server.serve(path)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        started["loop"].call_soon_threadsafe(started["task"].cancel)
+        thread.join(5)
+
+
+def test_concurrent_requests_share_one_upstream_fetch():
+    fetch = StubFetch(delay=0.1)
+    server = FetchCacheServer(fetch, ttl=60)
+
+    async def burst():
+        return await asyncio.gather(*(server.get("someone") for _ in range(10)))
+
+    readings = asyncio.run(burst())
+    assert fetch.calls == 1
+    assert server.stats == {"hits": 0, "coalesced": 9, "upstream": 1}
+    assert all(reading == readings[0] for reading in readings)
+
+
+def test_cached_reading_expires_after_ttl():
+    fetch = StubFetch()
+    server = FetchCacheServer(fetch, ttl=0.05)
+
+    async def scenario():
+        first = await server.get("someone")
+        assert await server.get("someone") == first
+        await asyncio.sleep(0.1)
+        return first, await server.get("someone")
+
+    first, expired = asyncio.run(scenario())
+    assert fetch.calls == 2
+    assert server.stats["hits"] == 1
+    assert expired[0]["followers"] == first[0]["followers"] + 1
+
+
+def test_failed_fetches_are_not_cached():
+    calls = []
+    server = FetchCacheServer(lambda username: calls.append(username), ttl=60)
+
+    async def scenario():
+        return [await server.get("someone") for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [(None, None), (None, None)]
+    assert len(calls) == 2
+
+
+def test_client_gets_metrics_and_stamp_through_the_daemon(tmp_path):
+    path = str(tmp_path / "cache.sock")
+    fetch = StubFetch()
+    server = FetchCacheServer(fetch, ttl=60, get_cache_stamp=fetch.stamps.get)
+    fallback = StubFetch()
+    client = FetchCacheClient(fallback=fallback, socket_path=path, timeout=5)
+
+    with serving(server, path):
+        assert client.fetch("someone") == {"followers": 101, "following": 7, "posts": 3}
+        assert client.get_cache_stamp("someone") == "stamp-1"
+        assert client.fetch("someone")["followers"] == 101  # Served from the cache
+    assert fetch.calls == 1
+    assert fallback.calls == 0
+    assert not os.path.exists(path)
+
+
+def test_follower_counts_are_wrapped_as_metrics(tmp_path):
+    path = str(tmp_path / "cache.sock")
+    server = FetchCacheServer(lambda username: 42, ttl=60)
+    client = FetchCacheClient(fallback=StubFetch(), socket_path=path, timeout=5)
+
+    with serving(server, path):
+        assert client.fetch("someone") == {"followers": 42}
+        assert client.get_cache_stamp("someone") is None
+
+
+def test_second_daemon_leaves_the_socket_alone(tmp_path):
+    path = str(tmp_path / "cache.sock")
+    server = FetchCacheServer(StubFetch(), ttl=60)
+    client = FetchCacheClient(fallback=StubFetch(), socket_path=path, timeout=5)
+
+    with serving(server, path):
+        assert asyncio.run(FetchCacheServer(StubFetch()).serve(path)) is False
+        assert os.path.exists(path)
+        assert client.fetch("someone")["followers"] == 101
+
+
+def test_client_falls_back_while_the_daemon_is_down(tmp_path):
+    fallback = StubFetch()
+    client = FetchCacheClient(
+        fallback=fallback, socket_path=str(tmp_path / "missing.sock"), fallback_stamp=fallback.stamps.get
+    )
+
+    assert client.fetch("someone") == {"followers": 101, "following": 7, "posts": 3}
+    assert client.get_cache_stamp("someone") == "stamp-1"
+    assert client._down_until > time.monotonic()
+    assert client.fetch("someone")["followers"] == 102  # Still inside the reconnect window
+    assert fallback.calls == 2
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from core import storage
+from core.config import ACCOUNTS_DIR
+from core.history import HistoryStore
+
+T0 = 1_700_006_400  # Midnight UTC, a whole day/hour/minute bucket
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    monkeypatch.setattr("core.history._store", store)
+    monkeypatch.setattr("core.history._store_pid", os.getpid())
+    yield store
+    store.close()
+
+
+def record(store, points):
+    for ts, value in points:
+        store.record_sample("someone", "followers", value, ts)
+    store.close()  # Flushes the writer, so the rollups are complete
+
+
+def test_aggregate_over_minutes(store):
+    record(store, [(T0 + 60 * k, 100 + k) for k in range(10)])
+    result = store.aggregate("someone", start=T0, end=T0 + 600, resolution="minute")
+    assert result == {
+        "resolution": "minute", "count": 10, "avg": 104.5,
+        "min": 100, "max": 109, "first": 100, "last": 109, "change": 9,
+    }
+
+
+def test_aggregate_merges_samples_within_a_bucket(store):
+    record(store, [(T0 + 1, 10), (T0 + 2, 30), (T0 + 3, 20), (T0 + 61, 25)])
+    result = store.aggregate("someone", start=T0, end=T0 + 120, resolution="minute")
+    assert (result["count"], result["min"], result["max"], result["first"], result["last"]) == (4, 10, 30, 10, 25)
+    assert result["avg"] == pytest.approx(85 / 4)
+    assert store.rollup("someone", resolution="minute", start=T0, end=T0 + 120)[0]["count"] == 3
+
+
+@pytest.mark.parametrize("span, resolution", [
+    (3600, "minute"),
+    (200 * 3600, "hour"),
+    (150 * 86400, "day"),
+])
+def test_aggregate_picks_the_coarsest_rollup_with_enough_buckets(store, span, resolution):
+    record(store, [(T0, 1), (T0 + span - 1, 2)])
+    result = store.aggregate("someone", start=T0, end=T0 + span)
+    assert result["resolution"] == resolution
+    assert (result["count"], result["change"]) == (2, 1)
+
+
+def test_aggregate_of_empty_range_is_none(store):
+    record(store, [(T0, 1)])
+    assert store.aggregate("someone", start=T0 + 3600, end=T0 + 7200) is None
+    assert store.aggregate("nobody", start=T0, end=T0 + 60) is None
+
+
+def test_store_value_keeps_account_and_metric(store):
+    storage.store_value(5, "someone", "posts")
+    assert storage.read_stored_value("someone", "posts") == 5
+    assert store.latest("someone", "posts") == 5
+
+
+def test_legacy_writer_takes_a_path(store, tmp_path):
+    storage.write_followers(7, os.path.join(ACCOUNTS_DIR, "someone.following.txt"))
+    assert store.latest("someone", "following") == 7
+    assert storage.read_stored_followers(os.path.join(ACCOUNTS_DIR, "someone.following.txt")) == 7
+
+    other = tmp_path / "count.txt"
+    storage.write_followers(3, str(other))
+    assert other.read_text() == "3"
+    assert storage.read_stored_followers(str(other)) == 3
+
+
+def test_nothing_stored_is_none_and_zero_is_a_value(store):
+    assert storage.read_stored_value("nobody", "posts") is None
+    storage.store_value(0, "someone", "posts")
+    assert storage.read_stored_value("someone", "posts") == 0
+
+
+def test_stored_zero_is_compared_not_reinitialized(store):
+    from core.tracker import diff_metrics
+
+    storage.store_value(0, "someone", "posts")
+    events = diff_metrics("someone", {}, {"posts": 1}, now=T0)
+    assert [(event.old, event.new) for event in events] == [(0, 1)]
+
+
+def test_epoch_zero_is_a_timestamp(store):
+    store.record_change("someone", "followers", None, 5, ts=0)  # Changes are never pruned
+    store.close()
+    assert [change.ts for change in store.changes("someone")] == [0]
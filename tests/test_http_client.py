@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from core import http_client
+from core.config import BACKOFF_BASE, BACKOFF_MAX, RETRY_INTERVAL
+from core.http_client import RateLimitedClient, TokenBucket, classify_error, parse_retry_after
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def reply(status, **headers):
+    return SimpleNamespace(status_code=status, headers=headers)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(http_client, "time", clock)
+    return clock
+
+
+def test_bucket_spends_its_burst_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.take()
+    assert clock.slept == []
+    assert bucket.available() == 0
+
+    bucket.take()
+    assert clock.slept == [pytest.approx(0.5)]  # One token at 2 tokens/s
+
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    bucket.take()
+    clock.now += 0.25
+    assert bucket.available() == pytest.approx(2.5)
+    clock.now += 60
+    assert bucket.available() == 3
+
+
+@pytest.mark.parametrize("value, expected", [("30", 30.0), ("0", 0.0), ("1.5", 1.5), ("-5", 0.0)])
+def test_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_retry_after_http_date():
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=120), usegmt=True)
+    assert parse_retry_after(when) == pytest.approx(120, abs=2)
+
+
+def test_retry_after_in_the_past_is_zero():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+@pytest.mark.parametrize("value", [None, "", "soon", "Someday, 99 Foo 2015"])
+def test_retry_after_garbage(value):
+    assert parse_retry_after(value) is None
+
+
+@pytest.mark.parametrize("status, expected", [
+    (429, "rate_limited"), (500, "server"), (503, "server"), (404, "client"), (403, "client"),
+])
+def test_classify_status(status, expected):
+    assert classify_error(status=status) == expected
+
+
+@pytest.mark.parametrize("error, expected", [
+    (requests.Timeout(), "timeout"),
+    (requests.ConnectTimeout(), "timeout"),
+    (requests.ConnectionError(), "connection"),
+    (ValueError(), "other"),
+])
+def test_classify_exception(error, expected):
+    assert classify_error(error) == expected
+
+
+@pytest.fixture
+def ceiling(monkeypatch):
+    """Makes the jitter always pick the top of its range."""
+    monkeypatch.setattr(http_client.random, "uniform", lambda low, high: high)
+
+
+@pytest.mark.parametrize("error", sorted(BACKOFF_BASE))
+def test_backoff_doubles_per_failure_up_to_the_cap(ceiling, clock, error):
+    client = RateLimitedClient(FakeSession())
+    state = client._host("api.example")
+    delays = []
+    for _ in range(12):
+        state.record(error)
+        delays.append(client.retry_delay("api.example"))
+
+    base = BACKOFF_BASE[error]
+    assert delays[:3] == [base, base * 2, base * 4]
+    assert max(delays) == BACKOFF_MAX
+    assert all(a <= b for a, b in zip(delays, delays[1:]))
+
+
+def test_backoff_for_unknown_class_starts_at_retry_interval(ceiling, clock):
+    client = RateLimitedClient(FakeSession())
+    client._host("api.example").record("other")
+    assert client.retry_delay("api.example") == RETRY_INTERVAL
+
+
+def test_jitter_stays_in_the_upper_half(clock):
+    client = RateLimitedClient(FakeSession())
+    client._host("api.example").record("timeout")
+    delays = [client.retry_delay("api.example") for _ in range(200)]
+    assert all(BACKOFF_BASE["timeout"] / 2 <= delay <= BACKOFF_BASE["timeout"] for delay in delays)
+
+
+def test_success_resets_backoff(ceiling, clock):
+    client = RateLimitedClient(FakeSession(reply(500), reply(500), reply(200)))
+    for _ in range(2):
+        client.get("https://api.example/a")
+    assert client.retry_delay("api.example") == BACKOFF_BASE["server"] * 2
+    client.get("https://api.example/a")
+    assert client.budget("api.example")["failures"] == 0
+    assert client.retry_delay("api.example") == RETRY_INTERVAL
+
+
+def test_retry_after_blocks_the_host(ceiling, clock):
+    client = RateLimitedClient(FakeSession(reply(429, **{"Retry-After": "300"}), reply(200)))
+    client.get("https://api.example/a")
+    assert client.retry_delay("api.example") == 300  # Beyond BACKOFF_MAX
+    assert client.budget("api.example")["last_error"] == "rate_limited"
+
+    client.get("https://api.example/a")
+    assert clock.slept[0] == 300  # The next request waits out the block
+
+
+def test_exceptions_are_recorded_and_reraised(ceiling, clock):
+    client = RateLimitedClient(FakeSession(requests.Timeout()))
+    with pytest.raises(requests.Timeout):
+        client.get("https://api.example/a")
+    assert client.budget("api.example")["last_error"] == "timeout"
+    assert client.retry_delay("api.example") == BACKOFF_BASE["timeout"]
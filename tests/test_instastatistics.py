@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from apis.instastatistics import extract_profile_metrics, scan_profile_metrics
+
+USER = {"username": "someone", "followerCount": 1000, "followingCount": 10, "mediaCount": 20}
+
+
+def fast_path(body: bytes, chunk: int = 16):
+    """Metrics the way fetch_profile_metrics_for reads them: scan first, full parse as the fallback."""
+    metrics, buffer = scan_profile_metrics(iter([body[i:i + chunk] for i in range(0, len(body), chunk)]))
+    if metrics is None:
+        return extract_profile_metrics(json.loads(bytes(buffer)))
+    return metrics
+
+
+def both_paths(payload: dict):
+    body = json.dumps(payload).encode()
+    return fast_path(body), extract_profile_metrics(payload)
+
+
+@pytest.mark.parametrize("payload", [
+    {"success": True, "user": USER},
+    {"user": USER, "success": True},
+    {"user": USER},
+    {"success": False, "user": USER},
+    {"user": USER, "success": False},
+    {"user": USER, "posts": ["x" * 100] * 20, "success": False},
+    {"success": 0, "user": USER},
+])
+def test_fast_path_follows_the_success_rule(payload):
+    fast, full = both_paths(payload)
+    assert fast == full
+
+
+def test_fast_path_stops_early_on_success():
+    body = json.dumps({"success": True, "user": USER, "posts": ["x" * 100] * 100}).encode()
+    metrics, buffer = scan_profile_metrics(iter([body[i:i + 64] for i in range(0, len(body), 64)]))
+    assert metrics == {"followers": 1000, "following": 10, "posts": 20}
+    assert len(buffer) < len(body)
+
+
+RELATED = [{"username": "other", "followerCount": 5, "followingCount": 6, "mediaCount": 7}]
+
+
+@pytest.mark.parametrize("payload", [
+    {"success": True, "user": {"related": RELATED, **USER}},
+    {"success": True, "user": {"username": "someone", "related": RELATED, "followerCount": 1000,
+                               "followingCount": 10, "mediaCount": 20}},
+    {"success": True, "suggested": {"user": RELATED[0]}, "user": USER},
+    {"success": True, "user": {"bio": {"entities": [{"mediaCount": 1}]}, **USER}},
+])
+@pytest.mark.parametrize("chunk", [16, 8192])
+def test_fast_path_ignores_nested_profiles(payload, chunk):
+    body = json.dumps(payload).encode()
+    assert fast_path(body, chunk) == extract_profile_metrics(payload) == {
+        "followers": 1000, "following": 10, "posts": 20
+    }
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from core import notification_daemon  # noqa: E402
+from core.events import ChangeEvent  # noqa: E402
+from core.notification_daemon import RendererDaemon  # noqa: E402
+
+
+class FakeSignal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self):
+        for slot in self.slots:
+            slot()
+
+
+class FakePopup:
+    """StreamingNotification stand-in that records what it would draw."""
+
+    movie = None
+
+    def __init__(self, line1, line2, is_gain, gif_path=None):
+        self.line1, self.line2, self.is_gain = line1, line2, is_gain
+        self.closed = FakeSignal()
+        self.y = None
+
+    @property
+    def text(self):
+        return "".join(text for text, _ in self.line1)
+
+    def setAttribute(self, *args):
+        pass
+
+    def position_notification(self, y):
+        self.y = y
+
+    def show_notification(self):
+        pass
+
+    def height(self):
+        return 100
+
+    def update_content(self, line1, line2):
+        self.line1, self.line2 = line1, line2
+
+    def close(self):
+        self.closed.emit()
+
+
+@pytest.fixture
+def make_daemon(monkeypatch):
+    QApplication.instance() or QApplication([])
+    monkeypatch.setattr(notification_daemon, "StreamingNotification", FakePopup)
+    return lambda policy="stack", max_visible=2: RendererDaemon("test-notify", policy, max_visible)
+
+
+def request(old, new, account="someone", metric="followers"):
+    event = ChangeEvent(account, metric, old, new, 0.0)
+    return {"line1": [], "line2": [], "is_gain": new > old, "gif_path": None,
+            "change": dict(event.to_dict(), headline="")}
+
+
+def texts(daemon):
+    return [popup.text for popup in daemon.visible]
+
+
+def test_same_direction_merges_into_the_visible_popup(make_daemon):
+    daemon = make_daemon()
+    daemon.show(request(100, 103))
+    daemon.show(request(103, 108))
+    assert texts(daemon) == ["You got 8 followers"]
+    assert (daemon.shown, daemon.merged) == (1, 1)
+
+
+def test_other_direction_metric_or_account_stacks(make_daemon):
+    daemon = make_daemon(max_visible=3)
+    daemon.show(request(100, 103))
+    daemon.show(request(103, 101))
+    daemon.show(request(5, 6, metric="posts"))
+    assert texts(daemon) == ["You got 3 followers", "You lost 2 followers", "Posts +1"]
+    assert [popup.y for popup in daemon.visible] == [0, 100, 200]
+    daemon.show(request(100, 101, account="other"))
+    assert len(daemon.visible) == 3 and len(daemon.pending) == 1
+
+
+def test_waiting_requests_merge_and_fill_freed_slots(make_daemon):
+    daemon = make_daemon(max_visible=2)
+    daemon.show(request(100, 103))
+    daemon.show(request(103, 101))
+    daemon.show(request(5, 6, metric="posts"))
+    daemon.show(request(6, 9, metric="posts"))
+    assert len(daemon.pending) == 1 and daemon.merged == 1
+
+    daemon.visible[0].close()
+    assert texts(daemon) == ["You lost 2 followers", "Posts +4"]
+    assert [popup.y for popup in daemon.visible] == [0, 100]
+    assert not daemon.pending
+
+
+def test_queue_policy_shows_one_at_a_time(make_daemon):
+    daemon = make_daemon("queue", max_visible=3)
+    daemon.show(request(100, 103))
+    daemon.show(request(103, 101))
+    assert texts(daemon) == ["You got 3 followers"]
+    daemon.visible[0].close()
+    assert texts(daemon) == ["You lost 2 followers"]
+
+
+def test_replace_policy_closes_the_current_popup(make_daemon):
+    daemon = make_daemon("replace")
+    daemon.show(request(100, 103))
+    daemon.show(request(103, 101))
+    assert texts(daemon) == ["You lost 2 followers"]
+    daemon.show(request(101, 100))
+    assert texts(daemon) == ["You lost 3 followers"]  # Same direction still merges
+
+
+def test_request_without_change_is_shown_as_is(make_daemon):
+    daemon = make_daemon()
+    daemon.show({"line1": [("Hello", "WHITE")], "line2": [], "is_gain": True})
+    daemon.show({"line1": [("Hello", "WHITE")], "line2": [], "is_gain": True})
+    assert texts(daemon) == ["Hello", "Hello"]
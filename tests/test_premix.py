@@ -0,0 +1,93 @@
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from core import premix
+from core.audio_engine import AudioEngine
+from core.premix import PremixCache
+
+RATE = 8000
+
+
+def write_wav(path, level, seconds=0.1):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(np.full((int(seconds * RATE), 2), level, dtype="<i2").tobytes())
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))  # A new mtime even within a tick
+
+
+@pytest.fixture
+def sources(tmp_path):
+    intro, voice = tmp_path / "intro.wav", tmp_path / "5.wav"
+    write_wav(intro, 100)
+    write_wav(voice, 200)
+    return str(intro), str(voice)
+
+
+def cache(tmp_path, engine=None):
+    return PremixCache(engine or AudioEngine(rate=RATE), cache_dir=str(tmp_path / "cache"))
+
+
+def cached_files(tmp_path):
+    return sorted(os.listdir(tmp_path / "cache"))
+
+
+def test_mixed_once_then_served_from_memory_and_disk(tmp_path, sources):
+    first = cache(tmp_path)
+    mixed = first.get("gain", *sources, delay=0.05)
+    assert first.get("gain", *sources, delay=0.05) is mixed
+    assert first.stats == {"memory": 1, "disk": 0, "mixed": 1}
+
+    second = cache(tmp_path)  # Fresh memory, same directory
+    assert np.array_equal(second.get("gain", *sources, delay=0.05), mixed)
+    assert second.stats == {"memory": 0, "disk": 1, "mixed": 0}
+
+
+def test_overlap_is_mixed_at_the_delay(tmp_path, sources):
+    mixed = cache(tmp_path).get("gain", *sources, delay=0.05)
+    assert len(mixed) == int(0.15 * RATE)
+    levels = [mixed[0, 0], mixed[int(0.075 * RATE), 0], mixed[-1, 0]]
+    assert levels == pytest.approx([100, 300, 200], abs=1)  # int16 -> float -> int16 rounding
+
+
+@pytest.mark.parametrize("change", ["voice", "intro", "delay", "version"])
+def test_changed_inputs_rebuild_and_replace_the_entry(tmp_path, sources, monkeypatch, change):
+    intro, voice = sources
+    entries = cache(tmp_path)
+    before = entries.get("gain", intro, voice, delay=0.05)
+    delay = 0.05
+    if change == "voice":
+        write_wav(voice, 1000)
+    elif change == "intro":
+        write_wav(intro, 1000)
+    elif change == "delay":
+        delay = 0.08
+    else:
+        monkeypatch.setattr(premix, "PREMIX_VERSION", premix.PREMIX_VERSION + 1)
+
+    after = entries.get("gain", intro, voice, delay=delay)
+    assert entries.stats["mixed"] == 2
+    if change in ("voice", "intro"):
+        assert after.max() > before.max()  # Mixed from the new file, not a stale decode
+    assert len(cached_files(tmp_path)) == 1  # The old mix of the same announcement is gone
+
+
+def test_engine_rate_is_part_of_the_key(tmp_path, sources):
+    cache(tmp_path).get("gain", *sources, delay=0.05)
+    other = cache(tmp_path, AudioEngine(rate=RATE * 2))
+    mixed = other.get("gain", *sources, delay=0.05)
+    assert other.stats["mixed"] == 1 and len(mixed) == int(0.15 * RATE * 2)
+
+
+def test_buckets_are_separate_entries(tmp_path, sources):
+    intro, voice = sources
+    entries = cache(tmp_path)
+    entries.get("gain", intro, voice)
+    entries.get("gain", intro, "")
+    entries.get("loss", intro, voice)
+    assert entries.stats["mixed"] == 3
+    assert [name.rsplit("_", 1)[0] for name in cached_files(tmp_path)] == ["gain_5", "gain_intro", "loss_5"]
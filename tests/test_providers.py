@@ -0,0 +1,31 @@
+import time
+
+from apis import PROVIDERS
+from core.providers import HedgedFetcher, ProviderRegistry
+from tests.stub_provider import StubProvider
+
+
+def test_stub_is_not_a_registered_provider():
+    assert "stub" not in PROVIDERS
+
+
+def test_failed_primary_falls_back_to_backup():
+    registry = ProviderRegistry()
+    registry.register("broken", StubProvider(failure_rate=1.0))
+    registry.register("backup", StubProvider(start=42))
+    assert HedgedFetcher(registry).fetch("someone") == 42
+
+
+def test_slow_primary_is_hedged_after_its_p95():
+    registry = ProviderRegistry()
+    registry.register("primary", StubProvider(start=1, latency=0.5))
+    registry.register("backup", StubProvider(start=2))
+    for _ in range(20):
+        registry.stats["primary"].record(0.01, True)
+        registry.stats["backup"].record(0.02, True)
+    fetcher = HedgedFetcher(registry)
+
+    started = time.monotonic()
+    assert fetcher.fetch("someone") == 2
+    assert time.monotonic() - started < 0.4
+    assert fetcher.hedged == 1
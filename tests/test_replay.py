@@ -0,0 +1,32 @@
+import logging
+import os
+
+from core import history
+from core.history import HistoryStore
+from core.logger import raw_logger
+from core.replay import run_replay, synthetic_series
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_replay_restores_the_history_store_and_skips_raw_log(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    monkeypatch.setattr(history, "_store", store)
+    monkeypatch.setattr(history, "_store_pid", os.getpid())
+    raw = Records()
+    raw_logger.addHandler(raw)
+    try:
+        report = run_replay(synthetic_series(0.05, flaps_per_hour=600, seed=1), announce=False)
+    finally:
+        raw_logger.removeHandler(raw)
+        store.close()
+    assert report["polls"] > 0 and report["raw_changes"] > 0
+    assert history.get_history() is store
+    assert raw.records == []
@@ -0,0 +1,63 @@
+import math
+import random
+
+import pytest
+
+from core.scheduler import PhaseLockedScheduler
+
+
+def simulate(polls=400, period=2.0, phase=0.7, latency=0.3, seed=1, stamps=True):
+    """Polls a simulated upstream that refreshes every period at phase; returns (scheduler, unlocked polls)."""
+    random.seed(seed)
+    rng = random.Random(seed)
+    scheduler = PhaseLockedScheduler(period=period, min_interval=1)
+    now, unlocked = 0.0, 0
+    for _ in range(polls):
+        started = now
+        served = started + rng.uniform(0, latency)  # Upstream reads its snapshot somewhere in flight
+        finished = started + latency
+        snapshot = math.floor((served - phase) / period)
+        scheduler.observe(started, finished, snapshot, snapshot if stamps else None)
+        if not scheduler.locked:
+            unlocked += 1
+        now = finished + scheduler.next_delay(finished)
+    return scheduler, unlocked
+
+
+def test_locks_onto_refresh_phase():
+    scheduler, _ = simulate()
+    assert scheduler.locked
+    assert abs(scheduler._circular_offset(scheduler.phase, 0.7)) <= scheduler.uncertainty + 0.3
+
+
+def test_stays_locked_once_acquired():
+    scheduler, unlocked = simulate()
+    # Acquisition takes a handful of polls; after that every poll should stay locked
+    assert unlocked < 20
+    assert scheduler.wasted_polls < 20
+
+
+def test_polls_once_per_refresh_when_locked():
+    scheduler, _ = simulate(polls=200)
+    start = scheduler.polls
+    delays = [scheduler.next_delay(t * 2.0) for t in range(5)]
+    assert scheduler.polls == start
+    assert all(0 < d <= 2 * scheduler.period for d in delays)
+
+
+@pytest.mark.parametrize("new_phase", [1.7, 0.1])
+def test_relocks_after_upstream_shift(new_phase):
+    scheduler, _ = simulate(polls=100)
+    # Upstream moved its refresh later (polls start missing it) or earlier (a probe sees it):
+    # the lock is dropped and re-acquired on the new phase
+    rng = random.Random(2)
+    now = 1000.0
+    for _ in range(300):
+        started = now
+        served = started + rng.uniform(0, 0.3)
+        finished = started + 0.3
+        snapshot = math.floor((served - new_phase) / 2.0)
+        scheduler.observe(started, finished, snapshot, snapshot)
+        now = finished + scheduler.next_delay(finished)
+    assert scheduler.locked
+    assert abs(scheduler._circular_offset(scheduler.phase, new_phase)) <= scheduler.uncertainty + 0.3
@@ -0,0 +1,151 @@
+import json
+import os
+import socket
+import time
+
+import pytest
+
+from core import sharding, tracker
+from core.event_stream import EventStreamServer
+from core.events import ChangeEvent
+from core.sharding import ShardCoordinator, SharedCountTable
+
+
+class FakeProcess:
+    """multiprocessing.Process stand-in that records what it would run."""
+
+    started = []
+
+    def __init__(self, target, args, name, daemon):
+        self.target, self.args, self.name = target, args, name
+        self.alive = False
+        self.exitcode = None
+        self.pid = 1000 + len(FakeProcess.started)
+
+    def start(self):
+        self.alive = True
+        FakeProcess.started.append(self)
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+@pytest.fixture
+def stream_servers(tmp_path, monkeypatch):
+    """Coordinators serve their event stream on a temporary socket."""
+    servers = []
+
+    def make_server():
+        servers.append(EventStreamServer(str(tmp_path / "events.sock")))
+        return servers[-1]
+
+    monkeypatch.setattr(sharding, "EventStreamServer", make_server)
+    yield servers
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def fake_processes(monkeypatch, stream_servers):
+    FakeProcess.started = []
+    monkeypatch.setattr(sharding.multiprocessing, "Process", FakeProcess)
+    return FakeProcess.started
+
+
+def stamp(username):
+    return None
+
+
+def delay():
+    return 1.0
+
+
+def test_table_round_trip():
+    table = SharedCountTable(3, max_workers=2)
+    before = time.time()
+    table.publish(1, 12345, 2)
+    count, updated, failures = table.read(1)
+    assert (count, failures) == (12345, 2)
+    assert before <= updated <= time.time()
+    assert table.read(0) == (0, 0.0, 0)
+    table.beat(1)
+    assert table.last_beat(1) >= before and table.last_beat(0) == 0.0
+
+
+def test_table_read_gives_up_on_a_writer_that_died_mid_update():
+    table = SharedCountTable(1, max_workers=1)
+    table.publish(0, 7, 0)
+    table._seq[0] += 1  # Odd: a write started and never finished
+    assert table.read(0)[0] == 7
+    table.publish(0, 8, 0)  # The replacement writer makes the slot consistent again
+    assert table._seq[0] % 2 == 0 and table.read(0)[0] == 8
+
+
+def test_accounts_are_dealt_round_robin():
+    coordinator = ShardCoordinator([f"u{i}" for i in range(7)], stamp, workers=3)
+    assert {w: [slot for slot, _ in shard] for w, shard in coordinator.shards.items()} == {
+        0: [0, 3, 6], 1: [1, 4], 2: [2, 5]
+    }
+
+
+def test_split_halves_a_shard_into_a_new_worker(fake_processes):
+    coordinator = ShardCoordinator([f"u{i}" for i in range(9)], stamp, workers=2)
+    coordinator.start()
+    coordinator._split(0)
+    assert [slot for slot, _ in coordinator.shards[0]] == [0, 4, 8]
+    assert [slot for slot, _ in coordinator.shards[2]] == [2, 6]
+    assert sorted(slot for shard in coordinator.shards.values() for slot, _ in shard) == list(range(9))
+    assert [p.name for p in fake_processes] == ["shard-0", "shard-1", "shard-0", "shard-2"]
+    assert not fake_processes[0].alive  # The old worker for shard 0 was stopped
+
+
+def test_supervisor_restarts_dead_and_stalled_workers(fake_processes, monkeypatch):
+    coordinator = ShardCoordinator(["a", "b", "c"], stamp, workers=3)
+    coordinator.start()
+    fake_processes[0].alive = False  # Died
+    coordinator.table._heartbeat[1] = time.time() - sharding.SHARD_HEARTBEAT_TIMEOUT - 1  # Stalled
+    coordinator.supervise_once()
+    assert [p.name for p in fake_processes[3:]] == ["shard-0", "shard-1"]
+    assert coordinator.processes[0] is fake_processes[3] and not fake_processes[1].alive
+
+
+def test_workers_get_the_cache_stamp_and_retry_hooks(fake_processes):
+    coordinator = ShardCoordinator(["a", "b"], stamp, workers=1, get_cache_stamp=stamp, retry_delay=delay)
+    coordinator.start()
+    assert fake_processes[0].args[-2:] == (stamp, delay)
+
+
+
+def test_worker_events_reach_one_subscriber(fake_processes, stream_servers, monkeypatch):
+    monkeypatch.setattr(tracker, "EVENT_STREAM", True)
+    coordinator = ShardCoordinator(["a", "b"], stamp, workers=2)
+    coordinator.start()
+    assert len(stream_servers) == 1
+    assert all(process.args[4] is coordinator.events for process in fake_processes)
+
+    subscriber = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    subscriber.settimeout(5)
+    subscriber.connect(stream_servers[0].socket_path)
+    deadline = time.time() + 5
+    while not stream_servers[0].clients and time.time() < deadline:
+        time.sleep(0.01)
+
+    # The bus track_accounts builds in each worker, streaming into the coordinator's queue
+    for account in ("a", "b"):
+        bus = tracker.create_event_bus(
+            False, handlers={"storage": lambda event: None, "stream": coordinator.events.put}, start=False
+        )
+        bus.publish(ChangeEvent(account, "followers", 100, 101, 0.0))
+        bus.pump(0.0)
+
+    with subscriber, subscriber.makefile("rb") as lines:
+        received = [json.loads(lines.readline()) for _ in range(2)]
+    assert sorted(record["account"] for record in received) == ["a", "b"]
+    coordinator.stop()
+    assert not os.path.exists(stream_servers[0].socket_path)